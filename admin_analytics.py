@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from firebase_admin import credentials, initialize_app, firestore
+
+# Columnar schemas for the exported collections
+SCHEMAS = {
+    'progress': pa.schema([
+        ('user_id', pa.string()),
+        ('module', pa.string()),
+        ('chapter', pa.string()),
+        ('subtopic', pa.string()),
+        ('completed', pa.bool_()),
+        ('completed_at', pa.timestamp('us', tz='UTC')),
+        ('created_at', pa.timestamp('us', tz='UTC')),
+    ]),
+    'badges': pa.schema([
+        ('user_id', pa.string()),
+        ('badge_name', pa.string()),
+        ('earned_at', pa.timestamp('us', tz='UTC')),
+    ]),
+    'study_sessions': pa.schema([
+        ('user_id', pa.string()),
+        ('session_id', pa.string()),
+        ('date', pa.string()),
+        ('started_at', pa.timestamp('us', tz='UTC')),
+        ('hours', pa.float64()),
+    ]),
+}
+
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_PARTITIONS = 8
+
+
+def get_firestore_client(service_account=None):
+    try:
+        return firestore.client()
+    except ValueError:
+        if service_account:
+            cred = credentials.Certificate(service_account)
+        elif os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON"):
+            cred = credentials.Certificate(json.loads(os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")))
+        else:
+            cred = credentials.ApplicationDefault()
+        initialize_app(cred)
+        return firestore.client()
+
+
+def _normalize_value(field, value):
+    if field == 'hours':
+        return float(value or 0)
+    return value
+
+
+def stream_pages(query, page_size):
+    last_doc = None
+    while True:
+        page = query.limit(page_size)
+        if last_doc is not None:
+            page = page.start_after(last_doc)
+        docs = list(page.stream())
+        if not docs:
+            return
+        yield docs
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
+
+
+def _export_partition(query, schema, path, page_size):
+    fields = schema.names
+    rows = 0
+    writer = pq.ParquetWriter(path, schema)
+    try:
+        for docs in stream_pages(query, page_size):
+            columns = {field: [] for field in fields}
+            for doc in docs:
+                data = doc.to_dict()
+                if 'hours' not in data and 'Hours' in data:
+                    data['hours'] = data['Hours']
+                for field in fields:
+                    columns[field].append(_normalize_value(field, data.get(field)))
+            writer.write_table(pa.table(columns, schema=schema))
+            rows += len(docs)
+    finally:
+        writer.close()
+    return rows
+
+
+def export_collections(db, store_dir, page_size=DEFAULT_PAGE_SIZE, partitions=DEFAULT_PARTITIONS):
+    counts = {}
+    for collection, schema in SCHEMAS.items():
+        collection_dir = os.path.join(store_dir, collection)
+        os.makedirs(collection_dir, exist_ok=True)
+        for name in os.listdir(collection_dir):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(collection_dir, name))
+
+        queries = [partition.query() for partition in db.collection_group(collection).get_partitions(partitions)]
+        with ThreadPoolExecutor(max_workers=max(1, len(queries))) as pool:
+            futures = [
+                pool.submit(_export_partition, query, schema, os.path.join(collection_dir, f"part-{i:05d}.parquet"), page_size)
+                for i, query in enumerate(queries)
+            ]
+            counts[collection] = sum(future.result() for future in futures)
+    return counts
+
+
+def load_collection(store_dir, collection):
+    path = os.path.join(store_dir, collection)
+    if not os.path.isdir(path) or not any(name.endswith('.parquet') for name in os.listdir(path)):
+        return SCHEMAS[collection].empty_table().to_pandas()
+    return pd.read_parquet(path)
+
+
+def load_curriculum_index(curriculum_csv):
+    df = pd.read_csv(curriculum_csv, usecols=['Module', 'Chapter', 'Subtopic'])
+    df.columns = ['module', 'chapter', 'subtopic']
+    df = df.drop_duplicates(['module', 'chapter', 'subtopic'])
+    df['position'] = df.groupby(['module', 'chapter'], sort=False).cumcount()
+    df['chapter_size'] = df.groupby(['module', 'chapter'], sort=False)['subtopic'].transform('size')
+    return df
+
+
+def completion_funnel(progress, curriculum):
+    completed = progress.loc[progress['completed'].fillna(False).astype(bool), ['user_id', 'module', 'chapter', 'subtopic']]
+    merged = completed.merge(curriculum, on=['module', 'chapter', 'subtopic'], how='inner')
+    reached = merged.groupby(['module', 'chapter', 'position', 'subtopic'], sort=False)['user_id'].nunique()
+    funnel = curriculum.set_index(['module', 'chapter', 'position', 'subtopic'])[[]].join(reached.rename('users_completed'))
+    funnel['users_completed'] = funnel['users_completed'].fillna(0).astype(np.int64)
+    started = funnel.groupby(level=['module', 'chapter'], sort=False)['users_completed'].transform('first')
+    funnel['pct_of_chapter_starters'] = np.where(started > 0, funnel['users_completed'] / started.clip(lower=1) * 100, 0.0)
+    return funnel.reset_index()
+
+
+def stall_points(progress, curriculum):
+    completed = progress.loc[progress['completed'].fillna(False).astype(bool), ['user_id', 'module', 'chapter', 'subtopic']]
+    merged = completed.merge(curriculum, on=['module', 'chapter', 'subtopic'], how='inner')
+    keys = ['user_id', 'module', 'chapter']
+    done = merged[keys + ['position', 'chapter_size']].drop_duplicates(keys + ['position']).sort_values(keys + ['position'])
+    # In position order, the first completion whose position is past its rank sits just after a gap: that rank is the frontier
+    done['rank'] = done.groupby(keys, sort=False).cumcount()
+    done['gap'] = done['rank'].where(done['position'] != done['rank'])
+    opened = done.groupby(keys, sort=False).agg(gap=('gap', 'min'), completed=('rank', 'size'), chapter_size=('chapter_size', 'first'))
+    opened['frontier'] = opened['gap'].fillna(opened['completed']).astype(np.int64)
+    opened = opened[opened['frontier'] < opened['chapter_size']].reset_index()
+    stalled = opened.groupby(['module', 'chapter', 'frontier'], sort=False).size()
+    # Users who have started the curriculum but never opened a chapter stall at its first subtopic
+    chapters = curriculum[['module', 'chapter']].drop_duplicates().set_index(['module', 'chapter'])
+    openers = done.groupby(['module', 'chapter'], sort=False)['user_id'].nunique()
+    unopened = done['user_id'].nunique() - chapters.join(openers.rename('openers'))['openers'].fillna(0).astype(np.int64)
+    unopened.index = pd.MultiIndex.from_arrays(
+        [unopened.index.get_level_values(0), unopened.index.get_level_values(1), np.zeros(len(unopened), dtype=np.int64)],
+        names=['module', 'chapter', 'frontier'],
+    )
+    stalls = pd.concat([stalled, unopened]).groupby(level=['module', 'chapter', 'frontier'], sort=False).sum()
+    stalls = stalls[stalls > 0].rename('users_stalled').reset_index()
+    stalls = stalls.merge(
+        curriculum[['module', 'chapter', 'position', 'subtopic']],
+        left_on=['module', 'chapter', 'frontier'],
+        right_on=['module', 'chapter', 'position'],
+        how='left',
+    ).drop(columns='position').rename(columns={'subtopic': 'locked_at_subtopic'})
+    return stalls.sort_values('users_stalled', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def hours_distribution(sessions, bins=20):
+    per_user = sessions.groupby('user_id', sort=False)['hours'].sum()
+    values = per_user.to_numpy(dtype=np.float64)
+    if values.size == 0:
+        return pd.DataFrame(columns=['bin_start', 'bin_end', 'users']), pd.Series(dtype=np.float64)
+    counts, edges = np.histogram(values, bins=bins)
+    histogram = pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'users': counts})
+    summary = pd.Series(
+        np.percentile(values, [10, 25, 50, 75, 90, 99]),
+        index=['p10', 'p25', 'p50', 'p75', 'p90', 'p99'],
+    )
+    summary['mean'] = values.mean()
+    summary['users'] = values.size
+    return histogram, summary
+
+
+def build_cohort_reports(store_dir, curriculum_csv, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    curriculum = load_curriculum_index(curriculum_csv)
+    progress = load_collection(store_dir, 'progress')
+    sessions = load_collection(store_dir, 'study_sessions')
+    badges = load_collection(store_dir, 'badges')
+
+    funnel = completion_funnel(progress, curriculum)
+    stalls = stall_points(progress, curriculum)
+    histogram, summary = hours_distribution(sessions)
+    badge_counts = badges.groupby('badge_name')['user_id'].nunique().rename('users').reset_index()
+
+    funnel.to_csv(os.path.join(out_dir, 'chapter_funnel.csv'), index=False)
+    stalls.to_csv(os.path.join(out_dir, 'stall_points.csv'), index=False)
+    histogram.to_csv(os.path.join(out_dir, 'hours_histogram.csv'), index=False)
+    summary.to_csv(os.path.join(out_dir, 'hours_summary.csv'), header=['value'])
+    badge_counts.to_csv(os.path.join(out_dir, 'badge_counts.csv'), index=False)
+    return {
+        'chapter_funnel': funnel,
+        'stall_points': stalls,
+        'hours_histogram': histogram,
+        'hours_summary': summary,
+        'badge_counts': badge_counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort analytics over all users' progress, badges and study sessions.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Export Firestore collections into a local Parquet store.")
+    export_parser.add_argument('--store', default='analytics_store')
+    export_parser.add_argument('--service-account', default=None, help="Path to a service account JSON file.")
+    export_parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    export_parser.add_argument('--partitions', type=int, default=DEFAULT_PARTITIONS)
+
+    report_parser = subparsers.add_parser('report', help="Compute cohort reports from the local Parquet store.")
+    report_parser.add_argument('--store', default='analytics_store')
+    report_parser.add_argument('--curriculum', required=True, help="Curriculum CSV used to order subtopics.")
+    report_parser.add_argument('--out', default='analytics_reports')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        db = get_firestore_client(args.service_account)
+        counts = export_collections(db, args.store, args.page_size, args.partitions)
+        for collection, rows in counts.items():
+            print(f"{collection}: {rows} documents exported")
+    else:
+        reports = build_cohort_reports(args.store, args.curriculum, args.out)
+        print(reports['hours_summary'].to_string())
+        print(f"Reports written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
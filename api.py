@@ -0,0 +1,286 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from firebase_admin import auth
+from pydantic import BaseModel, Field, field_validator
+
+from admin_analytics import SCHEMAS as EXPORT_SCHEMAS
+from storage import COLLECTIONS, FirestoreStorage, open_storage
+from study_core.badges import BADGE_RULES, evaluate_badges
+from study_core.curriculum import acquire_curriculum, get_curriculum
+from study_core.forecast import weekly_hours_target
+from study_core.frontier import GATING_MODES, ProgressFrontier
+from study_core.recommendations import NextUpIndex
+from study_core.scheduler import build_study_schedule
+from study_core.stats import calculate_module_completion, list_pending_subtopics, summarize_module_completion
+from study_core.timeline import StudyTimeline
+from study_core.timer import ACTIVE
+
+SNAPSHOT_TTL_SECONDS = int(os.getenv("STUDY_DASHBOARD_API_CACHE_TTL", "30"))
+SNAPSHOT_CACHE_SIZE = 1024
+EXPORT_PAGE_SIZE = 500
+MAX_NEXT_UP = 50
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class UserSnapshot:
+    def __init__(self, user_id, storage):
+        self.user_id = user_id
+        self.progress_data = {
+            f"{row['module']}_{row['chapter']}_{row['subtopic']}": True
+            for row in storage.completed_progress(user_id)
+        }
+        self.badges = storage.load_badges(user_id)
+        sessions = storage.load_study_sessions(user_id)
+        self.timeline = StudyTimeline(s for s in sessions if s.get('status') != ACTIVE)
+        csv_text = storage.load_curriculum(user_id)
+        # Holding the handle keeps the parsed curriculum shared with Streamlit sessions and other snapshots
+        self.curriculum_ref = acquire_curriculum(csv_text) if csv_text else None
+        self.curriculum = get_curriculum(self.curriculum_ref)
+        fingerprint = json.dumps([
+            sorted(self.progress_data), self.badges, self.timeline.total_hours, len(self.timeline.days),
+            self.curriculum_ref.digest if self.curriculum_ref is not None else None,
+        ])
+        self.etag = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def memo(self, key, compute):
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with self._memo_lock:
+            return self._memo.setdefault(key, value)
+
+    def frontier(self, gating):
+        return self.memo(('frontier', gating), lambda: ProgressFrontier(self.curriculum, self.progress_data, gating))
+
+    def module_completion(self):
+        return self.memo('module_completion', lambda: calculate_module_completion(self.progress_data, self.curriculum))
+
+    def progress_stats(self):
+        return self.memo('progress_stats', lambda: summarize_module_completion(self.module_completion()))
+
+
+class SnapshotCache:
+    def __init__(self, storage, ttl=SNAPSHOT_TTL_SECONDS, maxsize=SNAPSHOT_CACHE_SIZE):
+        self.storage = storage
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # user_id -> [lock, waiters]; an entry only lives while a load for that user is in progress
+        self._loading = {}
+
+    def get(self, user_id):
+        with self._lock:
+            snapshot = self._cache.get(user_id)
+            if snapshot is not None:
+                return snapshot
+            loading = self._loading.setdefault(user_id, [threading.Lock(), 0])
+            loading[1] += 1
+        # One load per user at a time; concurrent requests wait and reuse it
+        try:
+            with loading[0]:
+                with self._lock:
+                    snapshot = self._cache.get(user_id)
+                if snapshot is None:
+                    snapshot = UserSnapshot(user_id, self.storage)
+                    with self._lock:
+                        self._cache[user_id] = snapshot
+        finally:
+            with self._lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    del self._loading[user_id]
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+
+storage = open_storage()
+snapshots = SnapshotCache(storage)
+app = FastAPI(title="Study Dashboard API")
+
+
+def authorize(user_id: str, authorization: Optional[str] = Header(default=None)):
+    token = authorization[7:] if authorization and authorization.startswith("Bearer ") else None
+    if token is None:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    if isinstance(storage, FirestoreStorage):
+        try:
+            uid = auth.verify_id_token(token)['uid']
+        except Exception:
+            raise HTTPException(status_code=401, detail="Invalid Firebase ID token")
+        if uid != user_id:
+            raise HTTPException(status_code=403, detail="Token does not belong to this user")
+        return user_id
+    # Development only: the shared token grants access to every user_id in the SQLite database
+    expected = os.getenv("STUDY_DASHBOARD_API_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=503, detail="STUDY_DASHBOARD_API_TOKEN is not configured")
+    if not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=401, detail="Invalid API token")
+    return user_id
+
+
+async def cached_response(request, user_id, key, compute):
+    snapshot = await run_in_threadpool(snapshots.get, user_id)
+    # Streaks and rolling hours depend on the date, so nothing cached yesterday is reused today
+    key = (key, date.today().isoformat())
+    etag = f'"{snapshot.etag}-{hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:8]}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    body = await run_in_threadpool(snapshot.memo, key, lambda: compute(snapshot))
+    return JSONResponse(body, headers={'ETag': etag, 'Cache-Control': 'private, max-age=0, must-revalidate'})
+
+
+def _check_gating(gating):
+    if gating not in GATING_MODES.values():
+        raise HTTPException(status_code=422, detail=f"gating must be one of {sorted(GATING_MODES.values())}")
+
+
+class ProgressUpdate(BaseModel):
+    module: str
+    chapter: str
+    subtopic: str
+    completed: bool
+    updated_at: Optional[datetime] = None
+
+    @field_validator('updated_at')
+    @classmethod
+    def assume_utc(cls, value):
+        # Stored timestamps are tz-aware, and comparing them with a naive one raises
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class ScheduleRequest(BaseModel):
+    daily_hours: int = Field(4, ge=2, le=8)
+    start_time: time = time(9, 0)
+    study_days: list[str] = Field(default_factory=lambda: ["Monday", "Saturday", "Sunday"])
+    gating: str = "chapter"
+
+
+@app.get("/health")
+async def health():
+    return {'status': 'ok', 'storage': type(storage).__name__}
+
+
+@app.get("/users/{user_id}/curriculum")
+async def curriculum(request: Request, user_id: str = Depends(authorize)):
+    def compute(snapshot):
+        return [
+            {
+                'module': module,
+                'chapters': [
+                    {
+                        'chapter': chapter,
+                        'subtopics': list(content.get('subtopics', ())),
+                        'project': content['project'] if isinstance(content.get('project'), str) else None,
+                        'prerequisites': list(content.get('prerequisites', ())),
+                    }
+                    for chapter, content in chapters.items()
+                ],
+            }
+            for module, chapters in snapshot.curriculum.items()
+        ]
+    return await cached_response(request, user_id, 'curriculum', compute)
+
+
+@app.get("/users/{user_id}/stats")
+async def stats(request: Request, user_id: str = Depends(authorize)):
+    def compute(snapshot):
+        completion_percentage, completed_subtopics, total_subtopics, total_modules = snapshot.progress_stats()
+        return {
+            'completion_percentage': completion_percentage,
+            'completed_subtopics': completed_subtopics,
+            'total_subtopics': total_subtopics,
+            'total_modules': total_modules,
+            'modules': [
+                {'module': module, 'completed': completed, 'total': total}
+                for module, completed, total in snapshot.module_completion()
+            ],
+            'study': snapshot.timeline.summary(),
+        }
+    return await cached_response(request, user_id, 'stats', compute)
+
+
+@app.get("/users/{user_id}/badges")
+async def badges(request: Request, user_id: str = Depends(authorize)):
+    def compute(snapshot):
+        return {
+            'earned': snapshot.badges,
+            'eligible': evaluate_badges(snapshot.progress_stats(), snapshot.timeline.summary(), snapshot.badges),
+            'rules': [{'badge': badge, 'metric': metric, 'threshold': threshold} for badge, metric, threshold in BADGE_RULES],
+        }
+    return await cached_response(request, user_id, 'badges', compute)
+
+
+@app.post("/users/{user_id}/badges/award")
+async def award_badges(user_id: str = Depends(authorize)):
+    snapshot = await run_in_threadpool(snapshots.get, user_id)
+    awarded = evaluate_badges(snapshot.progress_stats(), snapshot.timeline.summary(), snapshot.badges)
+    for badge in awarded:
+        await run_in_threadpool(storage.save_badge, user_id, badge)
+    if awarded:
+        snapshots.invalidate(user_id)
+    return {'awarded': awarded}
+
+
+@app.get("/users/{user_id}/next-up")
+async def next_up(request: Request, k: int = Query(3, ge=1, le=MAX_NEXT_UP), gating: str = "chapter", user_id: str = Depends(authorize)):
+    _check_gating(gating)
+    def compute(snapshot):
+        return NextUpIndex(snapshot.frontier(gating), snapshot.curriculum).top(k)
+    return await cached_response(request, user_id, ('next_up', k, gating), compute)
+
+
+@app.post("/users/{user_id}/schedule")
+async def schedule(request: Request, body: ScheduleRequest, user_id: str = Depends(authorize)):
+    _check_gating(body.gating)
+    unknown = set(body.study_days) - set(WEEK_DAYS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown study days: {sorted(unknown)}")
+    key = ('schedule', body.daily_hours, body.start_time.isoformat(), tuple(body.study_days), body.gating)
+    def compute(snapshot):
+        pending = snapshot.memo(('pending', body.gating), lambda: list_pending_subtopics(snapshot.frontier(body.gating), snapshot.curriculum))
+        weekly_hours = weekly_hours_target(snapshot.timeline.hours_by_day)
+        return build_study_schedule(pending, body.daily_hours, body.start_time, body.study_days, weekly_hours=weekly_hours)
+    return await cached_response(request, user_id, key, compute)
+
+
+@app.put("/users/{user_id}/progress")
+async def update_progress(body: ProgressUpdate, user_id: str = Depends(authorize)):
+    updated_at = body.updated_at or datetime.now(timezone.utc)
+    server_value = await run_in_threadpool(
+        storage.write_progress, user_id, body.module, body.chapter, body.subtopic, body.completed, updated_at
+    )
+    snapshots.invalidate(user_id)
+    if server_value is not None:
+        raise HTTPException(status_code=409, detail={'message': "A newer change was already saved", 'completed': server_value})
+    return {'module': body.module, 'chapter': body.chapter, 'subtopic': body.subtopic, 'completed': body.completed}
+
+
+@app.get("/users/{user_id}/export/{collection}")
+async def export(collection: str, user_id: str = Depends(authorize)):
+    if collection not in COLLECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {collection}")
+    fields = EXPORT_SCHEMAS[collection].names
+
+    def rows():
+        for columns in storage.export_pages(collection, user_id, fields, EXPORT_PAGE_SIZE):
+            for values in zip(*columns.values()):
+                yield json.dumps(dict(zip(fields, values)), default=str) + "\n"
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, time as dtime
+
+from storage import open_storage
+from study_core.badges import evaluate_badges
+from study_core.forecast import weekly_hours_target
+from study_core.progress import ProgressStore
+from study_core.scheduler import build_study_schedule
+from study_core.timeline import StudyTimeline
+from study_core.timer import ACTIVE
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHECKPOINT = 'recompute_checkpoint.json'
+
+# Schedule preview uses the same defaults as the dashboard's schedule form
+SCHEDULE_DAILY_HOURS = 4
+SCHEDULE_START_TIME = dtime(9, 0)
+SCHEDULE_STUDY_DAYS = ("Monday", "Saturday", "Sunday")
+NEXT_UP_COUNT = 3
+
+# Parsed curricula stay registered for the life of a worker so users sharing one are parsed once
+_curriculum_refs = {}
+
+
+def recompute_user(storage, user_id, today):
+    # Every value, the forecast included, is computed for the run's date, so a resumed run stays consistent
+    store = ProgressStore(today=today.date())
+    csv_text = storage.load_curriculum(user_id)
+    if csv_text:
+        store.set_curriculum(csv_text)
+        _curriculum_refs.setdefault(store.curriculum_digest, store.curriculum_ref)
+    store.load(storage.completed_progress(user_id))
+    earned = storage.load_badges(user_id)
+    sessions = storage.load_study_sessions(user_id)
+    timeline = StudyTimeline(s for s in sessions if s.get('status') != ACTIVE)
+    study_summary = timeline.summary(today.date())
+    weekly_hours = weekly_hours_target(timeline.hours_by_day, today.date())
+    forecast = store.derived('forecast')
+
+    progress_stats = store.derived('progress_stats')
+    completion_percentage, completed_subtopics, total_subtopics, total_modules = progress_stats
+    new_badges = evaluate_badges(progress_stats, study_summary, earned)
+    aggregates = {
+        'completion_percentage': completion_percentage,
+        'completed_subtopics': completed_subtopics,
+        'total_subtopics': total_subtopics,
+        'total_modules': total_modules,
+        'modules': [
+            {'module': module, 'completed': completed, 'total': total}
+            for module, completed, total in store.derived('module_completion')
+        ],
+        'study': study_summary,
+        'badges': earned + new_badges,
+        'next_up': store.top_next_up(NEXT_UP_COUNT),
+        'forecast': forecast and {
+            'rate': forecast['rate'],
+            **{key: forecast[key].isoformat() for key in ('finish', 'finish_early', 'finish_late')},
+        },
+        'weekly_hours_target': weekly_hours,
+        'schedule': build_study_schedule(
+            store.derived('pending_subtopics'), SCHEDULE_DAILY_HOURS, SCHEDULE_START_TIME, SCHEDULE_STUDY_DAYS, today, weekly_hours
+        ),
+    }
+    return user_id, new_badges, aggregates
+
+
+def recompute_chunk(storage_config, user_ids, today_iso):
+    # Runs in a worker process; storage clients are opened once per process and reused across chunks
+    storage = open_storage(**storage_config)
+    today = datetime.fromisoformat(today_iso)
+    results = [recompute_user(storage, user_id, today) for user_id in user_ids]
+    storage.save_recompute_results(results)
+    return len(results), sum(len(new_badges) for _, new_badges, _ in results)
+
+
+def load_checkpoint(path, chunk_size):
+    if not os.path.exists(path):
+        return {'today': datetime.now().date().isoformat(), 'chunk_size': chunk_size, 'done': []}
+    with open(path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint['chunk_size'] != chunk_size:
+        raise SystemExit(
+            f"{path} was written with --chunk-size {checkpoint['chunk_size']}; "
+            f"rerun with that size or delete the checkpoint to start over."
+        )
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    # Write then rename so a crash mid-write never leaves a truncated checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def iter_chunks(storage, chunk_size):
+    chunk = []
+    for user_id in storage.iter_user_ids(chunk_size):
+        chunk.append(user_id)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_recompute(storage_config, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS, checkpoint_path=DEFAULT_CHECKPOINT):
+    checkpoint = load_checkpoint(checkpoint_path, chunk_size)
+    done = set(checkpoint['done'])
+    storage = open_storage(**storage_config)
+    totals = {'users': 0, 'badges': 0, 'skipped_chunks': 0, 'failed_chunks': 0}
+    start = time.perf_counter()
+
+    def finish(futures):
+        for future in futures:
+            key = in_flight.pop(future)
+            try:
+                users, badges = future.result()
+            except Exception as e:
+                totals['failed_chunks'] += 1
+                print(f"Chunk {key} failed: {e}")
+                continue
+            totals['users'] += users
+            totals['badges'] += badges
+            done.add(key)
+            checkpoint['done'] = sorted(done)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in iter_chunks(storage, chunk_size):
+            # A chunk is identified by its id range, so a resumed run skips exactly the chunks already committed
+            key = f"{chunk[0]}..{chunk[-1]}"
+            if key in done:
+                totals['skipped_chunks'] += 1
+                continue
+            # Keep a bounded number of chunks queued so user ids are paged lazily
+            if len(in_flight) >= workers * 2:
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finish(completed)
+            in_flight[pool.submit(recompute_chunk, storage_config, chunk, checkpoint['today'])] = key
+        finish(list(in_flight))
+
+    totals['elapsed_s'] = time.perf_counter() - start
+    if not totals['failed_chunks'] and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute badges, progress aggregates and schedules for all users.")
+    parser.add_argument('--storage', choices=['firestore', 'sqlite'], default=None)
+    parser.add_argument('--sqlite-path', default=None)
+    parser.add_argument('--service-account', default=None, help="Path to a service account JSON file.")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Users per worker task and per batched commit.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Progress file used to resume an interrupted run.")
+    args = parser.parse_args()
+
+    storage_config = {'backend': args.storage, 'sqlite_path': args.sqlite_path, 'service_account': args.service_account}
+    totals = run_recompute(storage_config, args.chunk_size, args.workers, args.checkpoint)
+    print(f"Recomputed {totals['users']} users in {totals['elapsed_s']:.1f}s "
+          f"({totals['badges']} new badges, {totals['skipped_chunks']} chunks already done)")
+    if totals['failed_chunks']:
+        raise SystemExit(f"{totals['failed_chunks']} chunk(s) failed; rerun to resume from {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
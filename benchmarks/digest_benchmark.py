@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_notifications import FakeOneSignalClient, FakeSendGridClient
+from notifications import BADGE, SCHEDULE_REMINDER, STREAK, OneSignalTransport, SendGridTransport, dispatch_digests
+from storage import SQLiteStorage
+
+EVENT_MESSAGES = {
+    BADGE: "New Badge Earned: First Steps",
+    STREAK: "7-day study streak! Keep it going.",
+    SCHEDULE_REMINDER: "Next study session: Monday 2026-01-05 at 09:00 – Subtopic 1",
+}
+
+
+def run_digest_benchmark(users, events_per_user, latency_ms, seed=0):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, "digest.db"))
+        events = 0
+        for i in range(users):
+            user_id = storage.create_user(f"digest-user-{i}@example.com", "benchmark")
+            for _ in range(rng.randint(1, events_per_user * 2 - 1)):
+                kind = rng.choice(list(EVENT_MESSAGES))
+                storage.enqueue_notification(user_id, f"digest-user-{i}@example.com", kind, EVENT_MESSAGES[kind])
+                events += 1
+
+        email = FakeSendGridClient(latency=latency_ms / 1000)
+        push = FakeOneSignalClient(latency=latency_ms / 1000)
+        start = time.perf_counter()
+        totals = dispatch_digests(storage, [SendGridTransport(email, "digest@example.com"), OneSignalTransport(push)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        'events': events,
+        'digests': totals['digests'],
+        # The per-event path made one email and one push request for every event
+        'per_event_requests': events * 2,
+        'digest_requests': totals['requests'],
+        'email_recipients': len(email.recipients),
+        'push_recipients': len(push.recipients),
+        'elapsed_s': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-event notification sends with batched digests.")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--events-per-user', type=int, default=3, help="Mean queued events per user.")
+    parser.add_argument('--latency-ms', type=float, default=100.0, help="Simulated provider round-trip time.")
+    args = parser.parse_args()
+
+    report = run_digest_benchmark(args.users, args.events_per_user, args.latency_ms)
+    print(f"Events: {report['events']}   Digests: {report['digests']}   Elapsed: {report['elapsed_s']:.1f}s")
+    print(f"API requests: {report['per_event_requests']} per-event vs {report['digest_requests']} digest "
+          f"({report['per_event_requests'] / max(report['digest_requests'], 1):.0f}x fewer)")
+    print(f"Recipients: {report['email_recipients']} emails, {report['push_recipients']} push")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import copy
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+try:
+    from firebase_admin import firestore as _firestore
+    SERVER_TIMESTAMP = _firestore.SERVER_TIMESTAMP
+    DELETE_FIELD = _firestore.DELETE_FIELD
+    ArrayUnion = _firestore.ArrayUnion
+    Increment = _firestore.Increment
+except ImportError:
+    SERVER_TIMESTAMP = object()
+    DELETE_FIELD = object()
+
+    class ArrayUnion:
+        def __init__(self, values):
+            self.values = list(values)
+
+    class Increment:
+        def __init__(self, value):
+            self.value = value
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+    'in': lambda a, b: a in b,
+    'not-in': lambda a, b: a not in b,
+    'array_contains': lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+def _resolve(value):
+    if value is SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, dict):
+        return {k: _resolve(v) for k, v in value.items()}
+    return value
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.copy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return self._data[field]
+
+
+class FakeDocumentReference:
+    def __init__(self, store, collection, doc_id):
+        self._store = store
+        self._collection = collection
+        self.id = doc_id
+
+    def _docs(self):
+        return self._store.collections.setdefault(self._collection, {})
+
+    def get(self, transaction=None, retry=None, timeout=None):
+        self._store.round_trip()
+        with self._store.lock:
+            data = self._docs().get(self.id)
+            return FakeSnapshot(self, copy.copy(data) if data is not None else None)
+
+    def set(self, data, merge=False, retry=None, timeout=None):
+        self._store.round_trip()
+        with self._store.lock:
+            docs = self._docs()
+            resolved = _resolve(data)
+            if merge and self.id in docs:
+                docs[self.id].update(resolved)
+            else:
+                docs[self.id] = resolved
+            self._store.writes += 1
+
+    def update(self, data, retry=None, timeout=None):
+        self._store.round_trip()
+        with self._store.lock:
+            docs = self._docs()
+            if self.id not in docs:
+                raise KeyError(f"No document to update: {self._collection}/{self.id}")
+            for field, value in data.items():
+                if value is DELETE_FIELD:
+                    docs[self.id].pop(field, None)
+                elif isinstance(value, ArrayUnion):
+                    existing = list(docs[self.id].get(field) or [])
+                    docs[self.id][field] = existing + [item for item in value.values if item not in existing]
+                elif isinstance(value, Increment):
+                    docs[self.id][field] = (docs[self.id].get(field) or 0) + value.value
+                else:
+                    docs[self.id][field] = _resolve(value)
+            self._store.writes += 1
+
+    def delete(self, retry=None, timeout=None):
+        self._store.round_trip()
+        with self._store.lock:
+            self._docs().pop(self.id, None)
+            self._store.writes += 1
+
+
+class FakeQuery:
+    def __init__(self, store, collection, filters=(), order=None, projection=None, limit=None, after=None):
+        self._store = store
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._order = order
+        self._projection = projection
+        self._limit = limit
+        self._after = after
+
+    def _copy(self, **changes):
+        state = {
+            'filters': self._filters,
+            'order': self._order,
+            'projection': self._projection,
+            'limit': self._limit,
+            'after': self._after,
+        }
+        state.update(changes)
+        return FakeQuery(self._store, self._collection, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, _OPERATORS[op_string], value),))
+
+    def order_by(self, field_path, direction=None):
+        return self._copy(order=field_path)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(after=snapshot)
+
+    def _sort_key(self, item):
+        doc_id, data = item
+        if self._order in (None, '__name__'):
+            return doc_id
+        return (data.get(self._order) is None, data.get(self._order), doc_id)
+
+    def stream(self, retry=None, timeout=None):
+        self._store.round_trip()
+        with self._store.lock:
+            items = list(self._store.collections.get(self._collection, {}).items())
+            self._store.reads += 1
+        matches = [
+            (doc_id, data) for doc_id, data in items
+            if all(op(data.get(field), value) for field, op, value in self._filters)
+        ]
+        matches.sort(key=self._sort_key)
+        if isinstance(self._after, dict):
+            # A field-value cursor only compares the ordered field
+            after_value = self._after[self._order]
+            matches = [item for item in matches if item[1].get(self._order) is not None and item[1][self._order] > after_value]
+        elif self._after is not None:
+            after_key = self._sort_key((self._after.id, self._after._data or {}))
+            matches = [item for item in matches if self._sort_key(item) > after_key]
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        for doc_id, data in matches:
+            if self._projection is not None:
+                data = {field: data[field] for field in self._projection if field in data}
+            else:
+                data = copy.copy(data)
+            yield FakeSnapshot(FakeDocumentReference(self._store, self._collection, doc_id), data)
+
+    def get(self, retry=None, timeout=None):
+        return list(self.stream())
+
+    def get_partitions(self, partition_count):
+        yield _FakePartition(self)
+
+
+class _FakePartition:
+    def __init__(self, query):
+        self._query = query
+
+    def query(self):
+        return self._query
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, store, collection):
+        super().__init__(store, collection)
+
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self._store, self._collection, doc_id or uuid.uuid4().hex)
+
+
+class FakeTransaction:
+    def __init__(self, store):
+        self._store = store
+
+    def set(self, reference, data, merge=False):
+        reference.set(data, merge=merge)
+
+    def update(self, reference, data):
+        reference.update(data)
+
+    def delete(self, reference):
+        reference.delete()
+
+
+class FakeWriteBatch:
+    def __init__(self, store):
+        self._store = store
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self._writes.append(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self._writes.append(reference.delete)
+
+    def commit(self, retry=None, timeout=None):
+        with self._store.lock:
+            for write in self._writes:
+                write()
+        self._writes = []
+
+
+def transactional(func):
+    # Stand-in for firestore.transactional: the store lock makes the body atomic
+    def wrapper(transaction, *args, **kwargs):
+        with transaction._store.lock:
+            return func(transaction, *args, **kwargs)
+    return wrapper
+
+
+class FakeFirestore:
+    def __init__(self, latency=0.0):
+        self.collections = {}
+        self.lock = threading.RLock()
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def collection_group(self, name):
+        return FakeCollection(self, name)
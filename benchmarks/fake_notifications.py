@@ -0,0 +1,44 @@
+import threading
+import time
+from types import SimpleNamespace
+
+
+class _FakeTransportClient:
+    def __init__(self, status_code, latency=0.0):
+        self.status_code = status_code
+        self.latency = latency
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def _record(self, payload):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests.append(payload)
+        return SimpleNamespace(status_code=self.status_code, body=b"" if self.status_code == 202 else {})
+
+
+class FakeSendGridClient(_FakeTransportClient):
+    # Stand-in for SendGridAPIClient: records each mail/send payload
+    def __init__(self, latency=0.0):
+        super().__init__(202, latency)
+
+    def send(self, message):
+        return self._record(message)
+
+    @property
+    def recipients(self):
+        return [p['to'][0]['email'] for payload in self.requests for p in payload['personalizations']]
+
+
+class FakeOneSignalClient(_FakeTransportClient):
+    # Stand-in for the OneSignal SDK client: records each notification body
+    def __init__(self, latency=0.0):
+        super().__init__(200, latency)
+
+    def send_notification(self, body):
+        return self._record(body)
+
+    @property
+    def recipients(self):
+        return [user_id for body in self.requests for user_id in body['include_external_user_ids']]
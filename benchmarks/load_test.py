@@ -0,0 +1,218 @@
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import FIRST_EXCEPTION, Future, wait
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+from benchmarks.fake_firestore import FakeFirestore, transactional
+from benchmarks.synthetic import curriculum_csv, seed_user
+
+APP_PATH = os.path.join(REPO_ROOT, "study_dashboard.py")
+APP_TIMEOUT = 600
+RUN_TIMEOUT = 3600
+
+
+def deep_sizeof(obj, seen=None):
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, io.StringIO):
+        size += sys.getsizeof(obj.getvalue())
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def shared_runtime():
+    # AppTest installs a mock Runtime before every run and clears it after, which breaks any session
+    # still running in another thread. All sessions share this one for the whole test instead.
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    return mock.patch.multiple(Runtime, instance=staticmethod(lambda: runtime), exists=staticmethod(lambda: True))
+
+
+def start_session(session, iterations, toggles):
+    # Daemon threads, so a session stuck in a run can't keep the process alive after a failure
+    future = Future()
+    def target():
+        try:
+            future.set_result(session.run(iterations, toggles))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=target, name=f"session-{session.user_id}", daemon=True).start()
+    return future
+
+
+class SimulatedSession:
+    def __init__(self, user_id, recorder, stop):
+        self.user_id = user_id
+        self.email = f"{user_id}@example.com"
+        self.recorder = recorder
+        # Set when another session fails or the run times out, so the remaining sessions stop early
+        self.stop = stop
+        self.at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+
+    def _timed(self, action, step):
+        if self.stop.is_set():
+            raise RuntimeError(f"{self.user_id} stopped before {action}")
+        start = time.perf_counter()
+        step()
+        self.recorder(action, (time.perf_counter() - start) * 1000)
+        if self.at.exception:
+            raise RuntimeError(f"{self.user_id} raised during {action}: {self.at.exception}")
+
+    def sign_in(self):
+        self.at.run()
+        _widget(self.at.text_input, "📧 Email").input(self.email)
+        _widget(self.at.text_input, "🔒 Password").input("load-test")
+        self._timed("sign_in", _widget(self.at.button, "Sign In").click().run)
+        # The page radio is only rendered on the run after sign-in
+        self.at.run()
+        self.at.session_state['notifications_enabled'] = False
+
+    def view(self, page, action):
+        self._timed(action, self.at.sidebar.radio[0].set_value(page).run)
+
+    def toggle_next_subtopic(self):
+        for checkbox in self.at.checkbox:
+            if checkbox.key and checkbox.key.startswith("checkbox_") and not checkbox.value:
+                self._timed("checklist_toggle", checkbox.check().run)
+                return
+
+    def generate_schedule(self):
+        self.view("📅 Schedule", "schedule_view")
+        self._timed("schedule_generate", _widget(self.at.button, "🗓️ Generate Schedule").click().run)
+
+    def memory(self):
+        try:
+            state = self.at.session_state.filtered_state
+        except AttributeError:
+            return 0
+        return deep_sizeof(dict(state))
+
+    def run(self, iterations, toggles):
+        self.sign_in()
+        for _ in range(iterations):
+            self.view("📋 Checklist", "checklist_view")
+            for _ in range(toggles):
+                self.toggle_next_subtopic()
+            self.view("📊 Dashboard", "dashboard_view")
+            self.generate_schedule()
+        return self.memory()
+
+
+def run_load_test(sessions, iterations, toggles, rows, latency_ms, timeout=RUN_TIMEOUT):
+    db = FakeFirestore(latency=latency_ms / 1000)
+    csv_text = curriculum_csv(rows)
+    user_ids = [f"load-user-{i}" for i in range(sessions)]
+    for i, user_id in enumerate(user_ids):
+        seed_user(db, user_id, f"{user_id}@example.com", csv_text, completion=0.2, seed=i)
+
+    latencies = defaultdict(list)
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def recorder(action, elapsed_ms):
+        with lock:
+            latencies[action].append(elapsed_ms)
+
+    def lookup_user(email):
+        return SimpleNamespace(uid=email.split("@")[0])
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with mock.patch("firebase_admin.firestore.client", return_value=db), \
+            mock.patch("firebase_admin.firestore.transactional", transactional), \
+            mock.patch("firebase_admin.auth.get_user_by_email", side_effect=lookup_user), \
+            shared_runtime(), patch_config_options({"global.appTest": True}):
+        futures = [start_session(SimulatedSession(user_id, recorder, stop), iterations, toggles) for user_id in user_ids]
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        failed = [future for future in done if future.exception() is not None]
+        if failed or pending:
+            # Don't wait on the other sessions: they stop at their next step
+            stop.set()
+            tracemalloc.stop()
+            if failed:
+                raise failed[0].exception()
+            raise TimeoutError(f"{len(pending)} session(s) still running after {timeout:.0f}s")
+        session_memory = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'elapsed_s': elapsed,
+        'latencies': latencies,
+        'session_memory': session_memory,
+        'peak_memory': peak_memory,
+        'firestore_reads': db.reads,
+        'firestore_writes': db.writes,
+    }
+
+
+def print_report(report, sessions):
+    all_latencies = np.concatenate([np.asarray(v) for v in report['latencies'].values()]) if report['latencies'] else np.array([])
+    actions = all_latencies.size
+    print(f"Sessions: {sessions}   Actions: {actions}   Elapsed: {report['elapsed_s']:.1f}s   "
+          f"Throughput: {actions / report['elapsed_s']:.1f} actions/s")
+    print(f"Firestore: {report['firestore_reads']} reads, {report['firestore_writes']} writes")
+    print(f"{'action':<20}{'n':>6}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    for action, values in sorted(report['latencies'].items()) + [("all", all_latencies)]:
+        if len(values) == 0:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{action:<20}{len(values):>6}{p50:>12.1f}{p95:>12.1f}{p99:>12.1f}")
+    memory = np.asarray(report['session_memory'], dtype=np.float64) / 1024
+    print(f"Session state: mean {memory.mean():.0f} KiB, max {memory.max():.0f} KiB")
+    print(f"Process peak traced memory: {report['peak_memory'] / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through the dashboard.")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--toggles', type=int, default=3, help="Checklist toggles per iteration.")
+    parser.add_argument('--rows', type=int, default=300, help="Synthetic curriculum size.")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Simulated Firestore round-trip time.")
+    parser.add_argument('--timeout', type=float, default=RUN_TIMEOUT, help="Seconds to wait for all sessions before giving up.")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.iterations, args.toggles, args.rows, args.latency_ms, args.timeout)
+    print_report(report, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
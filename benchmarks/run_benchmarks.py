@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import firestore_access
+import persistence
+import storage
+from benchmarks.fake_firestore import FakeFirestore, transactional
+from benchmarks.synthetic import curriculum_csv, seed_user
+from instrumentation import percentile_summary, reset_samples
+
+APP_PATH = os.path.join(REPO_ROOT, "study_dashboard.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = [100, 1000, 10000, 100000]
+# AppTest materializes every widget, so checklist rendering is only measured up to this size
+CHECKLIST_MAX_ROWS = 10000
+USER_ID = "bench-user"
+USER_EMAIL = "bench@example.com"
+APP_TIMEOUT = 600
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _check(at, rows, step):
+    # A scenario that ends in st.error or an exception would otherwise be timed as a success
+    if at.exception:
+        raise RuntimeError(f"App raised during {step} at {rows} rows: {at.exception}")
+    if at.error:
+        raise RuntimeError(f"App showed an error during {step} at {rows} rows: {[e.value for e in at.error]}")
+
+
+def _check_curriculum_size(at, rows):
+    # Guards against measuring a client left over from a previous size
+    completed = next(metric for metric in at.sidebar.metric if metric.label == "Completed")
+    total = int(completed.value.split("/")[1])
+    if total != rows:
+        raise RuntimeError(f"Scenario for {rows} rows rendered a {total}-subtopic curriculum")
+
+
+def _sign_in(at):
+    at.run()
+    _widget(at.text_input, "📧 Email").input(USER_EMAIL)
+    _widget(at.text_input, "🔒 Password").input("benchmark")
+    _widget(at.button, "Sign In").click().run()
+    # The page radio is only rendered on the run after sign-in
+    at.run()
+
+
+def _go_to(at, page):
+    at.sidebar.radio[0].set_value(page).run()
+
+
+def run_app_scenario(rows, repeats):
+    db = FakeFirestore()
+    csv_text = curriculum_csv(rows)
+    seed_user(db, USER_ID, USER_EMAIL, csv_text)
+
+    # AppTest keeps imported modules between runs, so process-wide clients and queues are reset for each size
+    with mock.patch("firebase_admin.firestore.client", return_value=db), \
+            mock.patch("firebase_admin.firestore.transactional", transactional), \
+            mock.patch("firebase_admin.auth.get_user_by_email", return_value=SimpleNamespace(uid=USER_ID)), \
+            mock.patch.object(firestore_access, "_managed", None), \
+            mock.patch.object(storage, "_sqlite_stores", {}), \
+            mock.patch.object(persistence, "write_queue", persistence.WriteBehindQueue()):
+        for _ in range(repeats):
+            at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+            _sign_in(at)
+            _check(at, rows, "sign-in")
+            _go_to(at, "📊 Dashboard")
+            _check(at, rows, "dashboard")
+            _check_curriculum_size(at, rows)
+            if rows <= CHECKLIST_MAX_ROWS:
+                _go_to(at, "📋 Checklist")
+                _check(at, rows, "checklist")
+            _go_to(at, "📅 Schedule")
+            _widget(at.button, "🗓️ Generate Schedule").click().run()
+            _check(at, rows, "schedule")
+            _go_to(at, "⚙️ Settings")
+            _widget(at.button, "📤 Export Progress").click().run()
+            _check(at, rows, "progress export")
+            _widget(at.button, "📥 Export Firestore Data").click().run()
+            _check(at, rows, "archive export")
+
+
+def run_benchmarks(sizes, repeats):
+    results = {}
+    for rows in sizes:
+        reset_samples()
+        start = time.perf_counter()
+        run_app_scenario(rows, repeats)
+        elapsed = time.perf_counter() - start
+        for row in percentile_summary():
+            results[f"{row['name']}@{rows}"] = {
+                'p50_ms': row['p50_ms'],
+                'p95_ms': row['p95_ms'],
+                'count': row['count'],
+            }
+        print(f"{rows:>7} rows: {elapsed:.1f}s")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    regressions = []
+    for metric, stats in results.items():
+        reference = baseline.get(metric)
+        if reference is None or reference['p50_ms'] <= 0:
+            continue
+        limit = reference['p50_ms'] * (1 + tolerance)
+        if stats['p50_ms'] > limit:
+            regressions.append((metric, reference['p50_ms'], stats['p50_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against synthetic curricula and an in-memory Firestore.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run's results.")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed p50 slowdown before a metric counts as a regression.")
+    parser.add_argument('--output', default=None, help="Also write this run's results to a JSON file.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeats)
+    for metric, stats in sorted(results.items()):
+        print(f"{metric:<45} p50={stats['p50_ms']:>10.2f}ms  p95={stats['p95_ms']:>10.2f}ms  n={stats['count']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline.")
+        sys.exit(1)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\nPerformance regressions:")
+        for metric, before, after in regressions:
+            print(f"  {metric}: {before:.2f}ms -> {after:.2f}ms")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta, timezone
+
+SUBTOPICS_PER_CHAPTER = 8
+CHAPTERS_PER_MODULE = 10
+
+
+def generate_curriculum_rows(rows, subtopics_per_chapter=SUBTOPICS_PER_CHAPTER, chapters_per_module=CHAPTERS_PER_MODULE):
+    generated = []
+    for i in range(rows):
+        chapter_index = i // subtopics_per_chapter
+        module_index = chapter_index // chapters_per_module
+        module = f"Module {module_index + 1}: Synthetic Module {module_index + 1}"
+        chapter = f"Chapter {module_index + 1}.{chapter_index % chapters_per_module + 1}: Synthetic Chapter"
+        subtopic = f"Subtopic {i % subtopics_per_chapter + 1} of {chapter_index + 1}: Concepts, examples, exercises"
+        project = f"Project {chapter_index + 1}: Build and document a worked example for this chapter."
+        generated.append((module, chapter, subtopic, project))
+    return generated
+
+
+def curriculum_csv(rows, **kwargs):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerow(['Module', 'Chapter', 'Subtopic', 'Project'])
+    writer.writerows(generate_curriculum_rows(rows, **kwargs))
+    return buffer.getvalue()
+
+
+def generate_progress_history(curriculum_rows, completion=0.4, history_days=180, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    chapters = {}
+    for module, chapter, subtopic, _ in curriculum_rows:
+        chapters.setdefault((module, chapter), []).append(subtopic)
+
+    completed = []
+    for (module, chapter), subtopics in chapters.items():
+        # Subtopics unlock sequentially, so completions are always a prefix of the chapter
+        done = sum(1 for _ in subtopics if rng.random() < completion)
+        for subtopic in subtopics[:done]:
+            completed_at = now - timedelta(days=rng.uniform(0, history_days))
+            completed.append((module, chapter, subtopic, completed_at))
+
+    sessions = []
+    for day in range(history_days):
+        if rng.random() < 0.6:
+            started_at = now - timedelta(days=day, hours=rng.uniform(0, 12))
+            sessions.append((started_at, rng.randint(1, 4)))
+    return completed, sessions
+
+
+def seed_user(db, user_id, email, csv_text, completion=0.4, history_days=180, seed=0):
+    rows = list(csv.reader(io.StringIO(csv_text)))[1:]
+    completed, sessions = generate_progress_history(rows, completion, history_days, seed)
+
+    db.collection('users').document(user_id).set({'email': email, 'curriculum_csv': csv_text})
+    for module, chapter, subtopic, completed_at in completed:
+        doc_id = f"{user_id}_{module}_{chapter}_{subtopic}".replace(" ", "_")
+        db.collection('progress').document(doc_id).set({
+            'user_id': user_id,
+            'module': module,
+            'chapter': chapter,
+            'subtopic': subtopic,
+            'completed': True,
+            'completed_at': completed_at,
+            'created_at': completed_at,
+        })
+    for i, (started_at, hours) in enumerate(sessions):
+        db.collection('study_sessions').document(f"{user_id}_session-{i}").set({
+            'user_id': user_id,
+            'session_id': f"session-{i}",
+            'date': started_at.date().isoformat(),
+            'started_at': started_at,
+            'hours': hours,
+        })
+    return len(completed), len(sessions)
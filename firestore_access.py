@@ -0,0 +1,259 @@
+import functools
+import itertools
+import os
+import random
+import threading
+import time
+
+from google.api_core import exceptions as api_exceptions
+
+POOL_SIZE = int(os.getenv("STUDY_DASHBOARD_FIRESTORE_POOL", "1"))
+
+READ_DEADLINE = 10.0
+WRITE_DEADLINE = 5.0
+STREAM_DEADLINE = 30.0
+
+TRANSIENT_ERRORS = (
+    api_exceptions.Aborted,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.TooManyRequests,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Client, collection and query methods that return another reference or query, and document writes;
+# shared with instrumentation.InstrumentedFirestore
+CHAINABLE_METHODS = frozenset({
+    'collection', 'collection_group', 'document', 'where', 'order_by', 'limit', 'limit_to_last',
+    'offset', 'select', 'start_at', 'start_after', 'end_at', 'end_before',
+})
+WRITE_METHODS = frozenset({'set', 'update', 'delete', 'create'})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class FirestoreUnavailable(Exception):
+    pass
+
+
+class RetryPolicy:
+    def __init__(self, attempts=3, base_delay=0.1, max_delay=2.0, budget=15.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def backoff(self, attempt):
+        # Full jitter keeps sessions that failed together from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                # Let a single call through to probe whether Firestore recovered
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self):
+        # The probe ended without telling us anything about Firestore's health; let the next call probe instead
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class ClientPool:
+    def __init__(self, factory, size=POOL_SIZE):
+        self._clients = [factory(index) for index in range(max(1, size))]
+        self._cycle = itertools.cycle(self._clients)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def acquire(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+class ManagedFirestore:
+    _READS = {'get'}
+
+    def __init__(self, target, policy, breaker, metrics_hook=None, pool=None, collection=None):
+        self._target = target
+        self._policy = policy
+        self._breaker = breaker
+        self._metrics_hook = metrics_hook
+        self._pool = pool
+        self._collection = collection
+
+    @property
+    def raw(self):
+        return self._target
+
+    @property
+    def breaker(self):
+        return self._breaker
+
+    def _child(self, target, collection):
+        return ManagedFirestore(target, self._policy, self._breaker, self._metrics_hook, collection=collection)
+
+    def __getattr__(self, name):
+        target = self._target
+        if self._pool is not None and name in ('collection', 'collection_group', 'transaction'):
+            target = self._pool.acquire()
+        attr = getattr(target, name)
+        if name in CHAINABLE_METHODS:
+            def chain(*args, **kwargs):
+                collection = self._collection
+                if name in ('collection', 'collection_group') and args:
+                    collection = args[0]
+                return self._child(attr(*args, **kwargs), collection)
+            return chain
+        if name == 'stream':
+            return functools.partial(self._stream, attr)
+        if name in self._READS:
+            return functools.partial(self._deadline_call, attr, name, READ_DEADLINE)
+        if name in WRITE_METHODS:
+            return functools.partial(self._deadline_call, attr, name, WRITE_DEADLINE)
+        return attr
+
+    def _emit(self, operation, start, attempts, outcome):
+        if self._metrics_hook is not None:
+            self._metrics_hook(operation, self._collection, (time.perf_counter() - start) * 1000, attempts, outcome)
+
+    def _deadline_call(self, method, operation, deadline, *args, **kwargs):
+        kwargs.setdefault('timeout', deadline)
+        # Our own policy owns retries, so the client library's default retry is disabled
+        kwargs.setdefault('retry', None)
+        return self.run(operation, lambda: method(*args, **kwargs))
+
+    def run(self, operation, func):
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if not self._breaker.allow():
+                self._emit(operation, start, attempt, "rejected")
+                raise FirestoreUnavailable("Firestore is temporarily unavailable; try again shortly.")
+            attempt += 1
+            try:
+                result = func()
+            except TRANSIENT_ERRORS as e:
+                self._breaker.record_failure()
+                delay = self._policy.backoff(attempt)
+                elapsed = time.perf_counter() - start
+                if attempt >= self._policy.attempts or elapsed + delay > self._policy.budget:
+                    self._emit(operation, start, attempt, "failed")
+                    raise FirestoreUnavailable(f"Firestore {operation} failed after {attempt} attempt(s): {e}") from e
+                time.sleep(delay)
+                continue
+            except api_exceptions.GoogleAPICallError:
+                # Firestore answered, just not with a result (NotFound, PermissionDenied, ...), so it is up
+                self._breaker.record_success()
+                self._emit(operation, start, attempt, "error")
+                raise
+            except BaseException:
+                self._breaker.release_probe()
+                raise
+            self._breaker.record_success()
+            self._emit(operation, start, attempt, "ok")
+            return result
+
+    def _stream(self, stream, *args, **kwargs):
+        kwargs.setdefault('timeout', STREAM_DEADLINE)
+        kwargs.setdefault('retry', None)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if not self._breaker.allow():
+                self._emit("stream", start, attempt, "rejected")
+                raise FirestoreUnavailable("Firestore is temporarily unavailable; try again shortly.")
+            attempt += 1
+            yielded = 0
+            settled = False
+            try:
+                for doc in stream(*args, **kwargs):
+                    yielded += 1
+                    yield doc
+                settled = True
+            except TRANSIENT_ERRORS as e:
+                settled = True
+                self._breaker.record_failure()
+                delay = self._policy.backoff(attempt)
+                elapsed = time.perf_counter() - start
+                # A stream can only be restarted before the caller has seen any documents
+                if yielded or attempt >= self._policy.attempts or elapsed + delay > self._policy.budget:
+                    self._emit("stream", start, attempt, "failed")
+                    raise FirestoreUnavailable(f"Firestore stream failed after {attempt} attempt(s): {e}") from e
+                time.sleep(delay)
+                continue
+            except api_exceptions.GoogleAPICallError:
+                settled = True
+                self._breaker.record_success()
+                self._emit("stream", start, attempt, "error")
+                raise
+            finally:
+                # Abandoned by the caller (GeneratorExit) or failed outside Firestore
+                if not settled:
+                    self._breaker.release_probe()
+            self._breaker.record_success()
+            self._emit("stream", start, attempt, "ok")
+            return
+
+
+_managed = None
+_managed_lock = threading.Lock()
+
+
+def managed_client(factory, metrics_hook=None, pool_size=POOL_SIZE, policy=None, breaker=None):
+    global _managed
+    # Streamlit re-executes the script on every rerun; the pool is built once per process
+    with _managed_lock:
+        if _managed is None:
+            pool = ClientPool(factory, pool_size)
+            _managed = ManagedFirestore(
+                pool.acquire(), policy or RetryPolicy(), breaker or CircuitBreaker(), metrics_hook, pool=pool
+            )
+        return _managed
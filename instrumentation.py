@@ -0,0 +1,149 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from firestore_access import CHAINABLE_METHODS, WRITE_METHODS
+
+SAMPLE_WINDOW = 1000
+PERCENTILES = [50, 95, 99]
+
+logger = logging.getLogger("study_dashboard.perf")
+if os.getenv("STUDY_DASHBOARD_PERF_LOG") and not logger.handlers:
+    _handler = logging.FileHandler(os.getenv("STUDY_DASHBOARD_PERF_LOG"))
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_local = threading.local()
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+_samples_lock = threading.Lock()
+
+
+def record(name, kind, elapsed_ms, **fields):
+    entry = {'name': name, 'kind': kind, 'ms': round(elapsed_ms, 3), **fields}
+    with _samples_lock:
+        _samples[(kind, name)].append(elapsed_ms)
+    spans = getattr(_local, 'spans', None)
+    if spans is not None:
+        spans.append(entry)
+    return entry
+
+
+@contextmanager
+def span(name, kind="block", **fields):
+    start = time.perf_counter()
+    extra = dict(fields)
+    try:
+        yield extra
+    finally:
+        record(name, kind, (time.perf_counter() - start) * 1000, **extra)
+
+
+def timed(name, kind="render"):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_rerun(sink=None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _local.spans = []
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                total_ms = (time.perf_counter() - start) * 1000
+                spans = _local.spans
+                _local.spans = None
+                record("rerun", "rerun", total_ms)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(json.dumps({'event': 'rerun', 'ms': round(total_ms, 3), 'spans': spans}, default=str))
+                if sink is not None:
+                    sink(spans, total_ms)
+        return wrapper
+    return decorator
+
+
+def percentile_summary():
+    with _samples_lock:
+        snapshot = {key: np.fromiter(values, dtype=np.float64) for key, values in _samples.items() if values}
+    rows = []
+    for (kind, name), values in sorted(snapshot.items()):
+        p50, p95, p99 = np.percentile(values, PERCENTILES)
+        rows.append({
+            'kind': kind,
+            'name': name,
+            'count': int(values.size),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(values.max()), 2),
+        })
+    return rows
+
+
+def reset_samples():
+    with _samples_lock:
+        _samples.clear()
+
+
+class InstrumentedFirestore:
+    def __init__(self, target, collection=None):
+        self._target = target
+        self._collection = collection
+
+    @property
+    def raw(self):
+        return getattr(self._target, 'raw', self._target)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in CHAINABLE_METHODS:
+            def chain(*args, **kwargs):
+                collection = self._collection
+                if name in ('collection', 'collection_group') and args:
+                    collection = args[0]
+                return InstrumentedFirestore(attr(*args, **kwargs), collection)
+            return chain
+        if name == 'stream':
+            return functools.partial(self._stream, attr)
+        if name == 'get':
+            return functools.partial(self._timed_call, attr, "firestore.get")
+        if name in WRITE_METHODS:
+            return functools.partial(self._timed_call, attr, f"firestore.{name}")
+        return attr
+
+    def _stream(self, stream, *args, **kwargs):
+        start = time.perf_counter()
+        documents = 0
+        try:
+            for doc in stream(*args, **kwargs):
+                documents += 1
+                yield doc
+        finally:
+            record("firestore.stream", "firestore", (time.perf_counter() - start) * 1000,
+                    collection=self._collection, documents=documents)
+
+    def _timed_call(self, method, name, *args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = method(*args, **kwargs)
+            return result
+        finally:
+            documents = len(result) if isinstance(result, list) else 1
+            record(name, "firestore", (time.perf_counter() - start) * 1000,
+                    collection=self._collection, documents=documents)
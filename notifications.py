@@ -0,0 +1,246 @@
+import argparse
+import html
+import os
+import time
+
+from onesignal_sdk.client import Client as OneSignalClient
+from sendgrid import SendGridAPIClient
+
+from storage import open_storage
+
+BADGE = "badge"
+STREAK = "streak"
+SCHEDULE_REMINDER = "schedule_reminder"
+
+STREAK_MILESTONES = (3, 7, 14, 30, 60, 100)
+DIGEST_INTERVAL = int(os.getenv("STUDY_DASHBOARD_DIGEST_INTERVAL", "3600"))
+DIGEST_PAGE_SIZE = 5000
+# Dispatch passes an event may fail in before it is dropped, so one bad address can't hold up the queue
+MAX_DELIVERY_ATTEMPTS = 5
+
+# Provider limits per API request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+ONESIGNAL_MAX_EXTERNAL_IDS = 2000
+
+# Every digest shares one email body; each personalization substitutes its own user's events
+DIGEST_PLACEHOLDER = "-digest-"
+
+_HEADINGS = {
+    BADGE: "🏆 Badges earned",
+    STREAK: "🔥 Streaks",
+    SCHEDULE_REMINDER: "📅 Coming up",
+}
+
+
+class DigestSendError(Exception):
+    pass
+
+
+class Digest:
+    __slots__ = ('user_id', 'email', 'events')
+
+    def __init__(self, user_id, email):
+        self.user_id = user_id
+        self.email = email
+        self.events = []
+
+    def subject(self):
+        badges = sum(1 for event in self.events if event['kind'] == BADGE)
+        if badges:
+            return f"Your study digest: {badges} new badge{'s' if badges > 1 else ''}"
+        return "Your study digest"
+
+    def push_message(self):
+        if len(self.events) == 1:
+            return self.events[0]['message']
+        # Short and generic so users with the same kinds of events share one push request
+        kinds = sorted({event['kind'] for event in self.events}, key=list(_HEADINGS).index)
+        return "New in your study digest: " + ", ".join(_HEADINGS[kind].split(" ", 1)[1].lower() for kind in kinds)
+
+    def html(self):
+        sections = []
+        for kind, heading in _HEADINGS.items():
+            messages = [event['message'] for event in self.events if event['kind'] == kind]
+            if messages:
+                items = "".join(f"<li>{html.escape(message)}</li>" for message in messages)
+                sections.append(f"<h3>{heading}</h3><ul>{items}</ul>")
+        return "".join(sections)
+
+
+def group_digests(events):
+    digests = {}
+    for event in events:
+        digest = digests.get(event['user_id'])
+        if digest is None:
+            digest = digests[event['user_id']] = Digest(event['user_id'], event.get('email'))
+        digest.events.append(event)
+    return list(digests.values())
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _no_op(digests):
+    pass
+
+
+class SendGridTransport:
+    channel = "email"
+
+    def __init__(self, client, from_email):
+        self.client = client
+        self.from_email = from_email
+
+    def send(self, digests, delivered=_no_op):
+        # delivered(digests) is called after each accepted request, so a later failure doesn't resend them.
+        # A rejected request doesn't stop the rest; the errors are raised together at the end
+        requests = 0
+        errors = []
+        recipients = [digest for digest in digests if digest.email]
+        # Users without an email address have nothing to send on this channel
+        delivered([digest for digest in digests if not digest.email])
+        for batch in _chunks(recipients, SENDGRID_MAX_PERSONALIZATIONS):
+            payload = {
+                'from': {'email': self.from_email},
+                'subject': "Your study digest",
+                'content': [{'type': 'text/html', 'value': DIGEST_PLACEHOLDER}],
+                'personalizations': [
+                    {
+                        'to': [{'email': digest.email}],
+                        'subject': digest.subject(),
+                        'substitutions': {DIGEST_PLACEHOLDER: digest.html()},
+                    }
+                    for digest in batch
+                ],
+            }
+            response = self.client.send(payload)
+            requests += 1
+            if response.status_code != 202:
+                errors.append(f"SendGrid returned {response.status_code}: {response.body}")
+                continue
+            delivered(batch)
+        if errors:
+            raise DigestSendError("; ".join(errors))
+        return requests
+
+
+class OneSignalTransport:
+    channel = "push"
+
+    def __init__(self, client):
+        self.client = client
+
+    def send(self, digests, delivered=_no_op):
+        requests = 0
+        errors = []
+        by_message = {}
+        for digest in digests:
+            by_message.setdefault(digest.push_message(), []).append(digest)
+        for message, recipients in by_message.items():
+            for batch in _chunks(recipients, ONESIGNAL_MAX_EXTERNAL_IDS):
+                # Targets only these users' devices, which are tagged with their user id as external id
+                response = self.client.send_notification({
+                    'contents': {'en': message},
+                    'include_external_user_ids': [digest.user_id for digest in batch],
+                    'channel_for_external_user_ids': "push",
+                })
+                requests += 1
+                if response.status_code != 200:
+                    errors.append(f"OneSignal returned {response.status_code}: {response.body}")
+                    continue
+                delivered(batch)
+        if errors:
+            raise DigestSendError("; ".join(errors))
+        return requests
+
+
+def default_transports():
+    transports = []
+    if os.getenv("SENDGRID_API_KEY") and os.getenv("FROM_EMAIL"):
+        transports.append(SendGridTransport(SendGridAPIClient(os.getenv("SENDGRID_API_KEY")), os.getenv("FROM_EMAIL")))
+    if os.getenv("ONESIGNAL_APP_ID") and os.getenv("ONESIGNAL_API_KEY"):
+        transports.append(OneSignalTransport(
+            OneSignalClient(app_id=os.getenv("ONESIGNAL_APP_ID"), rest_api_key=os.getenv("ONESIGNAL_API_KEY"))
+        ))
+    return transports
+
+
+def dispatch_digests(storage, transports, page_size=DIGEST_PAGE_SIZE, max_attempts=MAX_DELIVERY_ATTEMPTS):
+    totals = {'events': 0, 'digests': 0, 'requests': 0, 'dropped': 0}
+    channels = {transport.channel for transport in transports}
+    errors = []
+    after_user_id = None
+    while True:
+        events = storage.pending_notifications(page_size, after_user_id)
+        if not events:
+            break
+        full_page = len(events) == page_size
+        if full_page:
+            # The last user may continue on the next page; leave them for it so each user gets one digest
+            whole_users = [event for event in events if event['user_id'] != events[-1]['user_id']]
+            events = whole_users or events
+        # Paging with a cursor means events that keep failing don't hide the users after them
+        after_user_id = events[-1]['user_id']
+        failed = {}
+        for transport in transports:
+            # Each channel only gets the events it hasn't delivered yet, and records every accepted request
+            digests = group_digests([event for event in events if transport.channel not in event['sent_via']])
+            def delivered(batch, channel=transport.channel):
+                event_ids = [event['id'] for digest in batch for event in digest.events]
+                if event_ids:
+                    storage.mark_notifications_sent(event_ids, channel)
+                    for digest in batch:
+                        for event in digest.events:
+                            event['sent_via'].append(channel)
+            try:
+                totals['requests'] += transport.send(digests, delivered)
+            except Exception as e:
+                errors.append(f"{type(transport).__name__}: {e}")
+                failed.update((event['id'], event) for event in events if transport.channel not in event['sent_via'])
+        if failed:
+            storage.record_notification_failures(list(failed))
+        done = [event for event in events if channels.issubset(event['sent_via'])]
+        dropped = [event for event in failed.values() if event['attempts'] + 1 >= max_attempts]
+        storage.delete_notifications([event['id'] for event in done + dropped])
+        totals['events'] += len(done)
+        totals['digests'] += len({event['user_id'] for event in done})
+        totals['dropped'] += len(dropped)
+        if not full_page:
+            break
+    if errors:
+        raise DigestSendError(f"Sent {totals['events']} events, dropped {totals['dropped']}; " + "; ".join(errors))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send queued badge, streak and schedule notifications as per-user digests.")
+    parser.add_argument('--storage', choices=['firestore', 'sqlite'], default=None)
+    parser.add_argument('--sqlite-path', default=None)
+    parser.add_argument('--service-account', default=None, help="Path to a service account JSON file.")
+    parser.add_argument('--loop', action='store_true', help="Keep running, sending digests every STUDY_DASHBOARD_DIGEST_INTERVAL seconds.")
+    parser.add_argument('--page-size', type=int, default=DIGEST_PAGE_SIZE)
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, args.sqlite_path, args.service_account)
+    transports = default_transports()
+    if not transports:
+        raise SystemExit("Neither SendGrid nor OneSignal is configured; see setup_guide.md.")
+    while True:
+        start = time.perf_counter()
+        try:
+            totals = dispatch_digests(storage, transports, args.page_size)
+            print(f"Sent {totals['digests']} digests ({totals['events']} events) in {totals['requests']} API requests "
+                  f"in {time.perf_counter() - start:.1f}s; dropped {totals['dropped']} undeliverable events")
+        except Exception as e:
+            if not args.loop:
+                raise SystemExit(str(e))
+            print(e)
+        if not args.loop:
+            return
+        time.sleep(DIGEST_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+WRITE_WORKERS = 4
+# Outcomes of a session that hasn't submitted or drained for this long are dropped; its session has ended
+OUTCOME_TTL_SECONDS = 3600
+
+SAVED = "saved"
+FAILED = "failed"
+CONFLICT = "conflict"
+
+
+class WriteJob:
+    __slots__ = ('key', 'write', 'payload')
+
+    def __init__(self, key, write, payload):
+        self.key = key
+        self.write = write
+        self.payload = payload
+
+
+class WriteBehindQueue:
+    def __init__(self, workers=WRITE_WORKERS, outcome_ttl=OUTCOME_TTL_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="write-behind")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._running = set()
+        self._in_flight = defaultdict(int)
+        self._outcomes = defaultdict(deque)
+        # Sessions by last submit or drain, oldest first
+        self._last_seen = OrderedDict()
+        self._outcome_ttl = outcome_ttl
+
+    def _touch(self, session_id):
+        now = time.monotonic()
+        self._last_seen[session_id] = now
+        self._last_seen.move_to_end(session_id)
+        while len(self._last_seen) > 1:
+            oldest, seen = next(iter(self._last_seen.items()))
+            if now - seen < self._outcome_ttl:
+                return
+            del self._last_seen[oldest]
+            self._outcomes.pop(oldest, None)
+            self._in_flight.pop(oldest, None)
+
+    def submit(self, session_id, key, write, payload):
+        pending_key = (session_id, key)
+        with self._lock:
+            self._touch(session_id)
+            # Coalesce: a queued write for the same key is replaced by the newer one
+            already_queued = pending_key in self._pending
+            self._pending[pending_key] = WriteJob(key, write, payload)
+            if already_queued:
+                return
+            self._in_flight[session_id] += 1
+            # While a write for this key is running, the next one starts when it finishes, so writes land in order
+            start = pending_key not in self._running
+            self._running.add(pending_key)
+        if start:
+            self._executor.submit(self._run, session_id, pending_key)
+
+    def _run(self, session_id, pending_key):
+        with self._lock:
+            job = self._pending.pop(pending_key)
+        try:
+            server_value = job.write()
+            outcome = (SAVED, job, None) if server_value is None else (CONFLICT, job, server_value)
+        except Exception as e:
+            outcome = (FAILED, job, e)
+        with self._lock:
+            # A session that expired while its write ran has no one left to report to
+            if session_id in self._last_seen:
+                self._outcomes[session_id].append(outcome)
+            follow_up = pending_key in self._pending
+            if not follow_up:
+                self._running.discard(pending_key)
+        if follow_up:
+            self._executor.submit(self._run, session_id, pending_key)
+
+    def drain(self, session_id):
+        with self._lock:
+            self._touch(session_id)
+            outcomes = self._outcomes.pop(session_id, deque())
+            self._in_flight[session_id] -= len(outcomes)
+            if self._in_flight[session_id] <= 0:
+                self._in_flight.pop(session_id, None)
+        return list(outcomes)
+
+    def pending_count(self, session_id):
+        with self._lock:
+            return self._in_flight.get(session_id, 0)
+
+
+write_queue = WriteBehindQueue()
@@ -0,0 +1,205 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from study_core.timeline import StudyTimeline
+
+REPORT_CACHE_SIZE = 256
+SCHEDULE_COLUMNS = ['Date', 'Day', 'Time', 'Duration', 'Module', 'Subtopic']
+
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+_report_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="progress-report")
+
+
+def build_report_payload(user_email, module_completion, badges, study_hours, streak, schedule):
+    return {
+        'user_email': user_email or "",
+        'modules': [
+            {'module': module, 'completed': completed, 'total': total}
+            for module, completed, total in module_completion
+        ],
+        'badges': sorted(badges),
+        'study_hours': study_hours,
+        'streak': streak,
+        'schedule': [
+            {column: str(entry.get(column, "")) for column in SCHEDULE_COLUMNS}
+            for entry in schedule
+        ],
+    }
+
+
+def report_fingerprint(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _table(rows, col_widths=None):
+    table = Table(rows, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#b3b3b3')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f1f5f9')]),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    return table
+
+
+def render_progress_report(payload):
+    styles = getSampleStyleSheet()
+    cell = styles['BodyText'].clone('ReportCell', fontSize=8, leading=10)
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title="Study Progress Report",
+                            leftMargin=0.6 * inch, rightMargin=0.6 * inch)
+
+    total = sum(m['total'] for m in payload['modules'])
+    completed = sum(m['completed'] for m in payload['modules'])
+    percentage = (completed / total * 100) if total > 0 else 0
+
+    story = [
+        Paragraph("Study Progress Report", styles['Title']),
+        Paragraph(f"{escape(payload['user_email'])} &mdash; generated {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']),
+        Spacer(1, 12),
+        Paragraph("Overview", styles['Heading2']),
+        _table([
+            ['Overall Completion', 'Subtopics Done', 'Study Hours', 'Streak'],
+            [f"{percentage:.1f}%", f"{completed}/{total}", f"{payload['study_hours']:.1f}", f"{payload['streak']} days"],
+        ]),
+        Spacer(1, 12),
+        Paragraph("Completion by Module", styles['Heading2']),
+    ]
+
+    module_rows = [['Module', 'Completed', 'Total', 'Completion']]
+    for m in payload['modules']:
+        rate = (m['completed'] / m['total'] * 100) if m['total'] > 0 else 0
+        module_rows.append([Paragraph(escape(m['module']), cell), m['completed'], m['total'], f"{rate:.1f}%"])
+    story.append(_table(module_rows, col_widths=[4.2 * inch, 0.9 * inch, 0.7 * inch, 1.0 * inch]))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Badges", styles['Heading2']))
+    story.append(Paragraph(escape(", ".join(payload['badges'])) if payload['badges'] else "No badges earned yet.", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Current Schedule", styles['Heading2']))
+    if payload['schedule']:
+        schedule_rows = [SCHEDULE_COLUMNS] + [
+            [Paragraph(escape(entry[column]), cell) for column in SCHEDULE_COLUMNS]
+            for entry in payload['schedule']
+        ]
+        story.append(_table(schedule_rows, col_widths=[0.8 * inch, 0.8 * inch, 0.5 * inch, 0.6 * inch, 0.8 * inch, 3.3 * inch]))
+    else:
+        story.append(Paragraph("No schedule generated.", styles['Normal']))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def get_cached_report(fingerprint):
+    with _report_cache_lock:
+        pdf = _report_cache.get(fingerprint)
+        if pdf is not None:
+            _report_cache.move_to_end(fingerprint)
+        return pdf
+
+
+def _render_and_cache(fingerprint, payload):
+    pdf = render_progress_report(payload)
+    with _report_cache_lock:
+        _report_cache[fingerprint] = pdf
+        _report_cache.move_to_end(fingerprint)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return pdf
+
+
+def submit_progress_report(payload):
+    fingerprint = report_fingerprint(payload)
+    return fingerprint, _report_executor.submit(_render_and_cache, fingerprint, payload)
+
+
+def _render_report_file(job):
+    path, payload = job
+    with open(path, 'wb') as f:
+        f.write(render_progress_report(payload))
+    return path
+
+
+def generate_bulk_reports(payloads, out_dir, max_workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [
+        (os.path.join(out_dir, f"{user_id}.pdf"), payload)
+        for user_id, payload in payloads.items()
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_report_file, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def build_payloads_from_store(store_dir, curriculum_csv):
+    from admin_analytics import load_collection, load_curriculum_index
+
+    curriculum = load_curriculum_index(curriculum_csv)
+    module_totals = curriculum.groupby('module', sort=False).size()
+    progress = load_collection(store_dir, 'progress')
+    progress = progress[progress['completed'].fillna(False).astype(bool)]
+    completed = progress.merge(curriculum[['module', 'chapter', 'subtopic']], on=['module', 'chapter', 'subtopic'])
+    completed_matrix = completed.groupby(['user_id', 'module']).size().unstack(fill_value=0).reindex(
+        columns=module_totals.index, fill_value=0
+    )
+    badges = load_collection(store_dir, 'badges').groupby('user_id')['badge_name'].agg(list)
+    sessions = load_collection(store_dir, 'study_sessions')
+    timelines = {
+        user_id: StudyTimeline(group[['date', 'hours']].to_dict('records'))
+        for user_id, group in sessions.groupby('user_id')
+    }
+
+    user_ids = set(progress['user_id']) | set(badges.index) | set(timelines)
+    payloads = {}
+    for user_id in user_ids:
+        counts = completed_matrix.loc[user_id] if user_id in completed_matrix.index else {}
+        module_completion = [
+            (module, int(counts.get(module, 0)), int(total))
+            for module, total in module_totals.items()
+        ]
+        timeline = timelines.get(user_id) or StudyTimeline()
+        payloads[user_id] = build_report_payload(
+            user_id,
+            module_completion,
+            badges.get(user_id, []),
+            timeline.total_hours,
+            timeline.current_streak(),
+            [],
+        )
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF progress reports for every user in an analytics store.")
+    parser.add_argument('--store', default='analytics_store', help="Parquet store written by admin_analytics.py export.")
+    parser.add_argument('--curriculum', required=True, help="Curriculum CSV used to compute module totals.")
+    parser.add_argument('--out', default='progress_reports')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    payloads = build_payloads_from_store(args.store, args.curriculum)
+    paths = generate_bulk_reports(payloads, args.out, args.workers)
+    print(f"{len(paths)} reports written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from notifications import SCHEDULE_REMINDER, default_transports, group_digests
+from storage import open_storage
+from study_core.reminders import DEFAULT_LEAD_TIMES, ReminderQueue, session_start
+from study_core.timer import format_duration
+
+POLL_INTERVAL = 30
+SCHEDULE_PAGE_SIZE = 1000
+# A reminder a channel failed to deliver is retried after 1, 2, 4, ... minutes, up to this many times
+RETRY_BASE = timedelta(minutes=1)
+MAX_RETRIES = 5
+
+logger = logging.getLogger("study_dashboard.reminders")
+
+
+def lead_times_from_env():
+    minutes = os.getenv("STUDY_DASHBOARD_REMINDER_LEAD_MINUTES")
+    if not minutes:
+        return DEFAULT_LEAD_TIMES
+    return tuple(timedelta(minutes=int(value)) for value in minutes.split(",") if value.strip())
+
+
+def reminder_message(reminder):
+    session = reminder.session
+    return f"Starts in {format_duration(reminder.lead)}: {session['Subtopic']} ({session['Module']}) at {session['Time']} on {session['Day']}"
+
+
+class ReminderService:
+    def __init__(self, storage, transports, lead_times=DEFAULT_LEAD_TIMES):
+        self.storage = storage
+        self.transports = transports
+        self.lead_times = lead_times
+        self.queue = ReminderQueue()
+        self.watermark = None
+
+    def refresh(self, now):
+        # Only schedules saved since the last poll are re-read; the first call loads all of them
+        changed = 0
+        for record in self.storage.schedules_updated_since(self.watermark, SCHEDULE_PAGE_SIZE):
+            if record['reminders_enabled']:
+                self.queue.reschedule(record['user_id'], record['sessions'], self.lead_times, now, payload=record.get('email'))
+            else:
+                self.queue.cancel_user(record['user_id'])
+            self.watermark = record['updated_at']
+            changed += 1
+        return changed
+
+    def fire_due(self, now):
+        due = self.queue.pop_due(now)
+        if not due:
+            return 0
+        events = [
+            {'user_id': reminder.user_id, 'email': reminder.payload, 'kind': SCHEDULE_REMINDER,
+             'message': reminder_message(reminder), 'reminder': reminder}
+            for reminder in due
+        ]
+        # Reminders that come due together go out in the same bulk requests as digests; a retry only
+        # goes to the channels that haven't delivered it yet
+        for transport in self.transports:
+            pending = [event for event in events if transport.channel not in event['reminder'].sent_via]
+            if not pending:
+                continue
+            def delivered(batch, channel=transport.channel):
+                for digest in batch:
+                    for event in digest.events:
+                        event['reminder'].sent_via.add(channel)
+            try:
+                transport.send(group_digests(pending), delivered)
+            except Exception as e:
+                logger.warning("%s failed for %d reminder(s): %s", type(transport).__name__, len(pending), e)
+        channels = {transport.channel for transport in self.transports}
+        for reminder in due:
+            if not channels.issubset(reminder.sent_via):
+                self.retry(reminder, now)
+        return len(due)
+
+    def retry(self, reminder, now):
+        reminder.attempts += 1
+        fire_at = now + RETRY_BASE * 2 ** (reminder.attempts - 1)
+        if reminder.attempts > MAX_RETRIES or fire_at >= session_start(reminder.session):
+            logger.error("Giving up on the %s reminder for %s after %d attempt(s)", format_duration(reminder.lead), reminder.user_id, reminder.attempts)
+            return
+        reminder.fire_at = fire_at
+        # Goes through the queue, so a reschedule in the meantime still cancels it
+        self.queue.add(reminder)
+
+    def run_forever(self):
+        while True:
+            now = datetime.now().astimezone()
+            changed = self.refresh(now)
+            fired = self.fire_due(now)
+            if changed or fired:
+                logger.info("%d schedule(s) updated, %d reminder(s) due, %d pending", changed, fired, len(self.queue))
+            next_fire_at = self.queue.next_fire_at()
+            wait = POLL_INTERVAL if next_fire_at is None else (next_fire_at - datetime.now().astimezone()).total_seconds()
+            time.sleep(min(max(wait, 0), POLL_INTERVAL))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send push and email reminders ahead of scheduled study sessions.")
+    parser.add_argument('--storage', choices=['firestore', 'sqlite'], default=None)
+    parser.add_argument('--sqlite-path', default=None)
+    parser.add_argument('--service-account', default=None, help="Path to a service account JSON file.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    transports = default_transports()
+    if not transports:
+        raise SystemExit("Neither SendGrid nor OneSignal is configured; see setup_guide.md.")
+    service = ReminderService(open_storage(args.storage, args.sqlite_path, args.service_account), transports, lead_times_from_env())
+    service.run_forever()
+
+
+if __name__ == "__main__":
+    main()
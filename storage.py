@@ -0,0 +1,648 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from firebase_admin import auth, firestore
+
+from admin_analytics import get_firestore_client, stream_pages
+from firestore_access import managed_client
+from instrumentation import InstrumentedFirestore, span
+
+COLLECTIONS = ('progress', 'badges', 'study_sessions')
+TIMESTAMP_FIELDS = {'completed_at', 'created_at', 'updated_at', 'earned_at', 'started_at', 'checkpointed_at'}
+SQLITE_POOL_SIZE = 4
+MAX_BATCH_WRITES = 500
+# Primary key columns after user_id, which SQLite exports page on
+EXPORT_KEYS = {
+    'progress': ['module', 'chapter', 'subtopic'],
+    'badges': ['badge_name'],
+    'study_sessions': ['session_id'],
+}
+
+
+class StorageBackend:
+    def create_user(self, email, password):
+        raise NotImplementedError
+
+    def lookup_user(self, email):
+        raise NotImplementedError
+
+    def completed_progress(self, user_id):
+        raise NotImplementedError
+
+    def write_progress(self, user_id, module, chapter, subtopic, completed, updated_at):
+        # Returns None when written, or the stored value when a newer write already won
+        raise NotImplementedError
+
+    def load_badges(self, user_id):
+        raise NotImplementedError
+
+    def save_badge(self, user_id, badge_name):
+        raise NotImplementedError
+
+    def load_study_sessions(self, user_id):
+        raise NotImplementedError
+
+    def save_study_session(self, user_id, session_id, started_at, hours, status="completed", checkpointed_at=None):
+        raise NotImplementedError
+
+    def save_curriculum(self, user_id, csv_string):
+        raise NotImplementedError
+
+    def load_curriculum(self, user_id):
+        raise NotImplementedError
+
+    def reset_user(self, user_id):
+        raise NotImplementedError
+
+    def export_pages(self, collection, user_id, fields, page_size):
+        raise NotImplementedError
+
+    def iter_user_ids(self, page_size):
+        raise NotImplementedError
+
+    def save_recompute_results(self, results):
+        # results: (user_id, new_badges, aggregates) tuples, written in as few commits as possible
+        raise NotImplementedError
+
+    def enqueue_notification(self, user_id, email, kind, message):
+        raise NotImplementedError
+
+    def pending_notifications(self, limit, after_user_id=None):
+        # Ordered by user and starting after after_user_id, so callers can page past users whose events keep
+        # failing. Each event carries its queue 'id', 'sent_via', the channels it has already been delivered
+        # through, and 'attempts', the number of dispatch passes in which a channel failed to deliver it
+        raise NotImplementedError
+
+    def mark_notifications_sent(self, event_ids, channel):
+        raise NotImplementedError
+
+    def record_notification_failures(self, event_ids):
+        raise NotImplementedError
+
+    def delete_notifications(self, event_ids):
+        raise NotImplementedError
+
+    def save_schedule(self, user_id, email, sessions, reminders_enabled):
+        raise NotImplementedError
+
+    def schedules_updated_since(self, since, page_size):
+        # Yields schedule records in updated_at order; since=None yields every schedule
+        raise NotImplementedError
+
+
+class FirestoreStorage(StorageBackend):
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def breaker(self):
+        return self.db.breaker
+
+    def _user_query(self, collection, user_id):
+        return self.db.collection(collection).where(
+            filter=firestore.FieldFilter('user_id', '==', user_id)
+        )
+
+    def create_user(self, email, password):
+        user = auth.create_user(email=email, password=password)
+        self.db.collection('users').document(user.uid).set({'email': email})
+        return user.uid
+
+    def lookup_user(self, email):
+        return auth.get_user_by_email(email).uid
+
+    def completed_progress(self, user_id):
+        query = self._user_query('progress', user_id).where(
+            filter=firestore.FieldFilter('completed', '==', True)
+        )
+        return [doc.to_dict() for doc in query.stream()]
+
+    def write_progress(self, user_id, module, chapter, subtopic, completed, updated_at):
+        doc_id = f"{user_id}_{module}_{chapter}_{subtopic}".replace(" ", "_")
+        doc_ref = self.db.collection('progress').document(doc_id).raw
+        data = {
+            'user_id': user_id,
+            'module': module,
+            'chapter': chapter,
+            'subtopic': subtopic,
+            'completed': completed,
+            'completed_at': firestore.SERVER_TIMESTAMP if completed else None,
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'updated_at': updated_at
+        }
+
+        @firestore.transactional
+        def write(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if snapshot.exists:
+                current = snapshot.to_dict()
+                # Last writer wins: a newer change from another device is kept
+                if current.get('updated_at') is not None and current['updated_at'] > updated_at:
+                    return current.get('completed', False)
+            transaction.set(doc_ref, data)
+            return None
+
+        with span("firestore.progress_write", "firestore", collection='progress', documents=1):
+            return self.db.run("progress_write", lambda: write(self.db.transaction()))
+
+    def load_badges(self, user_id):
+        return [doc.to_dict()['badge_name'] for doc in self._user_query('badges', user_id).stream()]
+
+    def save_badge(self, user_id, badge_name):
+        self.db.collection('badges').document(f"{user_id}_{badge_name}".replace(" ", "_")).set({
+            'user_id': user_id,
+            'badge_name': badge_name,
+            'earned_at': firestore.SERVER_TIMESTAMP
+        })
+
+    def load_study_sessions(self, user_id):
+        return [doc.to_dict() for doc in self._user_query('study_sessions', user_id).stream()]
+
+    def save_study_session(self, user_id, session_id, started_at, hours, status="completed", checkpointed_at=None):
+        self.db.collection('study_sessions').document(f"{user_id}_{session_id}").set({
+            'user_id': user_id,
+            'session_id': session_id,
+            'date': started_at.astimezone().date().isoformat(),
+            'started_at': started_at,
+            'checkpointed_at': checkpointed_at or started_at,
+            'status': status,
+            'hours': hours
+        })
+
+    def save_curriculum(self, user_id, csv_string):
+        self.db.collection('users').document(user_id).set({'curriculum_csv': csv_string}, merge=True)
+
+    def load_curriculum(self, user_id):
+        user_doc = self.db.collection('users').document(user_id).get()
+        if user_doc.exists:
+            return user_doc.to_dict().get('curriculum_csv') or None
+        return None
+
+    def reset_user(self, user_id):
+        for collection in COLLECTIONS + ('notifications',):
+            for doc in self._user_query(collection, user_id).stream():
+                doc.reference.delete()
+        self.db.collection('users').document(user_id).update({'curriculum_csv': firestore.DELETE_FIELD})
+        # Saved rather than deleted, so reminder_service sees the change and cancels pending reminders
+        self.save_schedule(user_id, None, [], False)
+
+    def export_pages(self, collection, user_id, fields, page_size):
+        query = self._user_query(collection, user_id).order_by('__name__').select(fields)
+        for docs in stream_pages(query, page_size):
+            columns = {field: [] for field in fields}
+            for doc in docs:
+                data = doc.to_dict()
+                for field in fields:
+                    columns[field].append(data.get(field))
+            yield columns
+
+    def iter_user_ids(self, page_size):
+        query = self.db.collection('users').order_by('__name__').select([])
+        for docs in stream_pages(query, page_size):
+            for doc in docs:
+                yield doc.id
+
+    def save_recompute_results(self, results):
+        writes = []
+        for user_id, new_badges, aggregates in results:
+            for badge_name in new_badges:
+                writes.append((
+                    self.db.collection('badges').document(f"{user_id}_{badge_name}".replace(" ", "_")).raw,
+                    {'user_id': user_id, 'badge_name': badge_name, 'earned_at': firestore.SERVER_TIMESTAMP}
+                ))
+            writes.append((
+                self.db.collection('user_stats').document(user_id).raw,
+                {'user_id': user_id, **aggregates, 'computed_at': firestore.SERVER_TIMESTAMP}
+            ))
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for doc_ref, data in writes[start:start + MAX_BATCH_WRITES]:
+                batch.set(doc_ref, data)
+            self.db.run("batch_commit", batch.commit)
+
+    def enqueue_notification(self, user_id, email, kind, message):
+        self.db.collection('notifications').document().set({
+            'user_id': user_id,
+            'email': email,
+            'kind': kind,
+            'message': message,
+            'created_at': firestore.SERVER_TIMESTAMP
+        })
+
+    def pending_notifications(self, limit, after_user_id=None):
+        query = self.db.collection('notifications').order_by('user_id')
+        if after_user_id is not None:
+            query = query.start_after({'user_id': after_user_id})
+        return [{'sent_via': [], 'attempts': 0, **doc.to_dict(), 'id': doc.id} for doc in query.limit(limit).stream()]
+
+    def mark_notifications_sent(self, event_ids, channel):
+        for start in range(0, len(event_ids), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for event_id in event_ids[start:start + MAX_BATCH_WRITES]:
+                batch.update(self.db.collection('notifications').document(event_id).raw, {'sent_via': firestore.ArrayUnion([channel])})
+            self.db.run("batch_commit", batch.commit)
+
+    def record_notification_failures(self, event_ids):
+        for start in range(0, len(event_ids), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for event_id in event_ids[start:start + MAX_BATCH_WRITES]:
+                batch.update(self.db.collection('notifications').document(event_id).raw, {'attempts': firestore.Increment(1)})
+            self.db.run("batch_commit", batch.commit)
+
+    def delete_notifications(self, event_ids):
+        for start in range(0, len(event_ids), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for event_id in event_ids[start:start + MAX_BATCH_WRITES]:
+                batch.delete(self.db.collection('notifications').document(event_id).raw)
+            self.db.run("batch_commit", batch.commit)
+
+    def save_schedule(self, user_id, email, sessions, reminders_enabled):
+        self.db.collection('schedules').document(user_id).set({
+            'user_id': user_id,
+            'email': email,
+            'sessions': sessions,
+            'reminders_enabled': reminders_enabled,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+
+    def schedules_updated_since(self, since, page_size):
+        query = self.db.collection('schedules')
+        if since is not None:
+            query = query.where(filter=firestore.FieldFilter('updated_at', '>', since))
+        for docs in stream_pages(query.order_by('updated_at'), page_size):
+            for doc in docs:
+                yield doc.to_dict()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    curriculum_csv TEXT
+);
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT NOT NULL,
+    module TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    subtopic TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    completed_at TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, module, chapter, subtopic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS progress_by_completion ON progress (user_id, completed, module);
+CREATE TABLE IF NOT EXISTS badges (
+    user_id TEXT NOT NULL,
+    badge_name TEXT NOT NULL,
+    earned_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, badge_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS study_sessions (
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    checkpointed_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    hours REAL NOT NULL,
+    PRIMARY KEY (user_id, session_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS study_sessions_by_start ON study_sessions (user_id, started_at);
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    aggregates TEXT NOT NULL,
+    computed_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS notifications (
+    event_id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    email TEXT,
+    kind TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notifications_by_user ON notifications (user_id, event_id);
+CREATE TABLE IF NOT EXISTS notification_deliveries (
+    event_id INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    PRIMARY KEY (event_id, channel)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS notification_failures (
+    event_id INTEGER PRIMARY KEY,
+    attempts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    user_id TEXT PRIMARY KEY,
+    email TEXT,
+    sessions TEXT NOT NULL,
+    reminders_enabled INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS schedules_by_update ON schedules (updated_at);
+"""
+
+
+def _timestamp(value=None):
+    # Fixed-width UTC ISO strings sort the same way as the datetimes they encode
+    value = value or datetime.now(timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+class SQLiteStorage(StorageBackend):
+    def __init__(self, path, pool_size=SQLITE_POOL_SIZE):
+        self.path = path
+        self._pool = queue.SimpleQueue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _transaction(self):
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def create_user(self, email, password):
+        user_id = uuid.uuid4().hex
+        with self._connection() as conn:
+            conn.execute("INSERT INTO users (user_id, email) VALUES (?, ?)", (user_id, email))
+        return user_id
+
+    def lookup_user(self, email):
+        with self._connection() as conn:
+            row = conn.execute("SELECT user_id FROM users WHERE email = ?", (email,)).fetchone()
+        if row is None:
+            raise LookupError(f"No user record found for {email}")
+        return row['user_id']
+
+    def completed_progress(self, user_id):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT module, chapter, subtopic, completed_at FROM progress WHERE user_id = ? AND completed = 1",
+                (user_id,)
+            ).fetchall()
+        return [
+            {
+                **dict(row),
+                'completed': True,
+                'completed_at': datetime.fromisoformat(row['completed_at']) if row['completed_at'] else None,
+            }
+            for row in rows
+        ]
+
+    def write_progress(self, user_id, module, chapter, subtopic, completed, updated_at):
+        now = _timestamp()
+        stamp = _timestamp(updated_at)
+        with self._transaction() as conn:
+            written = conn.execute(
+                """
+                INSERT INTO progress (user_id, module, chapter, subtopic, completed, completed_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, module, chapter, subtopic) DO UPDATE SET
+                    completed = excluded.completed,
+                    completed_at = excluded.completed_at,
+                    updated_at = excluded.updated_at
+                WHERE excluded.updated_at >= progress.updated_at
+                """,
+                (user_id, module, chapter, subtopic, int(completed), now if completed else None, now, stamp)
+            ).rowcount
+            if written:
+                return None
+            row = conn.execute(
+                "SELECT completed FROM progress WHERE user_id = ? AND module = ? AND chapter = ? AND subtopic = ?",
+                (user_id, module, chapter, subtopic)
+            ).fetchone()
+        return bool(row['completed'])
+
+    def load_badges(self, user_id):
+        with self._connection() as conn:
+            rows = conn.execute("SELECT badge_name FROM badges WHERE user_id = ? ORDER BY earned_at", (user_id,)).fetchall()
+        return [row['badge_name'] for row in rows]
+
+    def save_badge(self, user_id, badge_name):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO badges (user_id, badge_name, earned_at) VALUES (?, ?, ?)",
+                (user_id, badge_name, _timestamp())
+            )
+
+    def load_study_sessions(self, user_id):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT user_id, session_id, date, started_at, checkpointed_at, status, hours FROM study_sessions WHERE user_id = ? ORDER BY started_at",
+                (user_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def save_study_session(self, user_id, session_id, started_at, hours, status="completed", checkpointed_at=None):
+        with self._connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO study_sessions (user_id, session_id, date, started_at, checkpointed_at, status, hours)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (user_id, session_id, started_at.astimezone().date().isoformat(), _timestamp(started_at),
+                 _timestamp(checkpointed_at or started_at), status, hours)
+            )
+
+    def save_curriculum(self, user_id, csv_string):
+        with self._connection() as conn:
+            conn.execute("UPDATE users SET curriculum_csv = ? WHERE user_id = ?", (csv_string, user_id))
+
+    def load_curriculum(self, user_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT curriculum_csv FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return row['curriculum_csv'] if row is not None and row['curriculum_csv'] else None
+
+    def reset_user(self, user_id):
+        with self._transaction() as conn:
+            for collection in COLLECTIONS:
+                conn.execute(f"DELETE FROM {collection} WHERE user_id = ?", (user_id,))
+            conn.execute("UPDATE users SET curriculum_csv = NULL WHERE user_id = ?", (user_id,))
+            for table in ('notification_deliveries', 'notification_failures'):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE event_id IN (SELECT event_id FROM notifications WHERE user_id = ?)",
+                    (user_id,)
+                )
+            conn.execute("DELETE FROM notifications WHERE user_id = ?", (user_id,))
+            # Saved rather than deleted, so reminder_service sees the change and cancels pending reminders
+            conn.execute(
+                "INSERT OR REPLACE INTO schedules (user_id, email, sessions, reminders_enabled, updated_at) "
+                "VALUES (?, NULL, '[]', 0, ?)",
+                (user_id, _timestamp())
+            )
+
+    def export_pages(self, collection, user_id, fields, page_size):
+        if collection not in COLLECTIONS:
+            raise ValueError(f"Unknown collection: {collection}")
+        # Keyset paging with a pooled connection per page, so a slow reader doesn't hold one between pages
+        keys = EXPORT_KEYS[collection]
+        columns_sql = ", ".join(dict.fromkeys(fields + keys))
+        keys_sql = ", ".join(keys)
+        last_key = None
+        while True:
+            after_sql = "" if last_key is None else f" AND ({keys_sql}) > ({', '.join('?' * len(keys))})"
+            with self._connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {columns_sql} FROM {collection} WHERE user_id = ?{after_sql} ORDER BY {keys_sql} LIMIT ?",
+                    (user_id, *(last_key or ()), page_size)
+                ).fetchall()
+            if not rows:
+                return
+            columns = {field: [] for field in fields}
+            for row in rows:
+                for field in fields:
+                    value = row[field]
+                    if field in TIMESTAMP_FIELDS and value is not None:
+                        value = datetime.fromisoformat(value)
+                    elif field == 'completed':
+                        value = bool(value)
+                    columns[field].append(value)
+            yield columns
+            if len(rows) < page_size:
+                return
+            last_key = tuple(rows[-1][key] for key in keys)
+
+    def iter_user_ids(self, page_size):
+        last_user_id = ""
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(
+                    "SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?", (last_user_id, page_size)
+                ).fetchall()
+            for row in rows:
+                yield row['user_id']
+            if len(rows) < page_size:
+                return
+            last_user_id = rows[-1]['user_id']
+
+    def save_recompute_results(self, results):
+        now = _timestamp()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO badges (user_id, badge_name, earned_at) VALUES (?, ?, ?)",
+                [(user_id, badge_name, now) for user_id, new_badges, _ in results for badge_name in new_badges]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO user_stats (user_id, aggregates, computed_at) VALUES (?, ?, ?)",
+                [(user_id, json.dumps(aggregates, default=str), now) for user_id, _, aggregates in results]
+            )
+
+    def enqueue_notification(self, user_id, email, kind, message):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO notifications (user_id, email, kind, message, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user_id, email, kind, message, _timestamp())
+            )
+
+    def pending_notifications(self, limit, after_user_id=None):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT n.event_id, n.user_id, n.email, n.kind, n.message, n.created_at, "
+                "(SELECT group_concat(channel) FROM notification_deliveries d WHERE d.event_id = n.event_id) AS sent_via, "
+                "COALESCE((SELECT attempts FROM notification_failures f WHERE f.event_id = n.event_id), 0) AS attempts "
+                "FROM notifications n WHERE ? IS NULL OR n.user_id > ? ORDER BY n.user_id, n.event_id LIMIT ?",
+                (after_user_id, after_user_id, limit)
+            ).fetchall()
+        return [
+            {**dict(row), 'id': row['event_id'], 'sent_via': row['sent_via'].split(",") if row['sent_via'] else []}
+            for row in rows
+        ]
+
+    def mark_notifications_sent(self, event_ids, channel):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO notification_deliveries (event_id, channel) VALUES (?, ?)",
+                [(event_id, channel) for event_id in event_ids]
+            )
+
+    def record_notification_failures(self, event_ids):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO notification_failures (event_id, attempts) VALUES (?, 1) "
+                "ON CONFLICT (event_id) DO UPDATE SET attempts = attempts + 1",
+                [(event_id,) for event_id in event_ids]
+            )
+
+    def delete_notifications(self, event_ids):
+        with self._transaction() as conn:
+            params = [(event_id,) for event_id in event_ids]
+            conn.executemany("DELETE FROM notifications WHERE event_id = ?", params)
+            conn.executemany("DELETE FROM notification_deliveries WHERE event_id = ?", params)
+            conn.executemany("DELETE FROM notification_failures WHERE event_id = ?", params)
+
+    def save_schedule(self, user_id, email, sessions, reminders_enabled):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO schedules (user_id, email, sessions, reminders_enabled, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, email, json.dumps(sessions), int(reminders_enabled), _timestamp())
+            )
+
+    def schedules_updated_since(self, since, page_size):
+        # Keyset paging on (updated_at, user_id); the NULL user id makes the first page strictly after `since`
+        last_updated_at, last_user_id = (_timestamp(since) if since is not None else ""), None
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(
+                    "SELECT user_id, email, sessions, reminders_enabled, updated_at FROM schedules "
+                    "WHERE updated_at > ? OR (updated_at = ? AND user_id > ?) ORDER BY updated_at, user_id LIMIT ?",
+                    (last_updated_at, last_updated_at, last_user_id, page_size)
+                ).fetchall()
+            for row in rows:
+                yield {
+                    **dict(row),
+                    'sessions': json.loads(row['sessions']),
+                    'reminders_enabled': bool(row['reminders_enabled']),
+                    'updated_at': datetime.fromisoformat(row['updated_at']),
+                }
+            if len(rows) < page_size:
+                return
+            last_updated_at, last_user_id = rows[-1]['updated_at'], rows[-1]['user_id']
+
+
+_sqlite_stores = {}
+_sqlite_lock = threading.Lock()
+
+
+def sqlite_storage(path):
+    with _sqlite_lock:
+        if path not in _sqlite_stores:
+            _sqlite_stores[path] = SQLiteStorage(path)
+        return _sqlite_stores[path]
+
+
+def open_storage(backend=None, sqlite_path=None, service_account=None):
+    backend = backend or os.getenv("STUDY_DASHBOARD_STORAGE", "firestore")
+    if backend == "sqlite":
+        return sqlite_storage(sqlite_path or os.getenv("STUDY_DASHBOARD_SQLITE_PATH", "study_dashboard.db"))
+    get_firestore_client(service_account or os.getenv("FIREBASE_SERVICE_ACCOUNT"))
+    return FirestoreStorage(InstrumentedFirestore(managed_client(lambda index: firestore.client(), pool_size=1)))
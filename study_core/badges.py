@@ -0,0 +1,20 @@
+# (badge, metric, threshold): awarded once the metric reaches the threshold
+BADGE_RULES = (
+    ("First Steps", 'completed_subtopics', 5),
+    ("Getting Started", 'completed_subtopics', 10),
+    ("Quarter Master", 'completion_percentage', 25),
+    ("Halfway Hero", 'completion_percentage', 50),
+    ("Streak Star", 'current_streak', 5),
+    ("Study Master", 'total_hours', 50),
+)
+
+
+def evaluate_badges(progress_stats, study_summary, earned):
+    completion_percentage, completed_subtopics, _, _ = progress_stats
+    metrics = {
+        'completed_subtopics': completed_subtopics,
+        'completion_percentage': completion_percentage,
+        'current_streak': study_summary['current_streak'],
+        'total_hours': study_summary['total_hours'],
+    }
+    return [badge for badge, metric, threshold in BADGE_RULES if metrics[metric] >= threshold and badge not in earned]
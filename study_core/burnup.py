@@ -0,0 +1,40 @@
+import numpy as np
+
+MAX_TIMELINE_POINTS = 300
+
+
+def completion_times(completed_at):
+    # Sorted epoch seconds of every completion that has a timestamp
+    return np.sort(np.fromiter(completed_at.values(), dtype=np.float64, count=len(completed_at)))
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the series' visual shape
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # The next bucket's mean is the third vertex; the last bucket uses the final point
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def burnup_series(times, total, untimed=0, max_points=MAX_TIMELINE_POINTS):
+    # Completions without a timestamp predate tracking, so they form the starting level
+    done = untimed + np.arange(1, len(times) + 1)
+    keep = lttb(times, done, max_points)
+    return times[keep], done[keep], total - done[keep]
@@ -0,0 +1,78 @@
+import hashlib
+import io
+import threading
+import weakref
+from types import MappingProxyType
+
+import pandas as pd
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def curriculum_digest(csv_text):
+    return hashlib.sha256(csv_text.encode('utf-8')).hexdigest()
+
+
+def parse_curriculum_csv(csv_text):
+    df = pd.read_csv(io.StringIO(csv_text))
+    curriculum_data = {}
+    for (module, chapter), group in df.groupby(['Module', 'Chapter']):
+        subtopics = tuple(group['Subtopic'].tolist())
+        project = group['Project'].iloc[0] if not group['Project'].empty else ""
+        content = {
+            'subtopics': subtopics,
+            'project': project
+        }
+        if 'Prerequisites' in group:
+            names = group['Prerequisites'].dropna()
+            if not names.empty:
+                content['prerequisites'] = tuple(name.strip() for name in str(names.iloc[0]).split(';') if name.strip())
+        curriculum_data.setdefault(module, {})[chapter] = MappingProxyType(content)
+    return MappingProxyType({module: MappingProxyType(chapters) for module, chapters in curriculum_data.items()})
+
+
+class CurriculumHandle:
+    __slots__ = ('digest', '__weakref__')
+
+    def __init__(self, digest):
+        self.digest = digest
+        weakref.finalize(self, release_curriculum, digest)
+
+
+def acquire_curriculum(csv_text):
+    digest = curriculum_digest(csv_text)
+    with _registry_lock:
+        entry = _registry.get(digest)
+        if entry is not None:
+            entry[1] += 1
+            return CurriculumHandle(digest)
+    # Parse outside the lock; if another session raced us, keep the first copy
+    curriculum = parse_curriculum_csv(csv_text)
+    with _registry_lock:
+        entry = _registry.setdefault(digest, [curriculum, 0])
+        entry[1] += 1
+    return CurriculumHandle(digest)
+
+
+def release_curriculum(digest):
+    with _registry_lock:
+        entry = _registry.get(digest)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _registry[digest]
+
+
+def get_curriculum(handle):
+    if handle is None:
+        return MappingProxyType({})
+    with _registry_lock:
+        entry = _registry.get(handle.digest)
+    return entry[0] if entry is not None else MappingProxyType({})
+
+
+def registry_stats():
+    with _registry_lock:
+        return {digest: refcount for digest, (_, refcount) in _registry.items()}
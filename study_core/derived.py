@@ -0,0 +1,17 @@
+def derived_version(specs, sources, name):
+    if name in sources:
+        return sources[name][0]
+    deps, _ = specs[name]
+    return tuple(derived_version(specs, sources, dep) for dep in deps)
+
+
+def resolve_derived(cache, specs, sources, name):
+    if name in sources:
+        return sources[name][1]
+    deps, compute = specs[name]
+    version = derived_version(specs, sources, name)
+    entry = cache.get(name)
+    if entry is None or entry[0] != version:
+        entry = (version, compute(*(resolve_derived(cache, specs, sources, dep) for dep in deps)))
+        cache[name] = entry
+    return entry[1]
@@ -0,0 +1,97 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from study_core.scheduler import MAX_SESSION_HOURS, TARGET_WEEKLY_HOURS
+
+FORECAST_WEEKS = 12
+SMOOTHING_ALPHA = 0.4
+# z-score of the reported band: 80% of weekly outcomes
+BAND_Z = 1.28
+# Below this many subtopics a week there is no pace to project from
+MIN_WEEKLY_RATE = 0.1
+# Weekly targets ask for a little more than the recent pace, within sane bounds
+TARGET_STRETCH = 1.1
+# At least two sessions a week, so a light week doesn't shrink the schedule to a single session
+MIN_WEEKLY_HOURS = 2 * MAX_SESSION_HOURS
+MAX_WEEKLY_HOURS = 40
+# With less history than this, the target leans toward the default in proportion
+TARGET_HISTORY_WEEKS = 4
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+def smooth(counts, alpha=SMOOTHING_ALPHA):
+    # Exponential smoothing over an oldest-first series, as one weighted sum
+    n = len(counts)
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1)
+    weights[0] = (1 - alpha) ** (n - 1)
+    return float(weights @ counts)
+
+
+def _active_weeks(counts):
+    # Weeks before the first activity would only drag the pace toward zero
+    active = np.flatnonzero(counts)
+    return counts[active[0]:] if len(active) else counts[:0]
+
+
+def weekly_completions(times, today, weeks=FORECAST_WEEKS):
+    end = datetime.combine(today + timedelta(days=1), time()).astimezone().timestamp()
+    age = ((end - times) // WEEK_SECONDS).astype(np.intp)
+    age = age[(age >= 0) & (age < weeks)]
+    return _active_weeks(np.bincount(weeks - 1 - age, minlength=weeks))
+
+
+def weekly_hours(hours_by_day, today, weeks=FORECAST_WEEKS):
+    days = np.fromiter(hours_by_day.keys(), dtype=np.intp, count=len(hours_by_day))
+    hours = np.fromiter(hours_by_day.values(), dtype=np.float64, count=len(hours_by_day))
+    age = (today.toordinal() - days) // 7
+    recent = (age >= 0) & (age < weeks)
+    return _active_weeks(np.bincount(weeks - 1 - age[recent], weights=hours[recent], minlength=weeks))
+
+
+def _finish(today, remaining, rate):
+    return today + timedelta(days=float(np.ceil(remaining / rate * 7)))
+
+
+def forecast_completion(times, segments, aggregates, today):
+    counts = weekly_completions(times, today)
+    if not len(counts):
+        return None
+    rate = smooth(counts)
+    if rate < MIN_WEEKLY_RATE:
+        return None
+    # Spread of the weekly counts, or half the pace when there is only one week to go on
+    spread = counts.std(ddof=1) if len(counts) > 1 else rate / 2
+    # A prediction interval for a week's pace, not the (much narrower) uncertainty of the mean
+    margin = BAND_Z * spread * np.sqrt(1 + 1 / len(counts))
+    rates = {'finish': rate, 'finish_early': rate + margin, 'finish_late': max(rate - margin, MIN_WEEKLY_RATE)}
+
+    # Modules are worked through in curriculum order, so each one finishes once everything before it is done
+    module_remaining = segments.module_totals - aggregates['module_completed']
+    cumulative = np.cumsum(module_remaining)
+    modules = []
+    for module, remaining, through in zip(segments.modules, module_remaining, cumulative):
+        entry = {'module': module, 'remaining': int(remaining)}
+        for name, value in rates.items():
+            entry[name] = _finish(today, through, value) if remaining > 0 else None
+        modules.append(entry)
+
+    remaining = int(cumulative[-1]) if len(cumulative) else 0
+    return {
+        'rate': rate,
+        'rate_low': rates['finish_late'],
+        'rate_high': rates['finish_early'],
+        'remaining': remaining,
+        'weekly_completions': counts.tolist(),
+        'modules': modules,
+        **{name: _finish(today, remaining, value) if remaining > 0 else today for name, value in rates.items()},
+    }
+
+
+def weekly_hours_target(hours_by_day, today=None, default=TARGET_WEEKLY_HOURS):
+    hours = weekly_hours(hours_by_day, today or date.today())
+    if not len(hours):
+        return default
+    weight = min(len(hours), TARGET_HISTORY_WEEKS) / TARGET_HISTORY_WEEKS
+    target = weight * smooth(hours) * TARGET_STRETCH + (1 - weight) * default
+    return int(round(min(max(target, MIN_WEEKLY_HOURS), MAX_WEEKLY_HOURS)))
@@ -0,0 +1,131 @@
+from collections import defaultdict, deque
+
+GATING_MODES = {
+    "Within chapters only": "chapter",
+    "Complete previous chapter first": "module_sequence",
+}
+
+
+def build_prerequisites(curriculum_data, gating="chapter"):
+    by_name = defaultdict(list)
+    for module, chapters in curriculum_data.items():
+        for chapter in chapters:
+            by_name[chapter].append((module, chapter))
+
+    prerequisites = {}
+    for module, chapters in curriculum_data.items():
+        previous = None
+        for chapter, content in chapters.items():
+            required = []
+            if gating == "module_sequence" and previous is not None:
+                required.append((module, previous))
+            for name in content.get('prerequisites', ()):
+                candidates = by_name.get(name, [])
+                # Prefer a chapter of the same name in the same module
+                match = next((c for c in candidates if c[0] == module), candidates[0] if candidates else None)
+                if match is not None and match != (module, chapter) and match not in required:
+                    required.append(match)
+            prerequisites[(module, chapter)] = required
+            previous = chapter
+    return prerequisites
+
+
+class ProgressFrontier:
+    def __init__(self, curriculum_data, progress_data, gating="chapter"):
+        self.version = None
+        self.chapters = []
+        self.subtopics = {}
+        self.positions = {}
+        self.flags = {}
+        self.frontier = {}
+        self.prerequisites = build_prerequisites(curriculum_data, gating)
+        self.dependents = defaultdict(list)
+        self.unmet = {}
+        self.open_chapters = set()
+
+        for module, chapters in curriculum_data.items():
+            for chapter, content in chapters.items():
+                key = (module, chapter)
+                subtopics = tuple(content.get('subtopics', ()))
+                flags = [progress_data.get(f"{module}_{chapter}_{subtopic}", False) for subtopic in subtopics]
+                self.chapters.append(key)
+                self.subtopics[key] = subtopics
+                self.positions[key] = {subtopic: i for i, subtopic in enumerate(subtopics)}
+                self.flags[key] = flags
+                self.frontier[key] = next((i for i, done in enumerate(flags) if not done), len(flags))
+
+        for key, required in self.prerequisites.items():
+            for prerequisite in required:
+                self.dependents[prerequisite].append(key)
+            self.unmet[key] = sum(1 for prerequisite in required if not self.is_chapter_complete(prerequisite))
+        for key in self.chapters:
+            self._refresh_open(key)
+
+    def is_chapter_complete(self, key):
+        return self.frontier[key] >= len(self.subtopics[key])
+
+    def _refresh_open(self, key):
+        if self.unmet[key] == 0 and not self.is_chapter_complete(key):
+            self.open_chapters.add(key)
+        else:
+            self.open_chapters.discard(key)
+
+    def is_unlocked(self, module, chapter, index):
+        key = (module, chapter)
+        return self.unmet[key] == 0 and index <= self.frontier[key]
+
+    def set_completed(self, module, chapter, subtopic, completed):
+        key = (module, chapter)
+        index = self.positions[key][subtopic]
+        flags = self.flags[key]
+        was_complete = self.is_chapter_complete(key)
+        flags[index] = completed
+
+        position = self.frontier[key]
+        if not completed and index < position:
+            self.frontier[key] = index
+        elif completed and index == position:
+            while position < len(flags) and flags[position]:
+                position += 1
+            self.frontier[key] = position
+
+        changed = [key]
+        now_complete = self.is_chapter_complete(key)
+        if was_complete != now_complete:
+            delta = -1 if now_complete else 1
+            for dependent in self.dependents[key]:
+                self.unmet[dependent] += delta
+                self._refresh_open(dependent)
+                changed.append(dependent)
+        self._refresh_open(key)
+        return changed
+
+    def unlocked_items(self):
+        for module, chapter in self.open_chapters:
+            index = self.frontier[(module, chapter)]
+            yield module, chapter, index, self.subtopics[(module, chapter)][index]
+
+    def chapters_in_unlock_order(self):
+        remaining = {key: len(self.prerequisites.get(key, ())) for key in self.chapters}
+        ready = deque(key for key in self.chapters if remaining[key] == 0)
+        ordered = []
+        while ready:
+            key = ready.popleft()
+            ordered.append(key)
+            for dependent in self.dependents[key]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        # Chapters caught in a prerequisite cycle keep their curriculum order
+        seen = set(ordered)
+        ordered.extend(key for key in self.chapters if key not in seen)
+        return ordered
+
+    def pending_items(self):
+        for module, chapter in self.chapters_in_unlock_order():
+            key = (module, chapter)
+            flags = self.flags[key]
+            subtopics = self.subtopics[key]
+            for index in range(self.frontier[key], len(subtopics)):
+                if not flags[index]:
+                    yield module, chapter, index, subtopics[index]
@@ -0,0 +1,118 @@
+import time
+from datetime import date
+
+from study_core.burnup import completion_times
+from study_core.curriculum import acquire_curriculum, get_curriculum
+from study_core.derived import resolve_derived
+from study_core.forecast import forecast_completion
+from study_core.frontier import ProgressFrontier
+from study_core.recommendations import NextUpIndex
+from study_core.segments import CurriculumSegments, segment_completion
+from study_core.stats import calculate_module_completion, list_pending_subtopics, summarize_module_completion
+
+# Derived values recomputed only when their inputs' versions change
+DERIVED_SPECS = {
+    'module_completion': (('progress', 'curriculum'), calculate_module_completion),
+    'progress_stats': (('module_completion',), summarize_module_completion),
+    'pending_subtopics': (('frontier', 'curriculum'), list_pending_subtopics),
+    'segments': (('curriculum',), CurriculumSegments),
+    'segment_completion': (('progress', 'segments'), segment_completion),
+    'completion_times': (('completion_log',), completion_times),
+    'forecast': (('completion_times', 'segments', 'segment_completion', 'today'), forecast_completion),
+}
+
+
+def progress_key(module, chapter, subtopic):
+    return f"{module}_{chapter}_{subtopic}"
+
+
+class ProgressStore:
+    def __init__(self, gating="chapter", specs=DERIVED_SPECS, frontier_factory=ProgressFrontier, today=None):
+        self.curriculum_ref = None
+        self.progress_data = {}
+        # Epoch seconds each completed subtopic was completed at, when known
+        self.completed_at = {}
+        self.version = 0
+        self.gating = gating
+        self.frontier = None
+        self.next_up = None
+        self.derived_cache = {}
+        self.specs = specs
+        self.frontier_factory = frontier_factory
+        # Pins the 'today' source, e.g. to a batch run's date; None follows the clock
+        self.today = today
+
+    @property
+    def curriculum(self):
+        return get_curriculum(self.curriculum_ref)
+
+    @property
+    def curriculum_digest(self):
+        return self.curriculum_ref.digest if self.curriculum_ref is not None else None
+
+    def set_curriculum(self, csv_text):
+        self.curriculum_ref = acquire_curriculum(csv_text)
+
+    def clear_curriculum(self):
+        self.curriculum_ref = None
+
+    def is_completed(self, module, chapter, subtopic):
+        return self.progress_data.get(progress_key(module, chapter, subtopic), False)
+
+    def load(self, rows):
+        for row in rows:
+            key = progress_key(row['module'], row['chapter'], row['subtopic'])
+            self.progress_data[key] = row['completed']
+            if row['completed'] and row.get('completed_at') is not None:
+                self.completed_at[key] = row['completed_at'].timestamp()
+            else:
+                self.completed_at.pop(key, None)
+        self.version += 1
+
+    def clear(self):
+        self.progress_data = {}
+        self.completed_at = {}
+        self.version += 1
+
+    def frontier_version(self):
+        return (self.curriculum_digest, self.gating, self.version)
+
+    def get_frontier(self):
+        if self.frontier is None or self.frontier.version != self.frontier_version():
+            curriculum = self.curriculum
+            self.frontier = self.frontier_factory(curriculum, self.progress_data, self.gating)
+            self.frontier.version = self.frontier_version()
+            self.next_up = NextUpIndex(self.frontier, curriculum)
+        return self.frontier
+
+    def top_next_up(self, k=3):
+        self.get_frontier()
+        return self.next_up.top(k)
+
+    def apply_change(self, module, chapter, subtopic, completed):
+        # Returns the chapters whose unlock state may have changed
+        frontier = self.get_frontier()
+        key = progress_key(module, chapter, subtopic)
+        self.progress_data[key] = completed
+        if completed:
+            self.completed_at[key] = time.time()
+        else:
+            self.completed_at.pop(key, None)
+        self.version += 1
+        if subtopic not in frontier.positions.get((module, chapter), {}):
+            return []
+        changed = frontier.set_completed(module, chapter, subtopic, completed)
+        frontier.version = self.frontier_version()
+        self.next_up.update(changed, touched=(module, chapter))
+        return changed
+
+    def derived(self, name):
+        today = self.today or date.today()
+        sources = {
+            'progress': (self.version, self.progress_data),
+            'completion_log': (self.version, self.completed_at),
+            'today': (today, today),
+            'curriculum': (self.curriculum_digest, self.curriculum),
+            'frontier': (self.frontier_version(), self.get_frontier()),
+        }
+        return resolve_derived(self.derived_cache, self.specs, sources, name)
@@ -0,0 +1,69 @@
+import heapq
+
+from study_core.stats import DEFAULT_DEADLINE, SUBTOPIC_HOURS as DEFAULT_ESTIMATED_HOURS
+
+
+class NextUpIndex:
+    def __init__(self, frontier, curriculum_data, module_weights=None):
+        self.frontier = frontier
+        self.curriculum_data = curriculum_data
+        self.module_weights = module_weights or {}
+        self.order = {key: i for i, key in enumerate(frontier.chapters)}
+        self.recency = {}
+        self.clock = 0
+        self.heap = []
+        self.entries = {}
+        for key in frontier.open_chapters:
+            self._push(key)
+
+    def _score(self, key):
+        module, chapter = key
+        content = self.curriculum_data[module][chapter]
+        return (
+            content.get('deadline', DEFAULT_DEADLINE),
+            -self.module_weights.get(module, 1.0),
+            -self.recency.get(key, 0),
+            content.get('estimated_hours', DEFAULT_ESTIMATED_HOURS),
+            self.order[key],
+        )
+
+    def _push(self, key):
+        entry = (self._score(key), self.frontier.frontier[key], key)
+        self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+
+    def update(self, keys, touched=None):
+        if touched is not None:
+            self.clock += 1
+            self.recency[touched] = self.clock
+        for key in keys:
+            if key in self.frontier.open_chapters:
+                self._push(key)
+            else:
+                self.entries.pop(key, None)
+        # Stale entries are skipped lazily; rebuild once they dominate the heap
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def top(self, k=3):
+        results = []
+        kept = []
+        while self.heap and len(results) < k:
+            entry = heapq.heappop(self.heap)
+            _, index, key = entry
+            if self.entries.get(key) is not entry:
+                continue
+            kept.append(entry)
+            module, chapter = key
+            content = self.curriculum_data[module][chapter]
+            results.append({
+                'module': module,
+                'chapter': chapter,
+                'subtopic': self.frontier.subtopics[key][index],
+                'estimated_hours': content.get('estimated_hours', DEFAULT_ESTIMATED_HOURS),
+                'deadline': content.get('deadline', DEFAULT_DEADLINE),
+            })
+        for entry in kept:
+            heapq.heappush(self.heap, entry)
+        return results
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+DEFAULT_LEAD_TIMES = (timedelta(hours=24), timedelta(minutes=30))
+
+
+def session_start(session):
+    # Schedule rows hold local wall-clock times
+    return datetime.strptime(f"{session['Date']} {session['Time']}", "%Y-%m-%d %H:%M").astimezone()
+
+
+class Reminder:
+    __slots__ = ('user_id', 'fire_at', 'lead', 'session', 'payload', 'attempts', 'sent_via')
+
+    def __init__(self, user_id, fire_at, lead, session, payload=None):
+        self.user_id = user_id
+        self.fire_at = fire_at
+        self.lead = lead
+        self.session = session
+        self.payload = payload
+        # Failed sends, and the channels that already delivered this reminder
+        self.attempts = 0
+        self.sent_via = set()
+
+
+class ReminderQueue:
+    # Min-heap keyed on fire time; cancelled entries are dropped lazily when they reach the top
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.by_user = {}
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, reminder):
+        key = (reminder.user_id, reminder.session['Date'], reminder.session['Time'], reminder.lead)
+        entry = (reminder.fire_at.timestamp(), next(self._sequence), key, reminder)
+        self.entries[key] = entry
+        self.by_user.setdefault(reminder.user_id, set()).add(key)
+        heapq.heappush(self.heap, entry)
+
+    def cancel_user(self, user_id):
+        for key in self.by_user.pop(user_id, ()):
+            self.entries.pop(key, None)
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def reschedule(self, user_id, sessions, lead_times=DEFAULT_LEAD_TIMES, now=None, payload=None):
+        # A new plan replaces every pending reminder from the previous one
+        self.cancel_user(user_id)
+        now = now or datetime.now().astimezone()
+        for session in sessions:
+            start = session_start(session)
+            for lead in lead_times:
+                if start - lead > now:
+                    self.add(Reminder(user_id, start - lead, lead, session, payload))
+
+    def _drop_stale(self):
+        while self.heap and self.entries.get(self.heap[0][2]) is not self.heap[0]:
+            heapq.heappop(self.heap)
+
+    def next_fire_at(self):
+        self._drop_stale()
+        return self.heap[0][3].fire_at if self.heap else None
+
+    def pop_due(self, now):
+        due = []
+        cutoff = now.timestamp()
+        self._drop_stale()
+        while self.heap and self.heap[0][0] <= cutoff:
+            _, _, key, reminder = heapq.heappop(self.heap)
+            del self.entries[key]
+            keys = self.by_user[reminder.user_id]
+            keys.discard(key)
+            if not keys:
+                del self.by_user[reminder.user_id]
+            due.append(reminder)
+            self._drop_stale()
+        return due
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+MAX_SESSION_HOURS = 3
+SCHEDULE_HORIZON_DAYS = 14
+TARGET_WEEKLY_HOURS = 25
+RESTRICTED_DAYS = ("Tuesday", "Wednesday", "Thursday", "Friday")
+
+
+def build_study_schedule(pending_subtopics, daily_hours, start_time, study_days, today=None, weekly_hours=TARGET_WEEKLY_HOURS):
+    schedule = []
+    pending = list(pending_subtopics)
+    first_date = current_date = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = current_date + timedelta(days=SCHEDULE_HORIZON_DAYS)
+    hours_by_week = {}
+
+    while current_date <= end_date and pending:
+        day_name = current_date.strftime("%A")
+        week = (current_date - first_date).days // 7
+        if day_name in study_days and hours_by_week.get(week, 0) < weekly_hours:
+            is_restricted = day_name in RESTRICTED_DAYS and start_time.hour >= 12 and start_time.hour < 20
+            if not is_restricted:
+                session_duration = min(daily_hours, MAX_SESSION_HOURS)
+                subtopic_data = pending.pop(0)
+                days_until_deadline = (datetime.strptime(subtopic_data['deadline'], "%Y-%m-%d").date() - current_date.date()).days
+                schedule.append({
+                    'Date': current_date.strftime("%Y-%m-%d"),
+                    'Day': day_name,
+                    'Time': f"{start_time.hour:02d}:{start_time.minute:02d}",
+                    'Duration': f"{session_duration}h",
+                    'Module': subtopic_data['module'].split(":")[0],
+                    'Chapter': subtopic_data['chapter'].split(":")[1] if ":" in subtopic_data['chapter'] else subtopic_data['chapter'],
+                    'Subtopic': subtopic_data['subtopic'][:50] + "..." if len(subtopic_data['subtopic']) > 50 else subtopic_data['subtopic'],
+                    'Urgent': days_until_deadline <= 7
+                })
+                hours_by_week[week] = hours_by_week.get(week, 0) + session_duration
+        current_date += timedelta(days=1)
+    return schedule
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class CurriculumSegments:
+    # Flat per-subtopic arrays for one curriculum, so chapter and module totals are single bincounts
+    def __init__(self, curriculum_data):
+        curriculum_data = curriculum_data or {}
+        self.modules = np.array(list(curriculum_data), dtype=object)
+        chapters = [(module, chapter) for module, module_chapters in curriculum_data.items() for chapter in module_chapters]
+        self.chapters = np.array([chapter for _, chapter in chapters], dtype=object)
+        module_index = {module: i for i, module in enumerate(self.modules)}
+        self.module_of_chapter = np.fromiter((module_index[module] for module, _ in chapters), dtype=np.intp, count=len(chapters))
+        self.chapter_totals = np.fromiter(
+            (len(curriculum_data[module][chapter].get('subtopics', ())) for module, chapter in chapters),
+            dtype=np.intp, count=len(chapters)
+        )
+        # Position of each chapter within its module: the heatmap column
+        module_starts = np.searchsorted(self.module_of_chapter, np.arange(len(self.modules)))
+        self.chapter_position = np.arange(len(chapters)) - module_starts[self.module_of_chapter]
+        self.chapter_of_subtopic = np.repeat(np.arange(len(chapters)), self.chapter_totals)
+        self.index = {
+            f"{module}_{chapter}_{subtopic}": i
+            for i, (module, chapter, subtopic) in enumerate(
+                (module, chapter, subtopic)
+                for module, chapter in chapters
+                for subtopic in curriculum_data[module][chapter].get('subtopics', ())
+            )
+        }
+        self.module_totals = np.bincount(self.module_of_chapter, weights=self.chapter_totals, minlength=len(self.modules))
+
+
+def segment_completion(progress_data, segments):
+    index = segments.index
+    completed = np.fromiter((index.get(key, -1) for key, done in progress_data.items() if done), dtype=np.intp)
+    completed = completed[completed >= 0]
+    chapter_completed = np.bincount(segments.chapter_of_subtopic[completed], minlength=len(segments.chapters))
+    module_completed = np.bincount(segments.module_of_chapter, weights=chapter_completed, minlength=len(segments.modules))
+    return {
+        'chapter_completed': chapter_completed,
+        'module_completed': module_completed,
+    }
+
+
+def completion_grid(segments, aggregates):
+    # modules x chapter-position matrix of completion percentages; NaN where a module has fewer chapters
+    width = int(segments.chapter_position.max()) + 1 if len(segments.chapters) else 0
+    rates = np.divide(
+        aggregates['chapter_completed'] * 100.0, segments.chapter_totals,
+        out=np.zeros(len(segments.chapters)), where=segments.chapter_totals > 0
+    )
+    grid = np.full((len(segments.modules), width), np.nan)
+    grid[segments.module_of_chapter, segments.chapter_position] = rates
+    names = np.full((len(segments.modules), width), "", dtype=object)
+    names[segments.module_of_chapter, segments.chapter_position] = segments.chapters
+    return grid, names
@@ -0,0 +1,37 @@
+DEFAULT_DEADLINE = '9999-12-31'
+SUBTOPIC_HOURS = 2
+
+
+def calculate_module_completion(progress_data, curriculum_data):
+    module_completion = []
+    for module, chapters in (curriculum_data or {}).items():
+        total_module_subtopics = 0
+        completed_module_subtopics = 0
+        for chapter, content in chapters.items():
+            total_module_subtopics += len(content.get('subtopics', []))
+            for subtopic in content.get('subtopics', []):
+                if progress_data.get(f"{module}_{chapter}_{subtopic}", False):
+                    completed_module_subtopics += 1
+        module_completion.append((module, completed_module_subtopics, total_module_subtopics))
+    return module_completion
+
+
+def summarize_module_completion(module_completion):
+    completed_subtopics = sum(completed for _, completed, _ in module_completion)
+    total_subtopics = sum(total for _, _, total in module_completion)
+    completion_percentage = (completed_subtopics / total_subtopics * 100) if total_subtopics > 0 else 0
+    return completion_percentage, completed_subtopics, total_subtopics, len(module_completion)
+
+
+def list_pending_subtopics(frontier, curriculum_data):
+    pending_subtopics = []
+    for module, chapter, _, subtopic in frontier.pending_items():
+        pending_subtopics.append({
+            'module': module,
+            'chapter': chapter,
+            'subtopic': subtopic,
+            'estimated_hours': SUBTOPIC_HOURS,
+            'deadline': curriculum_data[module][chapter].get('deadline', DEFAULT_DEADLINE)
+        })
+    pending_subtopics.sort(key=lambda x: x['deadline'])
+    return pending_subtopics
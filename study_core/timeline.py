@@ -0,0 +1,102 @@
+import bisect
+from datetime import date, datetime, timedelta
+
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+def session_day(session):
+    started_at = session.get('started_at')
+    if isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at)
+    if isinstance(started_at, datetime):
+        return started_at.astimezone().date() if started_at.tzinfo else started_at.date()
+    value = session.get('date')
+    if isinstance(value, str) and value:
+        return date.fromisoformat(value)
+    return value if isinstance(value, date) else None
+
+
+def session_hours(session):
+    # Early study_sessions documents were written with a capitalised key
+    return float(session.get('hours', session.get('Hours', 0)) or 0)
+
+
+class StudyTimeline:
+    def __init__(self, sessions=()):
+        self.days = []
+        self.hours_by_day = {}
+        self.total_hours = 0.0
+        self.longest_streak = 0
+        # Runs of consecutive study days, indexed from both ends so a new day joins them in O(1)
+        self.run_start_by_end = {}
+        self.run_end_by_start = {}
+        self._window_day = None
+        self._window_hours = {}
+        for session in sessions:
+            self.add(session_day(session), session_hours(session))
+
+    def add(self, day, hours):
+        self.total_hours += hours
+        if day is None:
+            return
+        ordinal = day.toordinal()
+        if ordinal in self.hours_by_day:
+            self.hours_by_day[ordinal] += hours
+        else:
+            self.hours_by_day[ordinal] = hours
+            bisect.insort(self.days, ordinal)
+            self._join_runs(ordinal)
+        if self._window_day is not None:
+            for window in ROLLING_WINDOWS:
+                if self._window_day - window < ordinal <= self._window_day:
+                    self._window_hours[window] += hours
+
+    def _join_runs(self, ordinal):
+        start = self.run_start_by_end.pop(ordinal - 1, ordinal)
+        end = self.run_end_by_start.pop(ordinal + 1, ordinal)
+        if start != ordinal:
+            del self.run_end_by_start[start]
+        if end != ordinal:
+            del self.run_start_by_end[end]
+        self.run_end_by_start[start] = end
+        self.run_start_by_end[end] = start
+        self.longest_streak = max(self.longest_streak, end - start + 1)
+
+    def current_streak(self, today=None):
+        today = (today or date.today()).toordinal()
+        # A streak stays alive until the end of the day after the last study day
+        for end in (today, today - 1):
+            start = self.run_start_by_end.get(end)
+            if start is not None:
+                return end - start + 1
+        return 0
+
+    def rolling_hours(self, today=None):
+        today = (today or date.today()).toordinal()
+        if self._window_day != today:
+            upper = bisect.bisect_right(self.days, today)
+            self._window_hours = {
+                window: sum(self.hours_by_day[day] for day in self.days[bisect.bisect_right(self.days, today - window):upper])
+                for window in ROLLING_WINDOWS
+            }
+            self._window_day = today
+        return self._window_hours
+
+    def weeks(self, count=4, today=None):
+        # (first day, hours) for trailing 7-day windows, oldest first; the last one ends today
+        today = today or date.today()
+        end = today.toordinal()
+        totals = [0.0] * count
+        lower = bisect.bisect_right(self.days, end - 7 * count)
+        for day in self.days[lower:bisect.bisect_right(self.days, end)]:
+            totals[count - 1 - (end - day) // 7] += self.hours_by_day[day]
+        return [(today - timedelta(days=7 * (count - 1 - index) + 6), hours) for index, hours in enumerate(totals)]
+
+    def summary(self, today=None):
+        windows = self.rolling_hours(today)
+        return {
+            'total_hours': self.total_hours,
+            'current_streak': self.current_streak(today),
+            'longest_streak': self.longest_streak,
+            **{f'hours_{window}d': windows[window] for window in ROLLING_WINDOWS},
+        }
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+CHECKPOINT_INTERVAL = timedelta(minutes=5)
+# An active session that has not checkpointed for this long was left behind by a closed tab
+ABANDONED_AFTER = 3 * CHECKPOINT_INTERVAL
+MAX_SESSION_LENGTH = timedelta(hours=12)
+TIMER_REFRESH_SECONDS = 30
+
+ACTIVE = "active"
+COMPLETED = "completed"
+
+
+def _as_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class SessionTimer:
+    def __init__(self, session_id, started_at, checkpointed_at=None):
+        self.session_id = session_id
+        self.started_at = started_at
+        self.checkpointed_at = checkpointed_at or started_at
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record['session_id'], _as_datetime(record['started_at']), _as_datetime(record.get('checkpointed_at')))
+
+    def elapsed(self, now):
+        return min(now - self.started_at, MAX_SESSION_LENGTH)
+
+    def hours(self, now):
+        return self.elapsed(now).total_seconds() / 3600
+
+    def checkpoint_due(self, now):
+        return now - self.checkpointed_at >= CHECKPOINT_INTERVAL
+
+    def is_abandoned(self, now):
+        return now - self.checkpointed_at > ABANDONED_AFTER
+
+
+def format_duration(elapsed):
+    minutes = int(elapsed.total_seconds() // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
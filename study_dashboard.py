@@ -1,43 +1,87 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
+import os
+import gzip
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+import tempfile
+import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
 from icalendar import Calendar, Event
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from onesignal_sdk.client import Client as OneSignalClient
-from firebase_admin import credentials, initialize_app, auth, firestore
+from firebase_admin import credentials, initialize_app, get_app, auth, firestore
 import random
 import re
+import uuid
+from study_core.badges import evaluate_badges
+from study_core.burnup import burnup_series
+from study_core.curriculum import registry_stats
+from study_core.forecast import weekly_hours_target
+from study_core.frontier import GATING_MODES, ProgressFrontier
+from study_core.progress import DERIVED_SPECS as CORE_DERIVED_SPECS, ProgressStore
+from study_core.scheduler import build_study_schedule
+from study_core.segments import completion_grid
+from study_core.timeline import StudyTimeline
+from study_core.timer import ACTIVE, COMPLETED, TIMER_REFRESH_SECONDS, SessionTimer, format_duration
+from persistence import CONFLICT, FAILED, write_queue
+from notifications import BADGE, STREAK, STREAK_MILESTONES
+from admin_analytics import SCHEMAS as EXPORT_SCHEMAS
+from firestore_access import FirestoreUnavailable, managed_client
+from instrumentation import InstrumentedFirestore, instrument_rerun, percentile_summary, record, span, timed
+from progress_report import build_report_payload, report_fingerprint, get_cached_report, submit_progress_report
+from storage import FirestoreStorage, sqlite_storage
+from theme import LOW_COST_SUBTOPICS, stylesheet_tags
+
+STORAGE_BACKEND = os.getenv("STUDY_DASHBOARD_STORAGE", "firestore")
+# Sidebar stats only poll on the checklist page, where toggles rerun just their chapter
+SIDEBAR_REFRESH_SECONDS = 5
 
 # Initialize Firebase
-try:
-    _ = firestore.client()
-except ValueError:
+def initialize_firebase():
     try:
-        firebase_json = st.secrets["firebase"]["FIREBASE_SERVICE_ACCOUNT_JSON"].strip()
-        if firebase_json.startswith('"""') and firebase_json.endswith('"""'):
-            firebase_json = firebase_json[3:-3].strip()
-        if firebase_json.startswith("'") and firebase_json.endswith("'"):
-            firebase_json = firebase_json[1:-1].strip()
-        firebase_json = re.sub(r'^\s+|\s+$', '', firebase_json)
-        cred = credentials.Certificate(json.loads(firebase_json))
-        initialize_app(cred, {'projectId': st.secrets["firebase"]["FIREBASE_PROJECT_ID"]})
-    except KeyError as e:
-        st.error(f"Missing secret: {e}. Check your secrets.toml or Streamlit Cloud secrets.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Could not parse FIREBASE_SERVICE_ACCOUNT_JSON: {e}")
-        st.stop()
+        _ = firestore.client()
+    except ValueError:
+        try:
+            firebase_json = st.secrets["firebase"]["FIREBASE_SERVICE_ACCOUNT_JSON"].strip()
+            if firebase_json.startswith('"""') and firebase_json.endswith('"""'):
+                firebase_json = firebase_json[3:-3].strip()
+            if firebase_json.startswith("'") and firebase_json.endswith("'"):
+                firebase_json = firebase_json[1:-1].strip()
+            firebase_json = re.sub(r'^\s+|\s+$', '', firebase_json)
+            cred = credentials.Certificate(json.loads(firebase_json))
+            initialize_app(cred, {'projectId': st.secrets["firebase"]["FIREBASE_PROJECT_ID"]})
+        except KeyError as e:
+            st.error(f"Missing secret: {e}. Check your secrets.toml or Streamlit Cloud secrets.")
+            st.stop()
+        except Exception as e:
+            st.error(f"Could not parse FIREBASE_SERVICE_ACCOUNT_JSON: {e}")
+            st.stop()
+
+def create_firestore_client(index):
+    if index == 0:
+        return firestore.client()
+    # Extra pool members get their own app, and with it their own gRPC channel
+    app_name = f"firestore-pool-{index}"
+    try:
+        app = get_app(app_name)
+    except ValueError:
+        default_app = get_app()
+        app = initialize_app(default_app.credential, {'projectId': default_app.project_id}, name=app_name)
+    return firestore.client(app)
+
+def record_firestore_call(operation, collection, elapsed_ms, attempts, outcome):
+    record(f"firestore.{operation}.{outcome}", "firestore_access", elapsed_ms, collection=collection, attempts=attempts)
 
-db = firestore.client()
+if STORAGE_BACKEND == "sqlite":
+    storage = sqlite_storage(os.getenv("STUDY_DASHBOARD_SQLITE_PATH", "study_dashboard.db"))
+else:
+    initialize_firebase()
+    storage = FirestoreStorage(InstrumentedFirestore(managed_client(create_firestore_client, record_firestore_call)))
 
 # Page Configuration
 st.set_page_config(
@@ -47,733 +91,25 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Enhanced CSS with improved readability, gradients, and animations
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap');
-
-    /* Root Variables for Better Theming */
-    :root {
-        --primary-bg: #0f0f23;
-        --secondary-bg: #1a1a2e;
-        --accent-bg: #16213e;
-        --card-bg: rgba(26, 26, 46, 0.8);
-        --glass-bg: rgba(255, 255, 255, 0.05);
-        --primary-gradient: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        --secondary-gradient: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        --success-gradient: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-        --warning-gradient: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
-        --text-primary: #ffffff;
-        --text-secondary: #b3b3b3;
-        --text-muted: #666666;
-        --border-color: rgba(255, 255, 255, 0.1);
-        --shadow-light: 0 8px 32px rgba(0, 0, 0, 0.3);
-        --shadow-medium: 0 12px 48px rgba(0, 0, 0, 0.4);
-        --shadow-heavy: 0 20px 64px rgba(0, 0, 0, 0.5);
-        --border-radius: 16px;
-        --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-
-    /* Base Styling */
-    * {
-        box-sizing: border-box;
-    }
-
-    body {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        background: var(--primary-bg);
-        background-image: 
-            radial-gradient(circle at 25% 25%, rgba(102, 126, 234, 0.1) 0%, transparent 50%),
-            radial-gradient(circle at 75% 75%, rgba(245, 87, 108, 0.1) 0%, transparent 50%);
-        color: var(--text-primary);
-        line-height: 1.6;
-        overflow-x: hidden;
-    }
-
-    /* Scrollbar Styling */
-    ::-webkit-scrollbar {
-        width: 8px;
-        height: 8px;
-    }
-
-    ::-webkit-scrollbar-track {
-        background: var(--secondary-bg);
-    }
-
-    ::-webkit-scrollbar-thumb {
-        background: var(--primary-gradient);
-        border-radius: 10px;
-    }
-
-    ::-webkit-scrollbar-thumb:hover {
-        background: var(--secondary-gradient);
-    }
-
-    /* Sidebar Styling */
-    .sidebar .sidebar-content {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border-right: 1px solid var(--border-color);
-        border-radius: 0 var(--border-radius) var(--border-radius) 0;
-        padding: 2rem 1.5rem;
-        box-shadow: var(--shadow-medium);
-        position: relative;
-        overflow: hidden;
-    }
-
-    .sidebar .sidebar-content::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: var(--primary-gradient);
-        border-radius: var(--border-radius) var(--border-radius) 0 0;
-    }
-
-    /* Main Container */
-    .main-container {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        border-radius: var(--border-radius);
-        padding: 2.5rem;
-        margin: 1.5rem;
-        box-shadow: var(--shadow-medium);
-        position: relative;
-        overflow: hidden;
-        transition: var(--transition);
-    }
-
-    .main-container::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: var(--glass-bg);
-        backdrop-filter: blur(10px);
-        z-index: -1;
-    }
-
-    .main-container:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-heavy);
-        border-color: rgba(255, 255, 255, 0.2);
-    }
-
-    /* Header Styling */
-    .main-header {
-        background: var(--primary-gradient);
-        color: var(--text-primary);
-        padding: 3rem 2.5rem;
-        border-radius: var(--border-radius);
-        margin-bottom: 2rem;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-        box-shadow: var(--shadow-light);
-    }
-
-    .main-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(45deg, transparent 30%, rgba(255, 255, 255, 0.1) 50%, transparent 70%);
-        animation: shine 3s ease-in-out infinite;
-    }
-
-    .main-header h1 {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin: 0;
-        text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
-    }
-
-    .main-header p {
-        font-size: 1.2rem;
-        opacity: 0.9;
-        margin: 0.5rem 0 0 0;
-        font-weight: 400;
-    }
-
-    /* Stats Cards */
-    .stats-card {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        border-radius: var(--border-radius);
-        padding: 2rem;
-        margin: 0.75rem;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-        transition: var(--transition);
-        cursor: pointer;
-    }
-
-    .stats-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 3px;
-        background: var(--success-gradient);
-        border-radius: var(--border-radius) var(--border-radius) 0 0;
-    }
-
-    .stats-card:hover {
-        transform: translateY(-8px) scale(1.02);
-        box-shadow: var(--shadow-heavy);
-        border-color: rgba(255, 255, 255, 0.3);
-    }
-
-    .stats-card:hover::before {
-        background: var(--primary-gradient);
-    }
-
-    .stats-card h3 {
-        font-size: 1rem;
-        font-weight: 600;
-        color: var(--text-secondary);
-        margin: 0 0 1rem 0;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-
-    .stats-card h2 {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin: 0;
-        background: var(--primary-gradient);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-
-    .stats-card p {
-        font-size: 0.9rem;
-        color: var(--text-muted);
-        margin: 0.5rem 0 0 0;
-    }
-
-    /* Progress Cards */
-    .progress-card {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        border-left: 4px solid transparent;
-        border-image: var(--success-gradient) 1;
-        border-radius: var(--border-radius);
-        padding: 2rem;
-        margin: 0.75rem;
-        position: relative;
-        overflow: hidden;
-        transition: var(--transition);
-    }
-
-    .progress-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 4px;
-        height: 100%;
-        background: var(--success-gradient);
-        border-radius: var(--border-radius) 0 0 var(--border-radius);
-    }
-
-    .progress-card:hover {
-        transform: translateY(-4px);
-        box-shadow: var(--shadow-medium);
-    }
-
-    /* Badge Cards */
-    .badge-card {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        border-radius: var(--border-radius);
-        padding: 2rem 1.5rem;
-        margin: 0.75rem;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-        transition: var(--transition);
-        cursor: pointer;
-    }
-
-    .badge-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: var(--warning-gradient);
-        opacity: 0;
-        transition: var(--transition);
-    }
-
-    .badge-card:hover {
-        transform: translateY(-6px) scale(1.05);
-        box-shadow: var(--shadow-heavy);
-    }
-
-    .badge-card:hover::before {
-        opacity: 0.1;
-    }
-
-    .badge-card h2 {
-        font-size: 2.5rem;
-        margin: 0 0 1rem 0;
-        filter: drop-shadow(0 0 10px currentColor);
-    }
-
-    .badge-card h4 {
-        font-size: 1.1rem;
-        font-weight: 600;
-        margin: 0;
-        color: var(--text-primary);
-    }
-
-    /* Item States */
-    .locked-item {
-        background: var(--card-bg);
-        backdrop-filter: blur(10px);
-        border: 1px solid var(--border-color);
-        border-radius: 12px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        opacity: 0.6;
-        transition: var(--transition);
-        position: relative;
-    }
-
-    .locked-item::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: repeating-linear-gradient(
-            45deg,
-            transparent,
-            transparent 10px,
-            rgba(255, 255, 255, 0.02) 10px,
-            rgba(255, 255, 255, 0.02) 20px
-        );
-        pointer-events: none;
-    }
-
-    .completed-item {
-        background: linear-gradient(135deg, rgba(79, 172, 254, 0.2) 0%, rgba(0, 242, 254, 0.2) 100%);
-        border: 1px solid rgba(79, 172, 254, 0.3);
-        border-left: 4px solid #4facfe;
-        border-radius: 12px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        position: relative;
-        overflow: hidden;
-        animation: slideInFromLeft 0.5s ease-out;
-    }
-
-    .completed-item::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
-        animation: sweep 2s ease-in-out infinite;
-    }
-
-    .next-item {
-        background: linear-gradient(135deg, rgba(250, 112, 154, 0.2) 0%, rgba(254, 225, 64, 0.2) 100%);
-        border: 1px solid rgba(250, 112, 154, 0.3);
-        border-left: 4px solid #fa709a;
-        border-radius: 12px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        position: relative;
-        overflow: hidden;
-        animation: pulse 2s ease-in-out infinite;
-    }
-
-    .next-item::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
-        animation: glow 2s ease-in-out infinite;
-    }
-
-    /* Motivational Quote */
-    .motivational-quote {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        border-radius: var(--border-radius);
-        padding: 2.5rem;
-        margin: 2rem 0;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-    }
-
-    .motivational-quote::before {
-        content: '"';
-        position: absolute;
-        top: 1rem;
-        left: 2rem;
-        font-size: 4rem;
-        color: var(--text-muted);
-        font-family: 'Georgia', serif;
-    }
-
-    .motivational-quote::after {
-        content: '"';
-        position: absolute;
-        bottom: 1rem;
-        right: 2rem;
-        font-size: 4rem;
-        color: var(--text-muted);
-        font-family: 'Georgia', serif;
-    }
-
-    /* Tooltips */
-    .tooltip {
-        position: relative;
-        display: inline-block;
-        cursor: help;
-    }
-
-    .tooltip .tooltiptext {
-        visibility: hidden;
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid var(--border-color);
-        color: var(--text-primary);
-        text-align: center;
-        border-radius: 8px;
-        padding: 12px 16px;
-        position: absolute;
-        z-index: 1000;
-        bottom: 150%;
-        left: 50%;
-        transform: translateX(-50%) translateY(10px);
-        opacity: 0;
-        transition: var(--transition);
-        white-space: nowrap;
-        font-size: 0.875rem;
-        box-shadow: var(--shadow-light);
-    }
-
-    .tooltip .tooltiptext::after {
-        content: '';
-        position: absolute;
-        top: 100%;
-        left: 50%;
-        transform: translateX(-50%);
-        border: 6px solid transparent;
-        border-top-color: var(--border-color);
-    }
-
-    .tooltip:hover .tooltiptext {
-        visibility: visible;
-        opacity: 1;
-        transform: translateX(-50%) translateY(0);
-    }
-
-    /* Message Boxes */
-    .message-box {
-        background: var(--card-bg);
-        backdrop-filter: blur(20px);
-        border: 1px solid rgba(79, 172, 254, 0.3);
-        border-left: 4px solid #4facfe;
-        border-radius: 12px;
-        padding: 1rem;
-        margin: 1rem 0;
-        position: relative;
-        overflow: hidden;
-        animation: slideInFromRight 0.5s ease-out;
-    }
-
-    .message-box.warning {
-        border-color: rgba(250, 112, 154, 0.3);
-        border-left-color: #fa709a;
-        background: linear-gradient(135deg, rgba(250, 112, 154, 0.1) 0%, rgba(254, 225, 64, 0.1) 100%);
-    }
-
-    .completion-message {
-        font-size: 1.1rem;
-        font-weight: 500;
-        margin: 0.75rem 0;
-        animation: fadeInUp 0.7s ease-out;
-    }
-
-    /* Buttons */
-    .stButton>button {
-        background: var(--primary-gradient) !important;
-        color: var(--text-primary) !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 0.75rem 2rem !important;
-        font-weight: 600 !important;
-        font-size: 1rem !important;
-        transition: var(--transition) !important;
-        position: relative !important;
-        overflow: hidden !important;
-        box-shadow: var(--shadow-light) !important;
-    }
-
-    .stButton>button::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-        transition: left 0.5s ease;
-    }
-
-    .stButton>button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: var(--shadow-heavy) !important;
-    }
-
-    .stButton>button:hover::before {
-        left: 100%;
-    }
-
-    .stButton>button:active {
-        transform: translateY(0) !important;
-    }
-
-    /* Form Inputs */
-    .stTextInput>div>input,
-    .stTimeInput>div>input,
-    .stSelectbox>div>select,
-    .stMultiselect>div>select {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 12px !important;
-        padding: 0.75rem 1rem !important;
-        color: var(--text-primary) !important;
-        font-size: 1rem !important;
-        transition: var(--transition) !important;
-    }
-
-    .stTextInput>div>input:focus,
-    .stTimeInput>div>input:focus,
-    .stSelectbox>div>select:focus,
-    .stMultiselect>div>select:focus {
-        border-color: rgba(102, 126, 234, 0.5) !important;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.2) !important;
-        outline: none !important;
-    }
-
-    /* Expanders */
-    .stExpander {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: var(--border-radius) !important;
-        margin-bottom: 1.5rem !important;
-        overflow: hidden !important;
-        transition: var(--transition) !important;
-    }
-
-    .stExpander:hover {
-        border-color: rgba(255, 255, 255, 0.2) !important;
-        box-shadow: var(--shadow-light) !important;
-    }
-
-    .stExpander > div > div {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-    }
-
-    /* Charts */
-    .stPlotlyChart {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: var(--border-radius) !important;
-        padding: 1.5rem !important;
-        margin: 1rem 0 !important;
-        transition: var(--transition) !important;
-    }
-
-    .stPlotlyChart:hover {
-        transform: translateY(-3px) !important;
-        box-shadow: var(--shadow-medium) !important;
-    }
-
-    /* DataFrames */
-    .stDataFrame {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: var(--border-radius) !important;
-        overflow: hidden !important;
-        box-shadow: var(--shadow-light) !important;
-    }
-
-    /* Metrics */
-    .stMetric {
-        background: var(--card-bg) !important;
-        backdrop-filter: blur(20px) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 12px !important;
-        padding: 1.5rem !important;
-        margin: 1rem 0 !important;
-        transition: var(--transition) !important;
-    }
-
-    .stMetric:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: var(--shadow-light) !important;
-    }
-
-    /* Animations */
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); opacity: 1; }
-        50% { transform: scale(1.02); opacity: 0.9; }
-    }
-
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-
-    @keyframes slideInFromLeft {
-        from {
-            opacity: 0;
-            transform: translateX(-30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateX(0);
-        }
-    }
-
-    @keyframes slideInFromRight {
-        from {
-            opacity: 0;
-            transform: translateX(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateX(0);
-        }
-    }
-
-    @keyframes shine {
-        0% { transform: translateX(-100%) rotate(45deg); }
-        100% { transform: translateX(100%) rotate(45deg); }
-    }
-
-    @keyframes sweep {
-        0% { transform: translateX(-100%); }
-        100% { transform: translateX(100%); }
-    }
-
-    @keyframes glow {
-        0%, 100% { opacity: 0.5; }
-        50% { opacity: 1; }
-    }
-
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        .main-container {
-            margin: 0.5rem;
-            padding: 1.5rem;
-        }
-        
-        .main-header {
-            padding: 2rem 1.5rem;
-        }
-        
-        .main-header h1 {
-            font-size: 2rem;
-        }
-        
-        .stats-card {
-            margin: 0.5rem 0;
-        }
-        
-        .stats-card h2 {
-            font-size: 2rem;
-        }
-    }
-
-    /* Loading States */
-    .loading {
-        animation: pulse 2s ease-in-out infinite;
-    }
-
-    /* Focus States for Accessibility */
-    *:focus {
-        outline: 2px solid rgba(102, 126, 234, 0.5);
-        outline-offset: 2px;
-    }
-
-    /* Custom Selection */
-    ::selection {
-        background: rgba(102, 126, 234, 0.3);
-        color: var(--text-primary);
-    }
-
-    /* High Contrast Mode Support */
-    @media (prefers-contrast: high) {
-        :root {
-            --border-color: rgba(255, 255, 255, 0.3);
-            --text-secondary: #e0e0e0;
-        }
-    }
-
-    /* Reduced Motion Support */
-    @media (prefers-reduced-motion: reduce) {
-        * {
-            animation-duration: 0.01ms !important;
-            animation-iteration-count: 1 !important;
-            transition-duration: 0.01ms !important;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+# Derived values recomputed only when their inputs' versions change, each timed as stats.<name>
+DERIVED_SPECS = {
+    name: (deps, timed(f"stats.{name}", "compute")(compute))
+    for name, (deps, compute) in CORE_DERIVED_SPECS.items()
+}
+build_frontier = timed("stats.frontier", "compute")(ProgressFrontier)
 
 # Initialize session state
 if 'initialized' not in st.session_state:
     st.session_state.initialized = True
-    st.session_state.curriculum_data = None
-    st.session_state.curriculum_file = None
-    st.session_state.progress_data = {}
-    st.session_state.study_hours = 0
-    st.session_state.streak_counter = 0
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.progress_store = ProgressStore(specs=DERIVED_SPECS, frontier_factory=build_frontier)
+    st.session_state.study_timeline = StudyTimeline()
     st.session_state.badges = []
     st.session_state.last_study_date = None
+    st.session_state.active_timer = None
+    st.session_state.study_session_notice = None
     st.session_state.dark_mode = False
+    st.session_state.reduced_motion = False
     st.session_state.notifications_enabled = True
     st.session_state.user_email = ""
     st.session_state.schedule_data = []
@@ -781,6 +117,9 @@ if 'initialized' not in st.session_state:
     st.session_state.authenticated = False
     st.session_state.reset_confirmed = False
     st.session_state.completion_messages = {}
+    st.session_state.report_job = None
+    st.session_state.debug_panel = os.getenv("STUDY_DASHBOARD_DEBUG") == "1"
+    st.session_state.last_rerun_profile = []
 
 # Motivational quotes
 MOTIVATIONAL_QUOTES = [
@@ -810,36 +149,36 @@ MOTIVATIONAL_QUOTES = [
 def get_motivational_quote():
     return random.choice(MOTIVATIONAL_QUOTES)
 
-def load_curriculum_data():
-    if 'curriculum_file' not in st.session_state or st.session_state.curriculum_file is None:
-        st.warning("Please upload a curriculum CSV file to populate the checklist.")
-        return {}
-    
+def set_session_curriculum(csv_string):
     try:
-        df = pd.read_csv(st.session_state.curriculum_file)
-        curriculum_data = {}
-        for (module, chapter), group in df.groupby(['Module', 'Chapter']):
-            subtopics = group['Subtopic'].tolist()
-            project = group['Project'].iloc[0] if not group['Project'].empty else ""
-            if module not in curriculum_data:
-                curriculum_data[module] = {}
-            curriculum_data[module][chapter] = {
-                'subtopics': subtopics,
-                'project': project
-            }
-        return curriculum_data
+        progress_store().set_curriculum(csv_string)
+        return True
     except Exception as e:
         st.error(f"Error loading curriculum data: {str(e)}")
-        return {}
+        return False
+
+def progress_store():
+    return st.session_state.progress_store
+
+def current_curriculum():
+    return progress_store().curriculum
+
+@timed("curriculum.load", "compute")
+def load_curriculum_data():
+    if progress_store().curriculum_ref is None and st.session_state.user_id:
+        csv_string = download_curriculum_from_firestore(st.session_state.user_id)
+        if csv_string:
+            set_session_curriculum(csv_string)
+    return current_curriculum()
 
 # Authentication functions
 def sign_in(email, password):
     try:
-        user = auth.get_user_by_email(email)
-        st.session_state.user_id = user.uid
+        user_id = storage.lookup_user(email)
+        st.session_state.user_id = user_id
         st.session_state.user_email = email
         st.session_state.authenticated = True
-        sync_user_data(user.uid)
+        sync_user_data(user_id)
         st.success("Signed in successfully!")
     except auth.AuthError as e:
         st.error(f"Sign-in error: {str(e)}")
@@ -848,12 +187,11 @@ def sign_in(email, password):
 
 def sign_up(email, password):
     try:
-        user = auth.create_user(email=email, password=password)
-        st.session_state.user_id = user.uid
+        user_id = storage.create_user(email, password)
+        st.session_state.user_id = user_id
         st.session_state.user_email = email
         st.session_state.authenticated = True
-        db.collection('users').document(user.uid).set({'email': email})
-        sync_user_data(user.uid)
+        sync_user_data(user_id)
         st.success("Signed up successfully!")
     except auth.AuthError as e:
         st.error(f"Sign-up error: {str(e.detail)}")
@@ -864,134 +202,145 @@ def sign_out():
     st.session_state.user_id = None
     st.session_state.user_email = ""
     st.session_state.authenticated = False
-    st.session_state.progress_data = {}
+    progress_store().clear()
     st.session_state.badges = []
-    st.session_state.study_hours = 0
-    st.session_state.streak_counter = 0
+    st.session_state.study_timeline = StudyTimeline()
+    st.session_state.active_timer = None
     st.session_state.schedule_data = []
     st.success("Signed out successfully!")
 
+@timed("firestore.sync_user_data", "compute")
 def sync_user_data(user_id):
     try:
-        progress_ref = db.collection('progress').where(
-            filter=firestore.FieldFilter('user_id', '==', user_id)
-        ).where(
-            filter=firestore.FieldFilter('completed', '==', True)
-        )
-        docs = progress_ref.stream()
-        for doc in docs:
-            data = doc.to_dict()
-            key = f"{data['module']}_{data['chapter']}_{data['subtopic']}"
-            st.session_state.progress_data[key] = data['completed']
+        progress_store().load(storage.completed_progress(user_id))
         
-        badges_ref = db.collection('badges').where(
-            filter=firestore.FieldFilter('user_id', '==', user_id)
-        )
-        docs = badges_ref.stream()
-        st.session_state.badges = [doc.to_dict()['badge_name'] for doc in docs]
+        st.session_state.badges = storage.load_badges(user_id)
         
-        sessions_ref = db.collection('study_sessions').where(
-            filter=firestore.FieldFilter('user_id', '==', user_id)
-        )
-        docs = sessions_ref.stream()
-        st.session_state.study_hours = sum(doc.to_dict().get('Hours', 0) for doc in docs)
-        st.session_state.streak_counter = len(list(docs)) if docs else 0
+        sessions = storage.load_study_sessions(user_id)
+        st.session_state.study_timeline = StudyTimeline(s for s in sessions if s.get('status') != ACTIVE)
+        recover_study_sessions(user_id, [s for s in sessions if s.get('status') == ACTIVE])
+    except FirestoreUnavailable as e:
+        st.warning(f"☁️ Firestore is slow to respond, showing progress cached in this session. {str(e)}")
     except Exception as e:
         st.error(f"Error syncing data from Firestore: {str(e)}")
 
 def save_progress_to_supabase(user_id, module, chapter, subtopic, completed):
-    try:
-        doc_id = f"{user_id}_{module}_{chapter}_{subtopic}".replace(" ", "_")
-        doc_ref = db.collection('progress').document(doc_id)
-        doc_ref.set({
-            'user_id': user_id,
-            'module': module,
-            'chapter': chapter,
-            'subtopic': subtopic,
-            'completed': completed,
-            'completed_at': firestore.SERVER_TIMESTAMP if completed else None,
-            'created_at': firestore.SERVER_TIMESTAMP
-        })
-        return True
-    except Exception as e:
-        st.error(f"Error saving progress to Firestore: {str(e)}")
-        return False
+    updated_at = datetime.now(timezone.utc)
+    write_queue.submit(
+        st.session_state.session_id,
+        (module, chapter, subtopic),
+        lambda: storage.write_progress(user_id, module, chapter, subtopic, completed, updated_at),
+        completed
+    )
+
+def reconcile_pending_writes():
+    changed = False
+    for status, job, detail in write_queue.drain(st.session_state.session_id):
+        module, chapter, subtopic = job.key
+        is_completed = progress_store().is_completed(module, chapter, subtopic)
+        if status == FAILED and is_completed == job.payload:
+            notice = f"⚠️ Couldn't save '{subtopic}' ({detail}). The change was rolled back."
+        elif status == CONFLICT and is_completed != detail:
+            notice = f"🔄 '{subtopic}' was updated from another device."
+        else:
+            continue
+        set_reconciled_value(module, chapter, subtopic, not job.payload if status == FAILED else detail)
+        # Also kept next to the subtopic, since a toast is lost if the caller reruns the app to show the change
+        st.session_state.completion_messages[f"{module}_{chapter}_{subtopic}"] = notice
+        st.toast(notice)
+        changed = True
+    return changed
+
+def rerun_fragment():
+    # scope="fragment" raises unless this is a fragment rerun; fragments also run as part of full-app runs
+    ctx = get_script_run_ctx()
+    st.rerun(scope="fragment" if ctx is not None and ctx.fragment_ids_this_run else "app")
+
+def set_reconciled_value(module, chapter, subtopic, completed):
+    apply_progress_change(module, chapter, subtopic, completed)
+    # Drop the checkbox's own state too, or it keeps the rejected value and the write is submitted again
+    st.session_state.pop(f"checkbox_{module}_{chapter}_{subtopic}", None)
 
 def save_badge_to_supabase(user_id, badge_name):
     try:
-        doc_ref = db.collection('badges').document(f"{user_id}_{badge_name}".replace(" ", "_"))
-        doc_ref.set({
-            'user_id': user_id,
-            'badge_name': badge_name,
-            'earned_at': firestore.SERVER_TIMESTAMP
-        })
+        storage.save_badge(user_id, badge_name)
+    except FirestoreUnavailable as e:
+        st.warning(f"☁️ Badge '{badge_name}' will be saved on your next sync. {str(e)}")
     except Exception as e:
         st.error(f"Error saving badge to Firestore: {str(e)}")
 
-def save_study_session_to_supabase(user_id, hours):
+def save_study_session_to_supabase(user_id, session_id, started_at, hours, status=COMPLETED, checkpointed_at=None):
     try:
-        doc_ref = db.collection('study_sessions').document(f"{user_id}_{datetime.now().date().isoformat()}")
-        doc_ref.set({
-            'user_id': user_id,
-            'date': datetime.now().date().isoformat(),
-            'hours': hours
-        })
+        storage.save_study_session(user_id, session_id, started_at, hours, status, checkpointed_at)
+        return True
     except Exception as e:
         st.error(f"Error saving study session to Firestore: {str(e)}")
+        return False
 
-def send_email_notification(to_email, subject, content):
-    try:
-        sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-        message = Mail(
-            from_email=os.getenv("FROM_EMAIL"),
-            to_emails=to_email,
-            subject=subject,
-            html_content=content
-        )
-        response = sg.send(message)
-        if response.status_code == 202:
-            st.success("Email notification sent!")
+def recover_study_sessions(user_id, active_sessions):
+    now = datetime.now(timezone.utc)
+    for session in sorted(active_sessions, key=lambda session: str(session['started_at'])):
+        timer = SessionTimer.from_record(session)
+        if timer.is_abandoned(now):
+            # The tab closed mid-session: credit the time up to the last checkpoint
+            hours = timer.hours(timer.checkpointed_at)
+            if save_study_session_to_supabase(user_id, timer.session_id, timer.started_at, hours, COMPLETED, timer.checkpointed_at):
+                st.session_state.study_timeline.add(timer.started_at.astimezone().date(), hours)
         else:
-            st.error(f"Failed to send email: {response.status_code} - {response.body.decode('utf-8')}")
-    except Exception as e:
-        st.error(f"Error sending email: {str(e)}")
-
-def send_push_notification(message):
+            st.session_state.active_timer = timer
+
+def start_study_session():
+    timer = SessionTimer(uuid.uuid4().hex, datetime.now(timezone.utc))
+    if save_study_session_to_supabase(st.session_state.user_id, timer.session_id, timer.started_at, 0, ACTIVE):
+        st.session_state.active_timer = timer
+
+def checkpoint_study_session(timer, now):
+    if timer.checkpoint_due(now):
+        if save_study_session_to_supabase(st.session_state.user_id, timer.session_id, timer.started_at, timer.hours(now), ACTIVE, now):
+            timer.checkpointed_at = now
+
+def stop_study_session():
+    timer = st.session_state.active_timer
+    now = datetime.now(timezone.utc)
+    hours = timer.hours(now)
+    if save_study_session_to_supabase(st.session_state.user_id, timer.session_id, timer.started_at, hours, COMPLETED, now):
+        st.session_state.active_timer = None
+        streak_before = st.session_state.study_timeline.current_streak()
+        st.session_state.study_timeline.add(timer.started_at.astimezone().date(), hours)
+        st.session_state.last_study_date = timer.started_at.astimezone().date()
+        streak = st.session_state.study_timeline.current_streak()
+        if streak > streak_before and streak in STREAK_MILESTONES:
+            queue_notification(STREAK, f"{streak}-day study streak! Keep it going.")
+        check_and_award_badges()
+        return hours
+    return None
+
+@timed("notify.enqueue", "notification")
+def queue_notification(kind, message):
+    # Events are sent later as one digest per user by notifications.py
+    if not (st.session_state.notifications_enabled and st.session_state.user_id):
+        return
     try:
-        client = OneSignalClient(
-            app_id=os.getenv("ONESIGNAL_APP_ID"),
-            rest_api_key=os.getenv("ONESIGNAL_API_KEY")
-        )
-        notification_body = {
-            "contents": {"en": message},
-            "included_segments": ["All"]
-        }
-        response = client.send_notification(notification_body)
-        if response.status_code == 200:
-            st.success("Push notification sent!")
-        else:
-            st.error(f"Failed to send push notification: {response.status_code} - {response.body}")
+        storage.enqueue_notification(st.session_state.user_id, st.session_state.user_email, kind, message)
     except Exception as e:
-        st.error(f"Error sending push notification: {str(e)}")
+        st.warning(f"Could not queue notification: {str(e)}")
 
-def calculate_progress_stats(progress_data, curriculum_data):
-    if not curriculum_data:
-        return 0, 0, 0, 0
-    
-    total_subtopics = 0
-    completed_subtopics = 0
-    
-    for module, chapters in curriculum_data.items():
-        for chapter, content in chapters.items():
-            total_subtopics += len(content.get('subtopics', []))
-            for subtopic in content.get('subtopics', []):
-                if progress_data.get(f"{module}_{chapter}_{subtopic}", False):
-                    completed_subtopics += 1
-    
-    completion_percentage = (completed_subtopics / total_subtopics * 100) if total_subtopics > 0 else 0
-    
-    return completion_percentage, completed_subtopics, total_subtopics, len(curriculum_data)
+def get_frontier():
+    return progress_store().get_frontier()
+
+def get_next_up(k=3):
+    return progress_store().top_next_up(k)
+
+def apply_progress_change(module, chapter, subtopic, completed):
+    return progress_store().apply_change(module, chapter, subtopic, completed)
+
+def derived(name):
+    return progress_store().derived(name)
+
+def study_summary():
+    return st.session_state.study_timeline.summary()
 
+@timed("render.dashboard", "render")
 def render_progress_dashboard():
     if not st.session_state.authenticated:
         st.warning("Please sign in to access the dashboard.")
@@ -1000,12 +349,11 @@ def render_progress_dashboard():
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.markdown('<div class="main-header"><h1>📚 Study Progress Dashboard</h1><p>Your learning journey, gamified and visualized!</p></div>', unsafe_allow_html=True)
     
-    if st.session_state.curriculum_data is None:
-        st.session_state.curriculum_data = load_curriculum_data()
+    if not load_curriculum_data():
+        st.warning("Please upload a curriculum CSV file to populate the checklist.")
     
-    completion_percentage, completed_subtopics, total_subtopics, total_modules = calculate_progress_stats(
-        st.session_state.progress_data, st.session_state.curriculum_data
-    )
+    completion_percentage, completed_subtopics, total_subtopics, total_modules = derived('progress_stats')
+    summary = study_summary()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -1031,7 +379,7 @@ def render_progress_dashboard():
         st.markdown(f"""
         <div class="stats-card">
             <h3>⏰ Study Hours</h3>
-            <h2>{st.session_state.study_hours}</h2>
+            <h2>{summary['total_hours']:.1f}</h2>
             <p>Hours Logged</p>
         </div>
         """, unsafe_allow_html=True)
@@ -1040,132 +388,241 @@ def render_progress_dashboard():
         st.markdown(f"""
         <div class="stats-card">
             <h3>🔥 Streak</h3>
-            <h2>{st.session_state.streak_counter}</h2>
+            <h2>{summary['current_streak']}</h2>
             <p>Days in a Row</p>
         </div>
         """, unsafe_allow_html=True)
     
     st.markdown(f'<div class="motivational-quote">💡 {get_motivational_quote()}</div>', unsafe_allow_html=True)
     
+    next_up = get_next_up(3)
+    if next_up:
+        st.subheader("🎯 Next Up")
+        for item in next_up:
+            st.markdown(
+                f'<div class="next-item">⏳ {item["subtopic"]}<br><small>{item["module"].split(":")[0]} · {item["chapter"]} · ~{item["estimated_hours"]}h</small></div>',
+                unsafe_allow_html=True
+            )
+    
     col1, col2 = st.columns(2)
     
     with col1:
         module_completion = []
         module_names = []
         
-        for module, chapters in st.session_state.curriculum_data.items():
-            total_module_subtopics = 0
-            completed_module_subtopics = 0
-            
-            for chapter, content in chapters.items():
-                total_module_subtopics += len(content.get('subtopics', []))
-                for subtopic in content.get('subtopics', []):
-                    if st.session_state.progress_data.get(f"{module}_{chapter}_{subtopic}", False):
-                        completed_module_subtopics += 1
-            
+        for module, completed_module_subtopics, total_module_subtopics in derived('module_completion'):
             completion_rate = (completed_module_subtopics / total_module_subtopics * 100) if total_module_subtopics > 0 else 0
             module_completion.append(completion_rate)
             module_names.append(module.split(":")[0])
         
-        fig_pie = px.pie(
-            values=module_completion,
-            names=module_names,
-            title="Module Completion Distribution",
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            hover_data={'values': module_completion},
-        )
-        fig_pie.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hovertemplate='<b>%{label}</b><br>Completion: %{value:.1f}%<extra></extra>',
-            pull=[0.05] * len(module_names),
-            marker=dict(line=dict(color='#ffffff', width=2))
-        )
-        fig_pie.update_layout(
-            margin=dict(t=50, b=50, l=50, r=50),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            showlegend=True,
-            font=dict(size=14, family='Roboto', color='#1e293b'),
-            hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
-        )
+        with span("plotly.module_pie", "plotly"):
+            fig_pie = px.pie(
+                values=module_completion,
+                names=module_names,
+                title="Module Completion Distribution",
+                color_discrete_sequence=px.colors.qualitative.Set2,
+                hover_data={'values': module_completion},
+            )
+            fig_pie.update_traces(
+                textposition='inside',
+                textinfo='percent+label',
+                hovertemplate='<b>%{label}</b><br>Completion: %{value:.1f}%<extra></extra>',
+                pull=[0.05] * len(module_names),
+                marker=dict(line=dict(color='#ffffff', width=2))
+            )
+            fig_pie.update_layout(
+                margin=dict(t=50, b=50, l=50, r=50),
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                showlegend=True,
+                font=dict(size=14, family='Roboto', color='#1e293b'),
+                hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
+            )
         st.plotly_chart(fig_pie, use_container_width=True)
     
     with col2:
-        weeks = ['Week 1', 'Week 2', 'Week 3', 'Week 4']
-        hours = [15, 22, 18, 25]
-        
-        fig_bar = px.bar(
-            x=weeks,
-            y=hours,
-            title="Weekly Study Hours",
-            color=hours,
-            color_continuous_scale="Viridis",
-            text=hours,
-        )
-        fig_bar.update_traces(
-            textposition='outside',
-            hovertemplate='<b>%{x}</b><br>Hours: %{y}<extra></extra>',
-            marker=dict(line=dict(color='#ffffff', width=2)),
-            selector=dict(type='bar')
-        )
-        fig_bar.update_layout(
-            margin=dict(t=50, b=50, l=50, r=50),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=14, family='Roboto', color='#1e293b'),
-            hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto'),
-            xaxis_title="Week",
-            yaxis_title="Hours",
-            showlegend=False
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
-    
-    st.subheader("📈 Completed Subtopics by Module")
-    try:
-        progress_ref = db.collection('progress').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        ).where(
-            filter=firestore.FieldFilter('completed', '==', True)
-        )
-        docs = progress_ref.stream()
-        progress_data = [doc.to_dict() for doc in docs]
-        module_counts = {}
-        for entry in progress_data:
-            module = entry['module'].split(":")[0]
-            module_counts[module] = module_counts.get(module, 0) + 1
+        weekly = st.session_state.study_timeline.weeks(4)
+        weeks = [f"{start:%b %d}" for start, _ in weekly]
+        hours = [round(total, 1) for _, total in weekly]
         
-        if module_counts:
-            modules = list(module_counts.keys())
-            counts = list(module_counts.values())
-            fig_subtopics = go.Figure(data=[
-                go.Bar(
-                    x=modules,
-                    y=counts,
-                    marker_color='#22d3ee',
-                    text=counts,
+        if not any(hours):
+            st.info("No study hours in the last 4 weeks. Time a session from the sidebar to see your weekly totals here.")
+        else:
+            with span("plotly.weekly_hours", "plotly"):
+                fig_bar = px.bar(
+                    x=weeks,
+                    y=hours,
+                    title="Weekly Study Hours",
+                    color=hours,
+                    color_continuous_scale="Viridis",
+                    text=hours,
+                )
+                fig_bar.update_traces(
                     textposition='outside',
-                    hovertemplate='<b>%{x}</b><br>Completed: %{y}<extra></extra>',
-                    marker=dict(line=dict(color='#ffffff', width=2))
+                    hovertemplate='<b>%{x}</b><br>Hours: %{y}<extra></extra>',
+                    marker=dict(line=dict(color='#ffffff', width=2)),
+                    selector=dict(type='bar')
+                )
+                fig_bar.update_layout(
+                    margin=dict(t=50, b=50, l=50, r=50),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    font=dict(size=14, family='Roboto', color='#1e293b'),
+                    hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto'),
+                    xaxis_title="Week starting",
+                    yaxis_title="Hours",
+                    showlegend=False
+                )
+            st.plotly_chart(fig_bar, use_container_width=True)
+    
+    st.subheader("🗺️ Chapter Heatmap")
+    segments = derived('segments')
+    if len(segments.chapters):
+        aggregates = derived('segment_completion')
+        grid, names = completion_grid(segments, aggregates)
+        module_labels = [module.split(":")[0] for module in segments.modules]
+        with span("plotly.chapter_heatmap", "plotly"):
+            fig_heatmap = go.Figure(data=[
+                go.Heatmap(
+                    z=grid,
+                    x=[f"Ch {i + 1}" for i in range(grid.shape[1])],
+                    y=module_labels,
+                    customdata=names,
+                    zmin=0,
+                    zmax=100,
+                    colorscale="Viridis",
+                    hoverongaps=False,
+                    xgap=2,
+                    ygap=2,
+                    hovertemplate='<b>%{y}</b><br>%{customdata}<br>Completion: %{z:.0f}%<extra></extra>',
+                    colorbar=dict(title="%")
                 )
             ])
-            fig_subtopics.update_layout(
-                title="Completed Subtopics by Module",
-                xaxis_title="Module",
-                yaxis_title="Completed Subtopics",
-                template="plotly_white",
-                margin=dict(t=50, b=50, l=50, r=50),
+            fig_heatmap.update_layout(
+                margin=dict(t=30, b=50, l=50, r=50),
+                height=max(300, 28 * len(module_labels) + 120),
+                yaxis=dict(autorange="reversed"),
                 font=dict(size=14, family='Roboto', color='#1e293b'),
                 hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
             )
-            st.plotly_chart(fig_subtopics, use_container_width=True)
-        else:
-            st.info("No completed subtopics yet. Mark some in the Checklist to see the chart!")
-    except Exception as e:
-        st.error(f"Error fetching progress from Firestore: {str(e)}")
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+        render_module_drilldown()
+    else:
+        st.info("Upload a curriculum to see completion by chapter.")
+    
+    st.subheader("📈 Progress Over Time")
+    times = derived('completion_times')
+    forecast = derived('forecast')
+    if len(times):
+        with span("stats.burnup", "compute"):
+            x, done, remaining = burnup_series(times, total_subtopics, untimed=max(0, completed_subtopics - len(times)))
+        dates = pd.to_datetime(x, unit='s', utc=True)
+        with span("plotly.burnup", "plotly"):
+            fig_timeline = go.Figure(data=[
+                go.Scatter(
+                    x=dates,
+                    y=done,
+                    name="Completed",
+                    mode='lines',
+                    line=dict(color='#22d3ee', width=3),
+                    fill='tozeroy',
+                    hovertemplate='%{x|%Y-%m-%d}<br>Completed: %{y}<extra></extra>'
+                ),
+                go.Scatter(
+                    x=dates,
+                    y=remaining,
+                    name="Remaining",
+                    mode='lines',
+                    line=dict(color='#f5576c', width=3, dash='dot'),
+                    hovertemplate='%{x|%Y-%m-%d}<br>Remaining: %{y}<extra></extra>'
+                )
+            ])
+            if forecast and forecast['remaining']:
+                # Projection from today: the central estimate, over a band shaded from earliest to latest finish
+                today = pd.Timestamp.now(tz='UTC').normalize()
+                projections = (
+                    ('finish_early', "Finish range (80%)", dict(width=0), None, False),
+                    ('finish_late', "Finish range (80%)", dict(width=0), 'tonexty', True),
+                    ('finish', "Projected", dict(color='#a78bfa', width=2, dash='dash'), None, True),
+                )
+                for key, name, line, fill, showlegend in projections:
+                    fig_timeline.add_trace(go.Scatter(
+                        x=[today, pd.Timestamp(forecast[key], tz='UTC')],
+                        y=[completed_subtopics, total_subtopics],
+                        name=name,
+                        mode='lines',
+                        line=line,
+                        fill=fill,
+                        fillcolor='rgba(167, 139, 250, 0.2)',
+                        showlegend=showlegend,
+                        hovertemplate='%{x|%Y-%m-%d}<br>Projected: %{y}<extra></extra>'
+                    ))
+            fig_timeline.update_layout(
+                xaxis_title="Date",
+                yaxis_title="Subtopics",
+                margin=dict(t=30, b=50, l=50, r=50),
+                legend=dict(orientation='h', y=1.1),
+                font=dict(size=14, family='Roboto', color='#1e293b'),
+                hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
+            )
+        st.plotly_chart(fig_timeline, use_container_width=True)
+    else:
+        st.info("No completed subtopics yet. Mark some in the Checklist to see the chart!")
+    
+    st.subheader("🔮 Forecast")
+    if forecast is None:
+        st.info("Complete a few subtopics over the coming weeks to get a projected finish date.")
+    elif not forecast['remaining']:
+        st.success("🎉 Everything is complete!")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Projected Finish", f"{forecast['finish']:%Y-%m-%d}")
+        col2.metric("Finish Range", f"{forecast['finish_early']:%b %d} – {forecast['finish_late']:%b %d, %Y}")
+        col3.metric("Pace", f"{forecast['rate']:.1f} subtopics/week", help=f"80% band: {forecast['rate_low']:.1f}–{forecast['rate_high']:.1f} per week")
+        modules_df = pd.DataFrame([module for module in forecast['modules'] if module['remaining']])
+        modules_df.columns = ["Module", "Remaining", "Projected Finish", "Earliest", "Latest"]
+        st.dataframe(modules_df, use_container_width=True, hide_index=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Opening another module reruns only the drill-down
+@st.fragment
+def render_module_drilldown():
+    segments = derived('segments')
+    aggregates = derived('segment_completion')
+    module_index = st.selectbox(
+        "🔎 Open module",
+        range(len(segments.modules)),
+        format_func=lambda i: f"{segments.modules[i]} ({aggregates['module_completed'][i]:.0f}/{segments.module_totals[i]:.0f})"
+    )
+    in_module = segments.module_of_chapter == module_index
+    completed = aggregates['chapter_completed'][in_module]
+    totals = segments.chapter_totals[in_module]
+    rates = np.divide(completed * 100.0, totals, out=np.zeros(len(totals)), where=totals > 0)
+    with span("plotly.module_drilldown", "plotly"):
+        fig_chapters = go.Figure(data=[
+            go.Bar(
+                x=rates,
+                y=segments.chapters[in_module],
+                orientation='h',
+                marker=dict(color=rates, colorscale="Viridis", cmin=0, cmax=100, line=dict(color='#ffffff', width=1)),
+                customdata=np.stack([completed, totals], axis=-1),
+                text=[f"{rate:.0f}%" for rate in rates],
+                textposition='outside',
+                hovertemplate='<b>%{y}</b><br>%{customdata[0]}/%{customdata[1]} subtopics<extra></extra>'
+            )
+        ])
+        fig_chapters.update_layout(
+            xaxis=dict(range=[0, 110], title="Completion %"),
+            yaxis=dict(autorange="reversed"),
+            height=max(300, 30 * len(totals) + 100),
+            margin=dict(t=30, b=50, l=50, r=50),
+            font=dict(size=14, family='Roboto', color='#1e293b'),
+            hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
+        )
+    st.plotly_chart(fig_chapters, use_container_width=True)
+
+@timed("render.checklist", "render")
 def render_curriculum_checklist():
     if not st.session_state.authenticated:
         st.warning("Please sign in to access the checklist.")
@@ -1174,124 +631,104 @@ def render_curriculum_checklist():
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.header("📋 Curriculum Checklist")
     
-    if st.session_state.curriculum_data is None or st.session_state.curriculum_file is None:
-        file_obj = download_curriculum_from_firestore(st.session_state.user_id)
-        if file_obj:
-            st.session_state.curriculum_file = file_obj
-            st.session_state.curriculum_data = load_curriculum_data()
-        if st.session_state.curriculum_data is None or st.session_state.curriculum_file is None:
-            uploaded_file = st.file_uploader("Upload Curriculum CSV", type=["csv"], help="Upload a CSV file containing your curriculum data.")
-            if uploaded_file is not None:
-                upload_curriculum_to_firestore(st.session_state.user_id, uploaded_file)
-                file_obj = download_curriculum_from_firestore(st.session_state.user_id)
-                if file_obj:
-                    st.session_state.curriculum_file = file_obj
-                    st.session_state.curriculum_data = load_curriculum_data()
+    curriculum_data = load_curriculum_data()
+    if not curriculum_data:
+        uploaded_file = st.file_uploader("Upload Curriculum CSV", type=["csv"], help="Upload a CSV file containing your curriculum data.")
+        if uploaded_file is not None:
+            if upload_curriculum_to_firestore(st.session_state.user_id, uploaded_file):
+                if set_session_curriculum(uploaded_file.getvalue().decode("utf-8")):
                     st.rerun()
-            else:
-                st.warning("Please upload a curriculum CSV file to populate the checklist.")
-                return
-    
-    if 'completion_messages' not in st.session_state:
-        st.session_state.completion_messages = {}
+        else:
+            st.warning("Please upload a curriculum CSV file to populate the checklist.")
+        return
     
+    render_checklist_results(curriculum_data)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Typing in the search box reruns only the results list
+@st.fragment
+def render_checklist_results(curriculum_data):
     search_term = st.text_input("🔍 Search subtopics...", placeholder="Search for subtopics...", key="search_subtopics")
     
-    for module, chapters in st.session_state.curriculum_data.items():
+    for module, chapters in curriculum_data.items():
         with st.expander(f"📚 {module}", expanded=True):
-            for chapter, content in chapters.items():
-                st.subheader(f"📖 {chapter}")
-                
-                for i, subtopic in enumerate(content.get('subtopics', [])):
-                    if search_term.lower() in subtopic.lower() or not search_term:
-                        key = f"{module}_{chapter}_{subtopic}"
-                        is_unlocked = i == 0 or (i > 0 and st.session_state.progress_data.get(
-                            f"{module}_{chapter}_{content.get('subtopics', [])[i-1]}", False))
-                        is_completed = st.session_state.progress_data.get(key, False)
-                        
-                        col1, col2, col3 = st.columns([1, 8, 1])
-                        
-                        with col1:
-                            if is_unlocked:
-                                new_value = st.checkbox(" ", key=f"checkbox_{key}", value=is_completed)
-                                if new_value != is_completed:
-                                    if save_progress_to_supabase(st.session_state.user_id, module, chapter, subtopic, new_value):
-                                        st.session_state.progress_data[key] = new_value
-                                        if new_value:
-                                            st.session_state.study_hours += 2
-                                            check_and_award_badges()
-                                            st.session_state.completion_messages[key] = f"🎉 Subtopic '{subtopic}' completed!"
-                                        else:
-                                            st.session_state.study_hours = max(0, st.session_state.study_hours - 2)
-                                            st.session_state.completion_messages[key] = f"Subtopic '{subtopic}' marked incomplete."
-                                        st.rerun()
-                            else:
-                                st.markdown('<div class="tooltip">🔒<span class="tooltiptext">Complete previous subtopic</span></div>', unsafe_allow_html=True)
-                        
-                        with col2:
-                            if is_completed:
-                                st.markdown(f'<div class="completed-item">✅ {subtopic}</div>', unsafe_allow_html=True)
-                            elif is_unlocked:
-                                st.markdown(f'<div class="next-item">⏳ {subtopic}</div>', unsafe_allow_html=True)
-                            else:
-                                st.markdown(f'<div class="locked-item">🔒 {subtopic}</div>', unsafe_allow_html=True)
-                            if key in st.session_state.completion_messages:
-                                st.markdown(
-                                    f'<div class="message-box">{st.session_state.completion_messages[key]}</div>',
-                                    unsafe_allow_html=True
-                                )
-                        
-                        with col3:
-                            if is_completed:
-                                st.markdown("✅")
-                            elif is_unlocked:
-                                st.markdown("⏳")
-                            else:
-                                st.markdown('<div class="tooltip">🔒<span class="tooltiptext">Locked</span></div>', unsafe_allow_html=True)
-                
-                if 'project' in content:
-                    if st.button(f"📋 View Project Details", key=f"project_{module}_{chapter}"):
-                        st.info(f"**Project:** {content['project']}")
+            for chapter in chapters:
+                render_checklist_chapter(module, chapter, search_term)
+
+# A toggle reruns only its chapter, unless it locks or unlocks other chapters
+@st.fragment
+@timed("render.checklist_chapter", "render")
+def render_checklist_chapter(module, chapter, search_term):
+    # Outcomes of earlier toggles; a rollback can lock or unlock other chapters, so it reruns the whole app
+    if reconcile_pending_writes():
+        st.rerun()
+    content = current_curriculum()[module][chapter]
+    frontier = get_frontier()
+    st.subheader(f"📖 {chapter}")
     
-    st.session_state.completion_messages = {}
-    st.markdown('</div>', unsafe_allow_html=True)
+    for i, subtopic in enumerate(content.get('subtopics', [])):
+        if search_term.lower() in subtopic.lower() or not search_term:
+            key = f"{module}_{chapter}_{subtopic}"
+            is_unlocked = frontier.is_unlocked(module, chapter, i)
+            is_completed = progress_store().progress_data.get(key, False)
+            
+            col1, col2, col3 = st.columns([1, 8, 1])
+            
+            with col1:
+                if is_unlocked:
+                    new_value = st.checkbox(" ", key=f"checkbox_{key}", value=is_completed)
+                    if new_value != is_completed:
+                        save_progress_to_supabase(st.session_state.user_id, module, chapter, subtopic, new_value)
+                        changed = apply_progress_change(module, chapter, subtopic, new_value)
+                        if new_value:
+                            check_and_award_badges()
+                            st.session_state.completion_messages[key] = f"🎉 Subtopic '{subtopic}' completed!"
+                        else:
+                            st.session_state.completion_messages[key] = f"Subtopic '{subtopic}' marked incomplete."
+                        if any(other != (module, chapter) for other in changed):
+                            st.rerun()
+                        rerun_fragment()
+                else:
+                    st.markdown('<div class="tooltip">🔒<span class="tooltiptext">Complete previous subtopic or prerequisite chapters</span></div>', unsafe_allow_html=True)
+            
+            with col2:
+                if is_completed:
+                    st.markdown(f'<div class="completed-item">✅ {subtopic}</div>', unsafe_allow_html=True)
+                elif is_unlocked:
+                    st.markdown(f'<div class="next-item">⏳ {subtopic}</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="locked-item">🔒 {subtopic}</div>', unsafe_allow_html=True)
+                message = st.session_state.completion_messages.pop(key, None)
+                if message:
+                    st.markdown(f'<div class="message-box">{message}</div>', unsafe_allow_html=True)
+            
+            with col3:
+                if is_completed:
+                    st.markdown("✅")
+                elif is_unlocked:
+                    st.markdown("⏳")
+                else:
+                    st.markdown('<div class="tooltip">🔒<span class="tooltiptext">Locked</span></div>', unsafe_allow_html=True)
+    
+    if 'project' in content:
+        if st.button(f"📋 View Project Details", key=f"project_{module}_{chapter}"):
+            st.info(f"**Project:** {content['project']}")
 
+@timed("badges.check", "compute")
 def check_and_award_badges():
     if not st.session_state.authenticated:
         return
     
-    completion_percentage, completed_subtopics, total_subtopics, total_modules = calculate_progress_stats(
-        st.session_state.progress_data, st.session_state.curriculum_data
-    )
-    
-    badges_to_award = []
-    
-    if completed_subtopics >= 5 and "First Steps" not in st.session_state.badges:
-        badges_to_award.append("First Steps")
-    if completed_subtopics >= 10 and "Getting Started" not in st.session_state.badges:
-        badges_to_award.append("Getting Started")
-    if completion_percentage >= 25 and "Quarter Master" not in st.session_state.badges:
-        badges_to_award.append("Quarter Master")
-    if completion_percentage >= 50 and "Halfway Hero" not in st.session_state.badges:
-        badges_to_award.append("Halfway Hero")
-    if st.session_state.streak_counter >= 5 and "Streak Star" not in st.session_state.badges:
-        badges_to_award.append("Streak Star")
-    if st.session_state.study_hours >= 50 and "Study Master" not in st.session_state.badges:
-        badges_to_award.append("Study Master")
+    badges_to_award = evaluate_badges(derived('progress_stats'), study_summary(), st.session_state.badges)
     
     for badge in badges_to_award:
         st.session_state.badges.append(badge)
         save_badge_to_supabase(st.session_state.user_id, badge)
         st.balloons()
         st.success(f"🏆 Badge Earned: {badge}!")
-        if st.session_state.notifications_enabled and st.session_state.user_email:
-            send_email_notification(
-                st.session_state.user_email,
-                f"New Badge Earned: {badge}",
-                f"Congratulations! You've earned the {badge} badge!"
-            )
-            send_push_notification(f"New Badge Earned: {badge}")
+        queue_notification(BADGE, f"New Badge Earned: {badge}")
 
+@timed("render.trophy_case", "render")
 def render_trophy_case():
     if not st.session_state.authenticated:
         st.warning("Please sign in to view your trophy case.")
@@ -1335,6 +772,7 @@ def reset_dialog():
         reset_progress_data()
         st.rerun()
 
+@timed("render.schedule", "render")
 def render_study_schedule():
     if not st.session_state.authenticated:
         st.warning("Please sign in to access the schedule.")
@@ -1366,35 +804,37 @@ def render_study_schedule():
         schedule_df = pd.DataFrame(st.session_state.schedule_data)
         st.dataframe(schedule_df, use_container_width=True)
         
-        weekly_hours = st.session_state.study_hours % 7
-        target_hours = 25
-        fig_goal = go.Figure(data=[go.Indicator(
-            value=weekly_hours,
-            mode="gauge+number+delta",
-            title={'text': "Weekly Hours Progress"},
-            delta={'reference': target_hours},
-            gauge={
-                'axis': {'range': [0, 30]},
-                'bar': {'color': "#22d3ee"},
-                'steps': [
-                    {'range': [0, 15], 'color': "#fef3c7"},
-                    {'range': [15, 25], 'color': "#a7f3d0"},
-                    {'range': [25, 30], 'color': "#6ee7b7"}
-                ],
-                'threshold': {
-                    'line': {'color': "#1e293b", 'width': 4},
-                    'thickness': 0.75,
-                    'value': target_hours
+        weekly_hours = study_summary()['hours_7d']
+        target_hours = weekly_target()
+        axis_max = max(target_hours * 1.2, weekly_hours)
+        with span("plotly.weekly_goal", "plotly"):
+            fig_goal = go.Figure(data=[go.Indicator(
+                value=weekly_hours,
+                mode="gauge+number+delta",
+                title={'text': "Weekly Hours Progress"},
+                delta={'reference': target_hours},
+                gauge={
+                    'axis': {'range': [0, axis_max]},
+                    'bar': {'color': "#22d3ee"},
+                    'steps': [
+                        {'range': [0, target_hours * 0.6], 'color': "#fef3c7"},
+                        {'range': [target_hours * 0.6, target_hours], 'color': "#a7f3d0"},
+                        {'range': [target_hours, axis_max], 'color': "#6ee7b7"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "#1e293b", 'width': 4},
+                        'thickness': 0.75,
+                        'value': target_hours
+                    }
                 }
-            }
-        )])
-        fig_goal.update_layout(
-            margin=dict(t=50, b=50, l=50, r=50),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=14, family='Roboto', color='#1e293b'),
-            hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
-        )
+            )])
+            fig_goal.update_layout(
+                margin=dict(t=50, b=50, l=50, r=50),
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                font=dict(size=14, family='Roboto', color='#1e293b'),
+                hoverlabel=dict(bgcolor='#ffffff', font_size=12, font_family='Roboto')
+            )
         st.plotly_chart(fig_goal, use_container_width=True)
         
         if st.button("📄 Export to Calendar (.ics)"):
@@ -1402,56 +842,24 @@ def render_study_schedule():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+@timed("schedule.generate", "compute")
 def generate_study_schedule(daily_hours, start_time, study_days):
-    st.session_state.schedule_data = []
-    uncompleted_subtopics = []
-    if not st.session_state.curriculum_data:
-        st.session_state.curriculum_data = load_curriculum_data()
-    for module, chapters in st.session_state.curriculum_data.items():
-        for chapter, content in chapters.items():
-            for subtopic in content.get('subtopics', []):
-                key = f"{module}_{chapter}_{subtopic}"
-                if not st.session_state.progress_data.get(key, False):
-                    uncompleted_subtopics.append({
-                        'module': module,
-                        'chapter': chapter,
-                        'subtopic': subtopic,
-                        'estimated_hours': 2,
-                        'deadline': content.get('deadline', '9999-12-31')
-                    })
-    
-    uncompleted_subtopics.sort(key=lambda x: x['deadline'])
-    
-    current_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    end_date = current_date + timedelta(days=14)
-    scheduled_hours = 0
-    target_weekly_hours = 25
-    
-    while current_date <= end_date and uncompleted_subtopics and scheduled_hours < target_weekly_hours:
-        day_name = current_date.strftime("%A")
-        if day_name in study_days:
-            is_restricted = day_name in ["Tuesday", "Wednesday", "Thursday", "Friday"] and start_time.hour >= 12 and start_time.hour < 20
-            if not is_restricted:
-                session_duration = min(daily_hours, 3)
-                if uncompleted_subtopics:
-                    subtopic_data = uncompleted_subtopics.pop(0)
-                    days_until_deadline = (datetime.strptime(subtopic_data['deadline'], "%Y-%m-%d").date() - current_date.date()).days
-                    is_urgent = days_until_deadline <= 7
-                    schedule_entry = {
-                        'Date': current_date.strftime("%Y-%m-%d"),
-                        'Day': day_name,
-                        'Time': f"{start_time.hour:02d}:{start_time.minute:02d}",
-                        'Duration': f"{session_duration}h",
-                        'Module': subtopic_data['module'].split(":")[0],
-                        'Chapter': subtopic_data['chapter'].split(":")[1] if ":" in subtopic_data['chapter'] else subtopic_data['chapter'],
-                        'Subtopic': subtopic_data['subtopic'][:50] + "..." if len(subtopic_data['subtopic']) > 50 else subtopic_data['subtopic'],
-                        'Urgent': is_urgent
-                    }
-                    st.session_state.schedule_data.append(schedule_entry)
-                    scheduled_hours += session_duration
-        current_date += timedelta(days=1)
-    
-    st.success(f"✅ Schedule generated for {len(st.session_state.schedule_data)} study sessions! (Target: {target_weekly_hours} hours/week)")
+    load_curriculum_data()
+    target_hours = weekly_target()
+    st.session_state.schedule_data = build_study_schedule(derived('pending_subtopics'), daily_hours, start_time, study_days, weekly_hours=target_hours)
+    save_schedule_for_reminders(st.session_state.schedule_data)
+    st.success(f"✅ Schedule generated for {len(st.session_state.schedule_data)} study sessions! (Target: {target_hours} hours/week)")
+
+def weekly_target():
+    # Recent logged hours with a little stretch, rather than one fixed number for everyone
+    return weekly_hours_target(st.session_state.study_timeline.hours_by_day)
+
+def save_schedule_for_reminders(schedule):
+    # reminder_service.py picks up the saved plan and replaces this user's pending reminders
+    try:
+        storage.save_schedule(st.session_state.user_id, st.session_state.user_email, schedule, st.session_state.notifications_enabled)
+    except Exception as e:
+        st.warning(f"Session reminders could not be updated: {str(e)}")
 
 def export_to_calendar():
     cal = Calendar()
@@ -1474,43 +882,72 @@ def export_to_calendar():
         mime="text/calendar"
     )
 
-def export_supabase_data():
+# Export configuration
+EXPORT_PAGE_SIZE = 500
+EXPORT_FORMATS = {
+    "CSV": "csv",
+    "Parquet": "parquet",
+    "JSONL (gzip)": "jsonl.gz",
+}
+
+def stream_collection_pages(collection, user_id, page_size=EXPORT_PAGE_SIZE):
+    return storage.export_pages(collection, user_id, EXPORT_SCHEMAS[collection].names, page_size)
+
+def write_collection_export(collection, user_id, export_format, path):
+    schema = EXPORT_SCHEMAS[collection]
+    rows = 0
+    if export_format == "parquet":
+        with pq.ParquetWriter(path, schema) as writer:
+            for columns in stream_collection_pages(collection, user_id):
+                writer.write_table(pa.table(columns, schema=schema))
+                rows += len(columns[schema.names[0]])
+            if rows == 0:
+                writer.write_table(schema.empty_table())
+    elif export_format == "jsonl.gz":
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for columns in stream_collection_pages(collection, user_id):
+                for values in zip(*columns.values()):
+                    f.write(json.dumps(dict(zip(schema.names, values)), default=str) + "\n")
+                    rows += 1
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            pd.DataFrame(columns=schema.names).to_csv(f, index=False)
+            for columns in stream_collection_pages(collection, user_id):
+                pd.DataFrame(columns, columns=schema.names).to_csv(f, index=False, header=False)
+                rows += len(columns[schema.names[0]])
+    return rows
+
+def build_export_archive(user_id, export_format):
+    # st.download_button takes bytes or a BytesIO, not a temporary file
+    archive = io.BytesIO()
+    counts = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for collection in EXPORT_SCHEMAS:
+            file_name = f"{collection}.{export_format}"
+            path = os.path.join(tmp_dir, file_name)
+            counts[collection] = write_collection_export(collection, user_id, export_format, path)
+            zf.write(path, arcname=file_name)
+    return archive.getvalue(), counts
+
+@timed("export.firestore_archive", "compute")
+def export_supabase_data(export_format="csv"):
     if not st.session_state.authenticated:
         st.warning("Please sign in to export data.")
         return
     
     try:
-        progress_ref = db.collection('progress').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        )
-        docs = progress_ref.stream()
-        progress_data = [doc.to_dict() for doc in docs]
-        progress_df = pd.DataFrame(progress_data)
-        progress_csv = progress_df.to_csv(index=False)
-        
-        badges_ref = db.collection('badges').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        )
-        docs = badges_ref.stream()
-        badges_data = [doc.to_dict() for doc in docs]
-        badges_df = pd.DataFrame(badges_data)
-        badges_csv = badges_df.to_csv(index=False)
-        
-        st.download_button(
-            label="Download Progress CSV",
-            data=progress_csv,
-            file_name="firestore_progress.csv",
-            mime="text/csv"
-        )
+        archive, counts = build_export_archive(st.session_state.user_id, export_format)
+        st.caption(", ".join(f"{collection}: {rows} rows" for collection, rows in counts.items()))
         st.download_button(
-            label="Download Badges CSV",
-            data=badges_csv,
-            file_name="firestore_badges.csv",
-            mime="text/csv"
+            label="📦 Download Firestore Archive",
+            data=archive,
+            file_name=f"firestore_export_{datetime.now().strftime('%Y%m%d')}.zip",
+            mime="application/zip"
         )
     except Exception as e:
         st.error(f"Error exporting Firestore data: {str(e)}")
 
+@timed("render.settings", "render")
 def render_settings():
     st.markdown('<div class="main-container">', unsafe_allow_html=True)
     st.header("⚙️ Settings")
@@ -1540,13 +977,22 @@ def render_settings():
         with col1:
             st.session_state.user_email = st.text_input("📧 Email", value=st.session_state.user_email, disabled=True)
             st.session_state.dark_mode = st.checkbox("🌙 Dark Mode", value=st.session_state.dark_mode, help="Toggle dark mode (coming soon)")
+            st.session_state.reduced_motion = st.checkbox("🐢 Reduced Motion", value=st.session_state.reduced_motion, help=f"Turn off animations; always on for curricula with {LOW_COST_SUBTOPICS}+ subtopics")
         
         with col2:
             st.session_state.notifications_enabled = st.checkbox("🔔 Enable Notifications", value=st.session_state.notifications_enabled, help="Receive progress notifications")
+            gating_label = st.selectbox(
+                "🔐 Chapter Gating",
+                list(GATING_MODES.keys()),
+                index=list(GATING_MODES.values()).index(progress_store().gating),
+                help="Chapters listed in the curriculum's optional Prerequisites column are always gated"
+            )
+            progress_store().gating = GATING_MODES[gating_label]
+            st.session_state.debug_panel = st.checkbox("🐞 Performance Debug Panel", value=st.session_state.debug_panel, help="Show per-rerun timings and percentile summaries in the sidebar")
             notification_frequency = st.selectbox("📅 Notification Frequency", ["Daily", "Weekly", "Monthly"], help="Choose how often to receive notifications")
         
         st.subheader("💾 Data Management")
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             if st.button("📤 Export Progress"):
@@ -1557,24 +1003,27 @@ def render_settings():
                 reset_dialog()
         
         with col3:
+            export_format = st.selectbox("📁 Export Format", list(EXPORT_FORMATS.keys()), help="File format for the Firestore archive")
             if st.button("📥 Export Firestore Data"):
-                export_supabase_data()
+                export_supabase_data(EXPORT_FORMATS[export_format])
+        
+        with col4:
+            if st.button("📄 Progress Report (PDF)"):
+                export_progress_report()
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+@timed("export.progress_csv", "compute")
 def export_progress_data():
     if not st.session_state.authenticated:
         st.warning("Please sign in to export progress.")
         return
     
-    progress_df = pd.DataFrame([
-        {
-            'Item': key,
-            'Completed': value,
-            'Timestamp': datetime.now().isoformat()
-        }
-        for key, value in st.session_state.progress_data.items()
-    ])
+    progress_df = pd.DataFrame({
+        'Item': pd.Series(list(progress_store().progress_data.keys()), dtype=object),
+        'Completed': pd.Series(list(progress_store().progress_data.values()), dtype=bool),
+    })
+    progress_df['Timestamp'] = datetime.now().isoformat()
     
     csv = progress_df.to_csv(index=False)
     st.download_button(
@@ -1584,38 +1033,57 @@ def export_progress_data():
         mime="text/csv"
     )
 
+def export_progress_report():
+    if not st.session_state.authenticated:
+        st.warning("Please sign in to export a report.")
+        return
+    
+    load_curriculum_data()
+    summary = study_summary()
+    payload = build_report_payload(
+        st.session_state.user_email,
+        derived('module_completion'),
+        st.session_state.badges,
+        summary['total_hours'],
+        summary['current_streak'],
+        st.session_state.schedule_data,
+    )
+    fingerprint = report_fingerprint(payload)
+    pdf = get_cached_report(fingerprint)
+    if pdf is None:
+        if st.session_state.report_job is None or st.session_state.report_job[0] != fingerprint:
+            st.session_state.report_job = submit_progress_report(payload)
+        future = st.session_state.report_job[1]
+        if not future.done():
+            st.info("⏳ Your report is being generated. Click again in a moment to download it.")
+            return
+        try:
+            pdf = future.result()
+        except Exception as e:
+            st.session_state.report_job = None
+            st.error(f"Error generating progress report: {str(e)}")
+            return
+    
+    st.download_button(
+        label="📥 Download Progress Report",
+        data=pdf,
+        file_name="study_progress_report.pdf",
+        mime="application/pdf"
+    )
+
 def reset_progress_data():
     if not st.session_state.authenticated:
         st.warning("Please sign in to reset progress.")
         return
     
-    st.session_state.progress_data = {}
-    st.session_state.study_hours = 0
-    st.session_state.streak_counter = 0
+    progress_store().clear()
+    st.session_state.study_timeline = StudyTimeline()
+    st.session_state.active_timer = None
     st.session_state.badges = []
     st.session_state.schedule_data = []
     try:
-        progress_ref = db.collection('progress').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        )
-        docs = progress_ref.stream()
-        for doc in docs:
-            doc.reference.delete()
-        badges_ref = db.collection('badges').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        )
-        docs = badges_ref.stream()
-        for doc in docs:
-            doc.reference.delete()
-        sessions_ref = db.collection('study_sessions').where(
-            filter=firestore.FieldFilter('user_id', '==', st.session_state.user_id)
-        )
-        docs = sessions_ref.stream()
-        for doc in docs:
-            doc.reference.delete()
-        db.collection('users').document(st.session_state.user_id).update({'curriculum_csv': firestore.DELETE_FIELD})
-        st.session_state.curriculum_file = None
-        st.session_state.curriculum_data = None
+        storage.reset_user(st.session_state.user_id)
+        progress_store().clear_curriculum()
         st.success("✅ Progress data reset!")
     except Exception as e:
         st.error(f"Error resetting progress in Firestore: {str(e)}")
@@ -1623,7 +1091,7 @@ def reset_progress_data():
 def upload_curriculum_to_firestore(user_id, file):
     try:
         csv_string = file.getvalue().decode("utf-8")
-        db.collection('users').document(user_id).set({'curriculum_csv': csv_string}, merge=True)
+        storage.save_curriculum(user_id, csv_string)
         return True
     except Exception as e:
         st.error(f"Error uploading curriculum: {str(e)}")
@@ -1631,19 +1099,88 @@ def upload_curriculum_to_firestore(user_id, file):
 
 def download_curriculum_from_firestore(user_id):
     try:
-        user_doc = db.collection('users').document(user_id).get()
-        if user_doc.exists:
-            csv_string = user_doc.to_dict().get('curriculum_csv')
-            if csv_string:
-                return io.StringIO(csv_string)
-        return None
+        return storage.load_curriculum(user_id)
     except Exception as e:
         st.error(f"Error downloading curriculum: {str(e)}")
         return None
 
+def store_rerun_profile(spans, total_ms):
+    st.session_state.last_rerun_profile = spans + [{'name': 'rerun', 'kind': 'rerun', 'ms': round(total_ms, 3)}]
+
+def render_debug_panel():
+    with st.sidebar.expander("🐞 Performance", expanded=False):
+        st.caption("Previous rerun")
+        if st.session_state.last_rerun_profile:
+            st.dataframe(pd.DataFrame(st.session_state.last_rerun_profile), use_container_width=True, hide_index=True)
+        st.caption("Percentiles across all sessions")
+        summary = percentile_summary()
+        if summary:
+            st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+        shared = registry_stats()
+        st.caption(f"Shared curricula: {len(shared)} ({sum(shared.values())} session references)")
+        if isinstance(storage, FirestoreStorage):
+            st.caption(f"Firestore circuit: {storage.breaker.state}")
+
+# Refreshes on its own, so fragment-scoped reruns elsewhere don't leave the totals stale
+def render_sidebar_stats():
+    if reconcile_pending_writes():
+        st.rerun()
+    if not current_curriculum():
+        return
+    completion_percentage, completed_subtopics, total_subtopics, total_modules = derived('progress_stats')
+    
+    st.markdown("---")
+    st.metric("Progress", f"{completion_percentage:.1f}%", help="Your overall completion percentage")
+    st.metric("Completed", f"{completed_subtopics}/{total_subtopics}", help="Subtopics completed vs total")
+    summary = study_summary()
+    st.metric("Study Hours", f"{summary['total_hours']:.1f}", help="Total hours logged")
+    st.metric("Streak", f"{summary['current_streak']} days", help=f"Consecutive study days (longest: {summary['longest_streak']})")
+    st.caption(f"⏱️ {summary['hours_7d']:.1f}h this week · {summary['hours_30d']:.1f}h in 30 days · {summary['hours_90d']:.1f}h in 90 days")
+    next_up = get_next_up(1)
+    if next_up:
+        st.caption(f"🎯 Next up: {next_up[0]['subtopic']}")
+    pending_writes = write_queue.pending_count(st.session_state.session_id)
+    if pending_writes:
+        st.caption(f"💾 Saving {pending_writes} change(s)...")
+
+# Declared in main, so it only polls while a session is being timed
+def render_session_timer():
+    if st.session_state.study_session_notice:
+        st.success(st.session_state.study_session_notice)
+        st.session_state.study_session_notice = None
+    timer = st.session_state.active_timer
+    if timer is None:
+        if st.button("▶️ Start Study Session", help="Time a study session; it is saved as you go"):
+            start_study_session()
+            # A full rerun redeclares the fragment with polling on
+            st.rerun()
+        return
+    
+    now = datetime.now(timezone.utc)
+    checkpoint_study_session(timer, now)
+    st.metric("⏱️ Current Session", format_duration(timer.elapsed(now)))
+    if st.button("⏹️ Stop Session", help="Finish and log this study session"):
+        hours = stop_study_session()
+        if hours is not None:
+            st.session_state.study_session_notice = f"Study session logged: {format_duration(timedelta(hours=hours))}"
+        st.rerun()
+
+def low_cost_mode():
+    if st.session_state.reduced_motion:
+        return True
+    return st.session_state.authenticated and bool(current_curriculum()) and derived('progress_stats')[2] >= LOW_COST_SUBTOPICS
+
+@instrument_rerun(store_rerun_profile)
 def main():
+    # Style-only st.html lands in the event container, not the page. Streamlit's client message cache
+    # turns an unchanged stylesheet on later reruns into a short hash reference (see tests/test_theme.py)
+    for stylesheet in stylesheet_tags(low_cost_mode()):
+        st.html(stylesheet)
     st.sidebar.title("📚 Navigation")
     
+    if st.session_state.authenticated:
+        reconcile_pending_writes()
+    
     if st.session_state.authenticated:
         page = st.sidebar.radio(
             "Choose Page",
@@ -1653,25 +1190,12 @@ def main():
     else:
         page = "⚙️ Settings"
     
-    if st.session_state.authenticated and st.session_state.curriculum_data:
-        completion_percentage, completed_subtopics, total_subtopics, total_modules = calculate_progress_stats(
-            st.session_state.progress_data, st.session_state.curriculum_data
-        )
-        
-        st.sidebar.markdown("---")
-        st.sidebar.metric("Progress", f"{completion_percentage:.1f}%", help="Your overall completion percentage")
-        st.sidebar.metric("Completed", f"{completed_subtopics}/{total_subtopics}", help="Subtopics completed vs total")
-        st.sidebar.metric("Study Hours", st.session_state.study_hours, help="Total hours logged")
-        st.sidebar.metric("Streak", f"{st.session_state.streak_counter} days", help="Consecutive study days")
-    
     if st.session_state.authenticated:
-        st.sidebar.markdown("---")
-        if st.sidebar.button("➕ Log Study Session", help="Log a new study session"):
-            st.session_state.study_hours += 1
-            st.session_state.streak_counter += 1
-            st.session_state.last_study_date = datetime.now().date()
-            save_study_session_to_supabase(st.session_state.user_id, 1)
-            st.sidebar.success("Study session logged!")
+        with st.sidebar:
+            # Other pages change progress through full reruns, which redraw the sidebar anyway
+            st.fragment(render_sidebar_stats, run_every=SIDEBAR_REFRESH_SECONDS if page == "📋 Checklist" else None)()
+            st.markdown("---")
+            st.fragment(render_session_timer, run_every=TIMER_REFRESH_SECONDS if st.session_state.active_timer else None)()
     
     if page == "📊 Dashboard":
         render_progress_dashboard()
@@ -1683,6 +1207,9 @@ def main():
         render_study_schedule()
     elif page == "⚙️ Settings":
         render_settings()
+    
+    if st.session_state.debug_panel:
+        render_debug_panel()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Two modules; C2 needs C1 finished first
+CURRICULUM_CSV = """Module,Chapter,Subtopic,Project,Prerequisites
+M1,C1,a,Project 1,
+M1,C1,b,Project 1,
+M1,C2,c,Project 2,C1
+M2,C3,d,Project 3,
+M2,C3,e,Project 3,
+"""
+
+
+@pytest.fixture
+def curriculum_csv():
+    return CURRICULUM_CSV
+
+
+@pytest.fixture
+def curriculum():
+    from study_core.curriculum import parse_curriculum_csv
+
+    return parse_curriculum_csv(CURRICULUM_CSV)
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    from storage import SQLiteStorage
+
+    return SQLiteStorage(str(tmp_path / "study.db"))
@@ -0,0 +1,27 @@
+import numpy as np
+
+from study_core.burnup import burnup_series, completion_times, lttb
+
+
+def test_lttb_keeps_short_series_whole():
+    x = np.arange(5, dtype=float)
+    assert lttb(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[37] = 50.0
+    keep = lttb(x, y, 10)
+    assert len(keep) == 10
+    assert keep[0] == 0 and keep[-1] == 99
+    assert 37 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_burnup_series_counts_untimed_completions_first():
+    times = completion_times({'a': 30.0, 'b': 10.0, 'c': 20.0})
+    x, done, remaining = burnup_series(times, total=10, untimed=2)
+    assert x.tolist() == [10.0, 20.0, 30.0]
+    assert done.tolist() == [3, 4, 5]
+    assert remaining.tolist() == [7, 6, 5]
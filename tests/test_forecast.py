@@ -0,0 +1,61 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from study_core.curriculum import parse_curriculum_csv
+from study_core.forecast import (
+    MAX_WEEKLY_HOURS, MIN_WEEKLY_HOURS, forecast_completion, smooth, weekly_completions, weekly_hours_target,
+)
+from study_core.scheduler import TARGET_WEEKLY_HOURS
+from study_core.segments import CurriculumSegments, segment_completion
+
+TODAY = date(2026, 3, 10)
+
+
+def completions(per_week):
+    # Timestamps at noon, `per_week[i]` of them in the i-th week before TODAY (oldest first)
+    times = []
+    for weeks_ago, count in enumerate(reversed(per_week)):
+        day = TODAY - timedelta(days=7 * weeks_ago)
+        times.extend([datetime.combine(day, time(12)).astimezone().timestamp()] * count)
+    return np.sort(np.array(times, dtype=np.float64))
+
+
+def test_smooth_weights_sum_to_one():
+    assert np.isclose(smooth(np.array([4.0, 4.0, 4.0])), 4.0)
+    assert smooth(np.array([0.0, 0.0, 10.0])) > smooth(np.array([10.0, 0.0, 0.0]))
+
+
+def test_weekly_completions_start_at_first_active_week():
+    assert weekly_completions(completions([0, 0, 3, 0, 2]), TODAY).tolist() == [3, 0, 2]
+
+
+def test_forecast_band_contains_the_projection(curriculum_csv):
+    curriculum = parse_curriculum_csv(curriculum_csv)
+    segments = CurriculumSegments(curriculum)
+    aggregates = segment_completion({'M1_C1_a': True}, segments)
+    forecast = forecast_completion(completions([1, 3, 1, 2]), segments, aggregates, TODAY)
+    assert forecast['remaining'] == 4
+    assert forecast['finish_early'] <= forecast['finish'] <= forecast['finish_late']
+    assert forecast['rate_low'] < forecast['rate'] < forecast['rate_high']
+    # A prediction interval is wider than the spread of the weekly counts alone
+    spread = np.std([1, 3, 1, 2], ddof=1)
+    assert forecast['rate_high'] - forecast['rate'] > 1.28 * spread
+    assert [module['remaining'] for module in forecast['modules']] == [2, 2]
+
+
+def test_forecast_needs_a_pace(curriculum_csv):
+    segments = CurriculumSegments(parse_curriculum_csv(curriculum_csv))
+    aggregates = segment_completion({}, segments)
+    assert forecast_completion(np.array([]), segments, aggregates, TODAY) is None
+
+
+def test_weekly_hours_target_blends_toward_the_default_with_little_history():
+    today = TODAY.toordinal()
+    assert weekly_hours_target({}, TODAY) == TARGET_WEEKLY_HOURS
+    one_week = weekly_hours_target({today: 3.0}, TODAY)
+    assert MIN_WEEKLY_HOURS < one_week < TARGET_WEEKLY_HOURS
+    light = {today - 7 * week: 1.0 for week in range(6)}
+    assert weekly_hours_target(light, TODAY) == MIN_WEEKLY_HOURS
+    heavy = {today - 7 * week: 80.0 for week in range(6)}
+    assert weekly_hours_target(heavy, TODAY) == MAX_WEEKLY_HOURS
@@ -0,0 +1,66 @@
+from study_core.frontier import ProgressFrontier, build_prerequisites
+from study_core.recommendations import NextUpIndex
+
+
+def test_prerequisites_by_gating(curriculum):
+    assert build_prerequisites(curriculum)[("M1", "C2")] == [("M1", "C1")]
+    assert build_prerequisites(curriculum)[("M1", "C1")] == []
+    sequence = build_prerequisites(curriculum, "module_sequence")
+    assert sequence[("M1", "C2")] == [("M1", "C1")]
+    assert sequence[("M2", "C3")] == []
+
+
+def test_frontier_unlocks_in_order(curriculum):
+    frontier = ProgressFrontier(curriculum, {"M1_C1_a": True})
+    assert frontier.frontier[("M1", "C1")] == 1
+    assert frontier.is_unlocked("M1", "C1", 1)
+    assert not frontier.is_unlocked("M1", "C1", 2)
+    assert not frontier.is_unlocked("M1", "C2", 0)
+    assert frontier.open_chapters == {("M1", "C1"), ("M2", "C3")}
+
+
+def test_completing_a_chapter_opens_its_dependents(curriculum):
+    frontier = ProgressFrontier(curriculum, {"M1_C1_a": True})
+    changed = frontier.set_completed("M1", "C1", "b", True)
+    assert changed == [("M1", "C1"), ("M1", "C2")]
+    assert frontier.is_unlocked("M1", "C2", 0)
+    assert frontier.open_chapters == {("M1", "C2"), ("M2", "C3")}
+
+    frontier.set_completed("M1", "C1", "a", False)
+    assert frontier.frontier[("M1", "C1")] == 0
+    assert not frontier.is_unlocked("M1", "C2", 0)
+
+
+def test_frontier_matches_a_rebuild_after_updates(curriculum):
+    progress = {}
+    frontier = ProgressFrontier(curriculum, progress)
+    for module, chapter, subtopic, completed in [
+        ("M1", "C1", "b", True), ("M1", "C1", "a", True), ("M2", "C3", "d", True), ("M1", "C1", "b", False),
+    ]:
+        progress[f"{module}_{chapter}_{subtopic}"] = completed
+        frontier.set_completed(module, chapter, subtopic, completed)
+        rebuilt = ProgressFrontier(curriculum, progress)
+        assert frontier.frontier == rebuilt.frontier
+        assert frontier.unmet == rebuilt.unmet
+        assert frontier.open_chapters == rebuilt.open_chapters
+
+
+def test_pending_items_follow_unlock_order(curriculum):
+    frontier = ProgressFrontier(curriculum, {"M1_C1_a": True})
+    # C2 waits for C1, so C3, which has no prerequisites, comes first
+    assert [item[3] for item in frontier.pending_items()] == ["b", "d", "e", "c"]
+
+
+def test_next_up_index_tracks_open_chapters(curriculum):
+    frontier = ProgressFrontier(curriculum, {})
+    index = NextUpIndex(frontier, curriculum)
+    assert [item["subtopic"] for item in index.top(3)] == ["a", "d"]
+
+    changed = frontier.set_completed("M1", "C1", "a", True)
+    index.update(changed, touched=("M1", "C1"))
+    assert index.top(1)[0]["subtopic"] == "b"
+    changed = frontier.set_completed("M1", "C1", "b", True)
+    index.update(changed, touched=("M1", "C1"))
+    assert [item["subtopic"] for item in index.top(3)] == ["c", "d"]
+    # top() leaves the heap intact for the next call
+    assert [item["subtopic"] for item in index.top(3)] == ["c", "d"]
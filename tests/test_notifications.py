@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from benchmarks.fake_notifications import FakeOneSignalClient, FakeSendGridClient
+from notifications import BADGE, STREAK, OneSignalTransport, SendGridTransport, dispatch_digests, group_digests
+
+import pytest
+
+
+class RejectingOneSignal(FakeOneSignalClient):
+    # Rejects any request that includes one of these users
+    def __init__(self, rejected):
+        super().__init__()
+        self.rejected = set(rejected)
+
+    def send_notification(self, body):
+        response = super().send_notification(body)
+        if self.rejected & set(body['include_external_user_ids']):
+            return SimpleNamespace(status_code=400, body={})
+        return response
+
+
+def enqueue(storage, *user_ids):
+    for user_id in user_ids:
+        storage.enqueue_notification(user_id, f"{user_id}@example.com", BADGE, "New Badge Earned: First Steps")
+
+
+def test_group_digests_keeps_one_digest_per_user():
+    events = [
+        {'user_id': "u1", 'email': "u1@example.com", 'kind': BADGE, 'message': "First Steps"},
+        {'user_id': "u2", 'email': None, 'kind': STREAK, 'message': "3 days"},
+        {'user_id': "u1", 'email': "u1@example.com", 'kind': STREAK, 'message': "7 days"},
+    ]
+    digests = group_digests(events)
+    assert [(digest.user_id, len(digest.events)) for digest in digests] == [("u1", 2), ("u2", 1)]
+    assert digests[0].subject() == "Your study digest: 1 new badge"
+    assert "<h3>🏆 Badges earned</h3>" in digests[0].html()
+    assert digests[1].push_message() == "3 days"
+
+
+def test_dispatch_sends_each_user_one_digest(sqlite_storage):
+    enqueue(sqlite_storage, "u1", "u1", "u2", "u3")
+    email, push = FakeSendGridClient(), FakeOneSignalClient()
+    totals = dispatch_digests(sqlite_storage, [SendGridTransport(email, "from@example.com"), OneSignalTransport(push)], page_size=3)
+    assert totals == {'events': 4, 'digests': 3, 'requests': 4, 'dropped': 0}
+    assert sorted(email.recipients) == ["u1@example.com", "u2@example.com", "u3@example.com"]
+    assert sqlite_storage.pending_notifications(10) == []
+
+
+def test_failing_user_neither_blocks_the_queue_nor_stays_forever(sqlite_storage):
+    enqueue(sqlite_storage, "a-bad", "b", "c")
+    email, push = FakeSendGridClient(), RejectingOneSignal({"a-bad"})
+    transports = [SendGridTransport(email, "from@example.com"), OneSignalTransport(push)]
+    with pytest.raises(Exception):
+        dispatch_digests(sqlite_storage, transports, page_size=1, max_attempts=2)
+    # Users after the failing one were still reached, and the failure is only retried on push
+    assert sorted(push.recipients) == ["a-bad", "b", "c"]
+    event, = sqlite_storage.pending_notifications(10)
+    assert (event['user_id'], event['sent_via'], event['attempts']) == ("a-bad", ["email"], 1)
+
+    with pytest.raises(Exception):
+        dispatch_digests(sqlite_storage, transports, page_size=1, max_attempts=2)
+    assert email.recipients.count("a-bad@example.com") == 1
+    assert sqlite_storage.pending_notifications(10) == []
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from persistence import CONFLICT, FAILED, SAVED, WriteBehindQueue
+
+
+def wait_for(queue, session_id, count, timeout=5):
+    outcomes = []
+    deadline = time.monotonic() + timeout
+    while len(outcomes) < count and time.monotonic() < deadline:
+        outcomes.extend(queue.drain(session_id))
+        time.sleep(0.01)
+    return outcomes
+
+
+def test_queued_writes_for_a_key_coalesce_and_land_in_order():
+    queue = WriteBehindQueue(workers=4)
+    started = threading.Event()
+    release = threading.Event()
+    written = []
+
+    def write(value):
+        def run():
+            if value == 0:
+                started.set()
+                release.wait(5)
+            written.append(value)
+        return run
+
+    queue.submit("s1", "key", write(0), 0)
+    assert started.wait(5)
+    for value in range(1, 4):
+        queue.submit("s1", "key", write(value), value)
+    release.set()
+    outcomes = wait_for(queue, "s1", 2)
+    # The first write was running; the later three coalesced into the newest
+    assert written == [0, 3]
+    assert [(status, job.payload) for status, job, _ in outcomes] == [(SAVED, 0), (SAVED, 3)]
+    assert queue.pending_count("s1") == 0
+
+
+def test_outcomes_report_conflicts_and_failures():
+    queue = WriteBehindQueue(workers=1)
+
+    def fail():
+        raise RuntimeError("offline")
+
+    queue.submit("s1", "a", lambda: True, 1)
+    queue.submit("s1", "b", fail, 2)
+    outcomes = {job.key: (status, detail) for status, job, detail in wait_for(queue, "s1", 2)}
+    assert outcomes["a"] == (CONFLICT, True)
+    assert outcomes["b"][0] == FAILED and str(outcomes["b"][1]) == "offline"
+
+
+def test_outcomes_of_idle_sessions_expire():
+    queue = WriteBehindQueue(workers=1, outcome_ttl=0.05)
+    queue.submit("ended", "a", lambda: None, 1)
+    time.sleep(0.1)
+    queue.submit("active", "a", lambda: None, 1)
+    assert len(wait_for(queue, "active", 1)) == 1
+    assert queue.drain("ended") == []
+    assert "ended" not in queue._in_flight
@@ -0,0 +1,42 @@
+from datetime import date, datetime, timezone
+
+from study_core.derived import resolve_derived
+from study_core.progress import ProgressStore
+
+
+def test_resolve_derived_recomputes_only_when_inputs_change():
+    calls = []
+    specs = {
+        'double': (('value',), lambda value: calls.append(value) or value * 2),
+        'quadruple': (('double',), lambda double: double * 2),
+    }
+    cache = {}
+    assert resolve_derived(cache, specs, {'value': (1, 5)}, 'quadruple') == 20
+    assert resolve_derived(cache, specs, {'value': (1, 5)}, 'quadruple') == 20
+    assert resolve_derived(cache, specs, {'value': (2, 6)}, 'quadruple') == 24
+    assert calls == [5, 6]
+
+
+def test_progress_store_derives_stats_and_next_up(curriculum_csv):
+    store = ProgressStore()
+    store.set_curriculum(curriculum_csv)
+    store.load([{'module': 'M1', 'chapter': 'C1', 'subtopic': 'a', 'completed': True}])
+    assert store.derived('progress_stats') == (20.0, 1, 5, 2)
+    assert [item['subtopic'] for item in store.top_next_up(3)] == ['b', 'd']
+
+    changed = store.apply_change('M1', 'C1', 'b', True)
+    assert ('M1', 'C2') in changed
+    assert store.derived('progress_stats')[1] == 2
+    assert [item['subtopic'] for item in store.top_next_up(3)] == ['c', 'd']
+    assert store.completed_at.keys() == {'M1_C1_b'}
+
+
+def test_pinned_today_drives_the_forecast(curriculum_csv):
+    store = ProgressStore(today=date(2026, 1, 10))
+    store.set_curriculum(curriculum_csv)
+    completed_at = datetime(2026, 1, 8, 12, tzinfo=timezone.utc)
+    store.load([{'module': 'M1', 'chapter': 'C1', 'subtopic': 'a', 'completed': True, 'completed_at': completed_at}])
+    assert store.derived('forecast')['remaining'] == 4
+    # Months later the completion has aged out of the pace window, and the cached forecast is recomputed
+    store.today = date(2026, 6, 1)
+    assert store.derived('forecast') is None
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from study_core.reminders import ReminderQueue
+
+NOW = datetime(2026, 3, 10, 8, 0).astimezone()
+
+
+def session(start):
+    return {'Date': f"{start:%Y-%m-%d}", 'Time': f"{start:%H:%M}", 'Day': f"{start:%A}", 'Module': "M1", 'Subtopic': "a"}
+
+
+def test_reminders_fire_in_time_order():
+    queue = ReminderQueue()
+    queue.reschedule("u1", [session(NOW + timedelta(hours=3))], (timedelta(hours=1), timedelta(minutes=30)), NOW)
+    queue.reschedule("u2", [session(NOW + timedelta(hours=2))], (timedelta(hours=1),), NOW)
+    assert len(queue) == 3
+    assert queue.next_fire_at() == NOW + timedelta(hours=1)
+    due = queue.pop_due(NOW + timedelta(hours=2))
+    assert [(reminder.user_id, reminder.lead) for reminder in due] == [("u2", timedelta(hours=1)), ("u1", timedelta(hours=1))]
+    assert len(queue) == 1
+
+
+def test_lead_times_already_past_are_skipped():
+    queue = ReminderQueue()
+    queue.reschedule("u1", [session(NOW + timedelta(minutes=45))], (timedelta(hours=1), timedelta(minutes=30)), NOW)
+    assert [reminder.lead for reminder in queue.pop_due(NOW + timedelta(days=1))] == [timedelta(minutes=30)]
+
+
+def test_reschedule_replaces_and_cancel_drops_lazily():
+    queue = ReminderQueue()
+    queue.reschedule("u1", [session(NOW + timedelta(hours=3))], (timedelta(hours=1),), NOW)
+    queue.reschedule("u1", [session(NOW + timedelta(hours=5))], (timedelta(hours=1),), NOW)
+    assert len(queue) == 1
+    assert queue.next_fire_at() == NOW + timedelta(hours=4)
+    queue.cancel_user("u1")
+    assert len(queue) == 0
+    assert queue.next_fire_at() is None
+    assert queue.pop_due(NOW + timedelta(days=1)) == []
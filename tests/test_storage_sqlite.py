@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from storage import COLLECTIONS, EXPORT_KEYS
+
+T0 = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def test_progress_writes_are_last_writer_wins(sqlite_storage):
+    user_id = sqlite_storage.create_user("a@example.com", "pw")
+    assert sqlite_storage.write_progress(user_id, "M1", "C1", "a", True, T0) is None
+    # An older change loses and reports the stored value
+    assert sqlite_storage.write_progress(user_id, "M1", "C1", "a", False, T0 - timedelta(minutes=1)) is True
+    assert [row['subtopic'] for row in sqlite_storage.completed_progress(user_id)] == ["a"]
+    assert sqlite_storage.write_progress(user_id, "M1", "C1", "a", False, T0 + timedelta(minutes=1)) is None
+    assert sqlite_storage.completed_progress(user_id) == []
+
+
+def test_export_pages_use_a_connection_per_page(tmp_path):
+    from storage import SQLiteStorage
+
+    storage = SQLiteStorage(str(tmp_path / "one.db"), pool_size=1)
+    user_id = storage.create_user("a@example.com", "pw")
+    for i in range(5):
+        storage.write_progress(user_id, "M1", f"C{i % 2}", f"s{i}", True, T0)
+    fields = ['user_id', 'module', 'chapter', 'subtopic', 'completed', 'completed_at']
+    pages = storage.export_pages('progress', user_id, fields, 2)
+    first = next(pages)
+    # With a one-connection pool, this would block if the paused export still held it
+    assert storage.load_badges(user_id) == []
+    rest = list(pages)
+    assert [len(page['subtopic']) for page in [first, *rest]] == [2, 2, 1]
+    assert sorted(s for page in [first, *rest] for s in page['subtopic']) == [f"s{i}" for i in range(5)]
+    assert isinstance(first['completed_at'][0], datetime) and first['completed'][0] is True
+
+
+def test_export_keys_cover_every_collection():
+    assert set(EXPORT_KEYS) == set(COLLECTIONS)
+
+
+def test_notifications_page_by_user_and_count_failures(sqlite_storage):
+    for user_id in ("u2", "u1", "u3"):
+        sqlite_storage.enqueue_notification(user_id, f"{user_id}@example.com", "badge", "hi")
+    first = sqlite_storage.pending_notifications(2)
+    assert [event['user_id'] for event in first] == ["u1", "u2"]
+    assert [event['user_id'] for event in sqlite_storage.pending_notifications(2, "u2")] == ["u3"]
+
+    event_id = first[0]['id']
+    sqlite_storage.mark_notifications_sent([event_id], "email")
+    sqlite_storage.record_notification_failures([event_id])
+    sqlite_storage.record_notification_failures([event_id])
+    event = sqlite_storage.pending_notifications(1)[0]
+    assert (event['sent_via'], event['attempts']) == (["email"], 2)
+
+    sqlite_storage.delete_notifications([event_id])
+    assert [event['user_id'] for event in sqlite_storage.pending_notifications(10)] == ["u2", "u3"]
+
+
+def test_reset_user_clears_data_and_disables_reminders(sqlite_storage):
+    user_id = sqlite_storage.create_user("a@example.com", "pw")
+    sqlite_storage.write_progress(user_id, "M1", "C1", "a", True, T0)
+    sqlite_storage.save_badge(user_id, "First Steps")
+    sqlite_storage.enqueue_notification(user_id, "a@example.com", "badge", "hi")
+    sqlite_storage.save_schedule(user_id, "a@example.com", [{'Date': "2026-03-02"}], True)
+    since = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    sqlite_storage.reset_user(user_id)
+    assert sqlite_storage.completed_progress(user_id) == []
+    assert sqlite_storage.load_badges(user_id) == []
+    assert sqlite_storage.pending_notifications(10) == []
+    schedule, = sqlite_storage.schedules_updated_since(since, 10)
+    assert (schedule['sessions'], schedule['reminders_enabled']) == ([], False)
+
+
+def test_unknown_export_collection_is_rejected(sqlite_storage):
+    with pytest.raises(ValueError):
+        list(sqlite_storage.export_pages('users', "u1", ['user_id'], 10))
@@ -0,0 +1,62 @@
+import pytest
+
+from theme import minify_css, stylesheet_tags
+
+pytest.importorskip("streamlit")
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+
+def render_stylesheets():
+    import streamlit as st
+    from theme import stylesheet_tags
+
+    for stylesheet in stylesheet_tags(low_cost=True):
+        st.html(stylesheet)
+
+
+def test_minify_css_keeps_selector_colons():
+    css = "/* note */\na :hover {\n  color: red;\n}\n"
+    assert minify_css(css) == "a :hover{color:red}"
+
+
+def test_stylesheet_tags_adds_reduced_motion_in_low_cost_mode():
+    assert len(stylesheet_tags()) == 1
+    assert len(stylesheet_tags(low_cost=True)) == 2
+    assert all(tag.startswith("<style>") for tag in stylesheet_tags(low_cost=True))
+
+
+def test_reruns_send_the_stylesheet_as_a_hash_reference(monkeypatch):
+    # Stands in for the browser, which reports the hashes of cacheable messages it already holds
+    client_cache = set()
+    sent = []
+    enqueue = ScriptRunContext.enqueue
+
+    def recording_enqueue(ctx, msg):
+        ctx.cached_message_hashes = client_cache
+        forward = ctx._enqueue
+
+        def capture(sent_msg):
+            sent.append(sent_msg)
+            forward(sent_msg)
+
+        ctx._enqueue = capture
+        try:
+            enqueue(ctx, msg)
+        finally:
+            ctx._enqueue = forward
+
+    monkeypatch.setattr(ScriptRunContext, "enqueue", recording_enqueue)
+    at = AppTest.from_function(render_stylesheets)
+    at.run()
+    cacheable = [msg for msg in sent if msg.metadata.cacheable]
+    assert len(cacheable) == 1
+    assert cacheable[0].ByteSize() > 10_000
+
+    client_cache.update(msg.hash for msg in cacheable)
+    sent.clear()
+    at.run()
+    references = [msg for msg in sent if msg.WhichOneof("type") == "ref_hash"]
+    assert [msg.ref_hash for msg in references] == [cacheable[0].hash]
+    assert references[0].ByteSize() < 200
+    assert not any(msg.HasField("delta") and msg.delta.new_element.html.body == stylesheet_tags()[0] for msg in sent)
@@ -0,0 +1,48 @@
+from datetime import date, datetime, timezone
+
+from study_core.timeline import StudyTimeline, session_day, session_hours
+
+TODAY = date(2026, 3, 10)
+
+
+def sessions_on(*days, hours=1.0):
+    return [{'date': day.isoformat(), 'hours': hours} for day in days]
+
+
+def test_session_day_and_hours_read_old_and_new_records():
+    assert session_day({'started_at': datetime(2026, 3, 1, 12, tzinfo=timezone.utc)}) is not None
+    assert session_day({'date': '2026-03-01'}) == date(2026, 3, 1)
+    assert session_day({}) is None
+    assert session_hours({'Hours': '1.5'}) == 1.5
+    assert session_hours({'hours': None}) == 0
+
+
+def test_runs_join_from_either_side():
+    timeline = StudyTimeline(sessions_on(date(2026, 3, 1), date(2026, 3, 3)))
+    assert timeline.longest_streak == 1
+    timeline.add(date(2026, 3, 2), 1.0)
+    assert timeline.longest_streak == 3
+    assert timeline.run_end_by_start == {date(2026, 3, 1).toordinal(): date(2026, 3, 3).toordinal()}
+
+
+def test_current_streak_survives_until_the_day_after():
+    timeline = StudyTimeline(sessions_on(date(2026, 3, 8), date(2026, 3, 9)))
+    assert timeline.current_streak(TODAY) == 2
+    assert timeline.current_streak(date(2026, 3, 11)) == 0
+
+
+def test_rolling_hours_update_incrementally():
+    timeline = StudyTimeline(sessions_on(date(2026, 3, 10), date(2026, 3, 1), date(2026, 1, 1), hours=2.0))
+    assert timeline.rolling_hours(TODAY) == {7: 2.0, 30: 4.0, 90: 6.0}
+    timeline.add(date(2026, 3, 9), 1.5)
+    assert timeline.rolling_hours(TODAY) == {7: 3.5, 30: 5.5, 90: 7.5}
+    assert timeline.summary(TODAY)['total_hours'] == 7.5
+
+
+def test_weeks_are_trailing_windows_ending_today():
+    timeline = StudyTimeline(sessions_on(date(2026, 3, 10), date(2026, 3, 4), date(2026, 3, 3), date(2026, 2, 10)))
+    assert timeline.weeks(3, TODAY) == [
+        (date(2026, 2, 18), 0.0),
+        (date(2026, 2, 25), 1.0),
+        (date(2026, 3, 4), 2.0),
+    ]
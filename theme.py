@@ -0,0 +1,44 @@
+import os
+import re
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(REPO_ROOT, "assets")
+
+STYLESHEETS = ('dashboard', 'reduced-motion')
+# Checklists this large render in low-cost mode even if the user hasn't asked for it
+LOW_COST_SUBTOPICS = 500
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+_stylesheets = None
+_stylesheets_lock = threading.Lock()
+
+
+def minify_css(css):
+    css = _COMMENTS.sub("", css)
+    css = _WHITESPACE.sub(" ", css)
+    css = _PUNCTUATION.sub(r"\1", css)
+    # Colons only lose their trailing space; a leading one may belong to a selector like `a :hover`
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+
+def load_stylesheets(assets_dir=ASSETS_DIR):
+    stylesheets = {}
+    for name in STYLESHEETS:
+        with open(os.path.join(assets_dir, f"{name}.css"), encoding="utf-8") as f:
+            stylesheets[name] = f"<style>{minify_css(f.read())}</style>"
+    return stylesheets
+
+
+def stylesheet_tags(low_cost=False):
+    global _stylesheets
+    # Read and minified once per process
+    with _stylesheets_lock:
+        if _stylesheets is None:
+            _stylesheets = load_stylesheets()
+    names = STYLESHEETS if low_cost else STYLESHEETS[:1]
+    return [_stylesheets[name] for name in names]